@@ -13,4 +13,22 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up.
+from .schema import schema  # noqa: E402
+from .websocket import GraphQLWebSocket  # noqa: E402
+
+graphql_websocket = GraphQLWebSocket(schema)
+WEBSOCKET_PATHS = ("/graphql", "/graphql/")
+
+
+async def application(scope, receive, send):
+    # GraphQL subscriptions arrive as WebSockets on the /graphql/ endpoint;
+    # everything else is plain Django.
+    if scope["type"] == "websocket":
+        if scope["path"] in WEBSOCKET_PATHS:
+            return await graphql_websocket(scope, receive, send)
+        await receive()
+        return await send({"type": "websocket.close", "code": 4404})
+    return await django_application(scope, receive, send)
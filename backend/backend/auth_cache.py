@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+
+# Fields copied out of the User row. Enough for every resolver that consumes
+# _current_user (ownership/staff checks and the `me` query).
+SNAPSHOT_FIELDS = ("id", "username", "email", "first_name", "last_name", "is_active", "is_staff", "is_superuser")
+
+
+class TokenCache:
+    """Bounded LRU of verified token -> user snapshot, with a per-entry TTL.
+
+    A hit skips both the HMAC verification and the User lookup. Entries never
+    outlive the token's own ``exp`` claim.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._tokens_by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if expires_at <= time.monotonic():
+                self._discard(token)
+                return None
+            self._entries.move_to_end(token)
+            return snapshot
+
+    def set(self, token, snapshot, token_exp=None):
+        if self.maxsize <= 0:
+            return
+        lifetime = self.ttl
+        if token_exp is not None:
+            lifetime = min(lifetime, token_exp - time.time())
+        if lifetime <= 0:
+            return
+        with self._lock:
+            self._discard(token)
+            self._entries[token] = (time.monotonic() + lifetime, snapshot)
+            self._tokens_by_user.setdefault(snapshot["id"], set()).add(token)
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+
+    def evict_user(self, user_id):
+        with self._lock:
+            for token in self._tokens_by_user.pop(user_id, ()):
+                self._entries.pop(token, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _discard(self, token):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry[1]["id"])
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry[1]["id"]]
+
+
+token_cache = TokenCache(
+    maxsize=getattr(settings, "AUTH_TOKEN_CACHE_SIZE", 1024),
+    ttl=getattr(settings, "AUTH_TOKEN_CACHE_TTL", 60),
+)
+
+
+def _from_snapshot(snapshot):
+    user = User(**snapshot)
+    user._state.adding = False
+    user._state.db = "default"
+    return user
+
+
+def request_token(req):
+    """Bearer token from the Authorization header, or None."""
+    auth = ""
+    # Django's WSGIRequest
+    if hasattr(req, "META"):
+        auth = req.META.get("HTTP_AUTHORIZATION", "") or auth
+    # Django >=2.2 convenience
+    if hasattr(req, "headers"):
+        auth = req.headers.get("Authorization", auth)
+
+    if not auth:
+        return None
+
+    parts = auth.strip().split()
+    if len(parts) == 2 and parts[0].lower() == "bearer":
+        return parts[1]
+    # allow raw token without the "Bearer" prefix, just in case
+    return auth.strip()
+
+
+def token_user_id(token):
+    """User id a valid bearer token was issued for, without touching the database."""
+    snapshot = token_cache.get(token)
+    if snapshot is not None:
+        return snapshot["id"]
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+    except Exception:
+        return None
+    return payload.get("user_id") or None
+
+
+def user_for_token(token):
+    """Return the active User a bearer token belongs to, or None."""
+    snapshot = token_cache.get(token)
+    if snapshot is None:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        except Exception:
+            return None
+        uid = payload.get("user_id")
+        if not uid:
+            return None
+        row = User.objects.filter(pk=uid).values(*SNAPSHOT_FIELDS).first()
+        if row is None:
+            return None
+        snapshot = row
+        token_cache.set(token, snapshot, token_exp=payload.get("exp"))
+    if not snapshot["is_active"]:
+        return None
+    return _from_snapshot(snapshot)
+
+
+def _evict_user(sender, instance, **kwargs):
+    # Any save can deactivate the account or rotate its password; drop what we
+    # cached for it. Other processes converge within AUTH_TOKEN_CACHE_TTL.
+    token_cache.evict_user(instance.pk)
+
+
+post_save.connect(_evict_user, sender=User, dispatch_uid="auth_cache_evict_on_save")
+post_delete.connect(_evict_user, sender=User, dispatch_uid="auth_cache_evict_on_delete")
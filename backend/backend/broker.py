@@ -0,0 +1,218 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from .offload import run_sync
+
+logger = logging.getLogger(__name__)
+
+LISTING_CREATED = "listing.created"
+LISTING_UPDATED = "listing.updated"
+LISTING_SOLD = "listing.sold"
+NOTIFY_CHANNEL = "listing_events"
+
+QUEUE_SIZE = getattr(settings, "SUBSCRIPTION_QUEUE_SIZE", 100)
+
+
+def listing_updated_topic(listing_id):
+    return f"{LISTING_UPDATED}:{listing_id}"
+
+
+class Hub:
+    """Fans events out to the subscribers in this process.
+
+    Each subscriber is a bounded queue on the event loop, so an idle
+    connection costs one queue and one suspended task. ``publish`` may be
+    called from any thread; it crosses into the loop once per event, not once
+    per subscriber. A subscriber that falls ``queue_size`` events behind
+    loses the oldest ones rather than growing without bound.
+    """
+
+    def __init__(self, queue_size=QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._topics = defaultdict(set)
+        self._loop = None
+
+    def has_subscribers(self, topics):
+        return any(self._topics.get(t) for t in topics)
+
+    async def subscribe(self, topic):
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(self.queue_size)
+        self._topics[topic].add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._topics[topic]
+
+    def publish(self, topic, data):
+        loop = self._loop
+        if loop is None or loop.is_closed() or topic not in self._topics:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self.deliver(topic, data)
+        else:
+            loop.call_soon_threadsafe(self.deliver, topic, data)
+
+    def deliver(self, topic, data):
+        for queue in tuple(self._topics.get(topic, ())):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(data)
+
+
+class MemoryBroker:
+    """Delivers events only to subscribers in the publishing process."""
+
+    def __init__(self, hub=None):
+        self.hub = hub or Hub()
+
+    def wants(self, topics):
+        return self.hub.has_subscribers(topics)
+
+    def publish(self, topic, data):
+        self.hub.publish(topic, data)
+
+    def subscribe(self, topic):
+        return self.hub.subscribe(topic)
+
+
+class PostgresBroker:
+    """Relays events between processes with Postgres LISTEN/NOTIFY.
+
+    Publishing is a ``pg_notify`` on the request's connection. Each process
+    holds one listening connection (opened on the first subscription) and
+    hands what it hears to its local hub. Notifications carry only the topic
+    and listing id, well under the 8000-byte NOTIFY limit; the listener loads
+    the feed row when a local subscriber wants it.
+    """
+
+    def __init__(self, channel=NOTIFY_CHANNEL, hub=None, alias="default"):
+        self.channel = channel
+        self.hub = hub or Hub()
+        self.alias = alias
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def wants(self, topics):
+        # Subscribers may be in any process.
+        return True
+
+    def publish(self, topic, data):
+        payload = json.dumps({"topic": topic, "id": data["id"]}, separators=(",", ":"))
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def subscribe(self, topic):
+        with self._lock:
+            if self._listener is None or self._listener.done():
+                self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return self.hub.subscribe(topic)
+
+    def _conninfo(self):
+        db = settings.DATABASES[self.alias]
+        params = {
+            "dbname": db.get("NAME"),
+            "user": db.get("USER"),
+            "password": db.get("PASSWORD"),
+            "host": db.get("HOST"),
+            "port": db.get("PORT"),
+        }
+        return {k: v for k, v in params.items() if v}
+
+    async def _listen(self):
+        import psycopg
+
+        delay = 1
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(autocommit=True, **self._conninfo()) as conn:
+                    await conn.execute(f'LISTEN "{self.channel}"')
+                    delay = 1
+                    async for notify in conn.notifies():
+                        event = json.loads(notify.payload)
+                        await self._deliver(event["topic"], event["id"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Listening on %s failed; reconnecting in %ss", self.channel, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    async def _deliver(self, topic, listing_id):
+        if not self.hub.has_subscribers([topic]):
+            return
+        rows = await run_sync(_summary_payloads, [listing_id])
+        if rows:
+            self.hub.deliver(topic, _jsonable(rows[0]))
+
+
+def _build_broker():
+    kind = getattr(settings, "SUBSCRIPTION_BROKER", "")
+    if not kind:
+        kind = "postgres" if settings.DATABASES["default"]["ENGINE"].endswith("postgresql") else "memory"
+    if kind == "postgres":
+        return PostgresBroker()
+    return MemoryBroker()
+
+
+broker = _build_broker()
+
+
+def _summary_payloads(listing_ids):
+    from .schema import ListingFeedEntry
+
+    return list(
+        ListingFeedEntry.objects.filter(pk__in=listing_ids).values(
+            "id", "seller_id", "seller_name", "title", "price", "date_listed", "sold", "cover_image_url", "image_count"
+        )
+    )
+
+
+def _jsonable(row):
+    return json.loads(json.dumps(row, cls=DjangoJSONEncoder))
+
+
+def publish_listing_events(listing_ids, created=False, sold=False):
+    """Publish listingCreated/listingUpdated/listingSold once the transaction commits.
+
+    Payloads are the listing's feed row, so subscribers render events
+    without querying the database.
+    """
+    ids = list(listing_ids)
+    if not ids:
+        return
+
+    def send():
+        topics = [LISTING_CREATED] if created else [LISTING_UPDATED, *map(listing_updated_topic, ids)]
+        if sold:
+            topics.append(LISTING_SOLD)
+        if not broker.wants(topics):
+            return
+        for row in map(_jsonable, _summary_payloads(ids)):
+            if created:
+                broker.publish(LISTING_CREATED, row)
+                continue
+            broker.publish(LISTING_UPDATED, row)
+            broker.publish(listing_updated_topic(row["id"]), row)
+            if sold and row["sold"]:
+                broker.publish(LISTING_SOLD, row)
+
+    # The write is already committed: a failed publish must not turn into a
+    # mutation error, so it is logged instead.
+    transaction.on_commit(send, robust=True)
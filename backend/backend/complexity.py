@@ -0,0 +1,130 @@
+from django.conf import settings
+from graphql import GraphQLError, get_named_type, get_nullable_type, get_operation_ast, is_leaf_type, is_list_type
+from graphql.execution.values import get_argument_values
+from graphql.language import FieldNode, FragmentDefinitionNode, FragmentSpreadNode, InlineFragmentNode
+
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+MAX_COST = getattr(settings, "GRAPHQL_MAX_COST", 1000)
+MAX_DEPTH = getattr(settings, "GRAPHQL_MAX_DEPTH", 10)
+
+# Cost of resolving the field itself. Object and list fields default to 1,
+# scalars to 0; mutations write, so they are priced higher.
+FIELD_COSTS = {
+    ("Query", "listings"): 2,
+    # One aggregate over every matching row.
+    ("Query", "listingFacets"): 5,
+    ("Mutation", "*"): 10,
+}
+
+# Assumed result size of list fields without a `first` argument.
+DEFAULT_LIST_SIZE = 10
+LIST_SIZES = {
+    ("Query", "users"): DEFAULT_PAGE_SIZE,
+    # Connections return DEFAULT_PAGE_SIZE edges when `first` is left out.
+    ("Query", "listings"): DEFAULT_PAGE_SIZE,
+    ("Query", "myListings"): DEFAULT_PAGE_SIZE,
+    ("Query", "listingFeed"): DEFAULT_PAGE_SIZE,
+    ("UserType", "listings"): DEFAULT_PAGE_SIZE,
+    ("ListingType", "images"): 5,
+    # Sized by the `first` of the connection field that owns them.
+    ("ListingConnection", "edges"): 1,
+    ("ListingSummaryConnection", "edges"): 1,
+}
+
+# Bulk mutations repeat their own cost once per item of this argument.
+BATCH_ARGUMENTS = {
+    ("Mutation", "createListings"): "input",
+    ("Mutation", "setListingsSold"): "ids",
+    ("Mutation", "deleteListingImages"): "ids",
+    ("Mutation", "generateListingImageUploadUrls"): "files",
+}
+
+
+class QueryComplexityError(GraphQLError):
+    def __init__(self, message, cost, depth):
+        super().__init__(message, extensions={"code": "QUERY_TOO_COMPLEX", "cost": cost, "depth": depth})
+
+
+class _Analyzer:
+    def __init__(self, schema, fragments, variables):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables or {}
+        self.depth = 0
+
+    def selection_cost(self, parent_type, selection_set, depth, seen=()):
+        total = 0
+        for node in selection_set.selections:
+            if isinstance(node, FieldNode):
+                total += self.field_cost(parent_type, node, depth)
+            elif isinstance(node, InlineFragmentNode):
+                type_ = self.schema.get_type(node.type_condition.name.value) if node.type_condition else parent_type
+                total += self.selection_cost(type_, node.selection_set, depth, seen)
+            elif isinstance(node, FragmentSpreadNode):
+                name = node.name.value
+                fragment = self.fragments.get(name)
+                if fragment is None or name in seen:
+                    continue
+                type_ = self.schema.get_type(fragment.type_condition.name.value)
+                total += self.selection_cost(type_, fragment.selection_set, depth, (*seen, name))
+        return total
+
+    def field_cost(self, parent_type, node, depth):
+        name = node.name.value
+        if name.startswith("__"):
+            return 0
+        field_def = parent_type.fields.get(name)
+        if field_def is None:
+            return 0
+        self.depth = max(self.depth, depth)
+        key = (parent_type.name, name)
+        try:
+            args = get_argument_values(field_def, node, self.variables)
+        except GraphQLError:
+            args = {}
+
+        return_type = get_named_type(field_def.type)
+        base = FIELD_COSTS.get(key, FIELD_COSTS.get((parent_type.name, "*")))
+        if base is None:
+            base = 0 if is_leaf_type(return_type) else 1
+        batch_arg = BATCH_ARGUMENTS.get(key)
+        if batch_arg and isinstance(args.get(batch_arg), list):
+            base *= max(1, len(args[batch_arg]))
+        if node.selection_set is None:
+            return base
+
+        first = args.get("first")
+        if isinstance(first, int):
+            multiplier = min(max(first, 0), MAX_PAGE_SIZE)
+        elif key in LIST_SIZES:
+            multiplier = LIST_SIZES[key]
+        elif is_list_type(get_nullable_type(field_def.type)):
+            multiplier = DEFAULT_LIST_SIZE
+        else:
+            multiplier = 1
+        return base + multiplier * self.selection_cost(return_type, node.selection_set, depth + 1)
+
+
+def analyze(schema, document, operation_name=None, variables=None):
+    """Return ``(cost, depth)`` of the operation that would be executed."""
+    operation = get_operation_ast(document, operation_name)
+    if operation is None:
+        return 0, 0
+    root = schema.get_root_type(operation.operation)
+    fragments = {d.name.value: d for d in document.definitions if isinstance(d, FragmentDefinitionNode)}
+    analyzer = _Analyzer(schema, fragments, variables)
+    cost = analyzer.selection_cost(root, operation.selection_set, 1)
+    return cost, analyzer.depth
+
+
+def check_complexity(schema, document, operation_name=None, variables=None, max_cost=None, max_depth=None):
+    """Compute the operation's cost and raise if it is over budget."""
+    max_cost = MAX_COST if max_cost is None else max_cost
+    max_depth = MAX_DEPTH if max_depth is None else max_depth
+    cost, depth = analyze(schema, document, operation_name, variables)
+    if depth > max_depth:
+        raise QueryComplexityError(f"Query depth {depth} exceeds the maximum of {max_depth}.", cost, depth)
+    if cost > max_cost:
+        raise QueryComplexityError(f"Query cost {cost} exceeds the maximum of {max_cost}.", cost, depth)
+    return {"requested": cost, "limit": max_cost, "depth": depth}
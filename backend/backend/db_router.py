@@ -0,0 +1,53 @@
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+
+REPLICA = "replica"
+
+# True while a read-only GraphQL operation executes. Context variables follow
+# the work into run_sync threads and loader callbacks.
+_read_only = contextvars.ContextVar("read_only_operation", default=False)
+# True while a read must see the latest writes, whatever the operation.
+_pinned = contextvars.ContextVar("pinned_to_primary", default=False)
+
+
+@contextmanager
+def read_from_replica(enabled=True):
+    token = _read_only.set(enabled)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+@contextmanager
+def pin_to_primary(enabled=True):
+    token = _pinned.set(enabled)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Send reads made while resolving a GraphQL query to the replica.
+
+    Everything else, including reads inside mutations (which must see their
+    own writes), uses the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _read_only.get() and not _pinned.get() and REPLICA in settings.DATABASES:
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica follows the primary's schema through replication.
+        return db != REPLICA
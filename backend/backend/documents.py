@@ -0,0 +1,110 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from graphene_django.settings import graphene_settings
+from graphql import GraphQLError, parse, print_schema, validate
+
+APQ_KEY_PREFIX = "apq:"
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+def schema_version(graphql_schema):
+    return query_hash(print_schema(graphql_schema))[:16]
+
+
+class PersistedQueryError(Exception):
+    def __init__(self, message, code, status=200):
+        super().__init__(message)
+        self.code = code
+        self.status = status
+
+
+def _apq_cache():
+    return caches[getattr(settings, "PERSISTED_QUERY_CACHE", "default")]
+
+
+def resolve_persisted_query(query, extensions):
+    """Apply the automatic persisted query protocol to a request.
+
+    Returns ``(query, sha256, register)``. A hash without a query is looked up
+    in the shared cache; a hash with a query is checked against the digest and
+    ``register`` is True, so the caller can store it with
+    `register_persisted_query` once the document has parsed and validated.
+    """
+    persisted = (extensions or {}).get("persistedQuery") or {}
+    digest = persisted.get("sha256Hash")
+    if not digest:
+        return query, (query_hash(query) if query else None), False
+    if persisted.get("version", 1) != 1:
+        raise PersistedQueryError("Unsupported persisted query version.", "PERSISTED_QUERY_NOT_SUPPORTED", 400)
+
+    if not query:
+        query = _apq_cache().get(APQ_KEY_PREFIX + digest)
+        if query is None:
+            raise PersistedQueryError("PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND")
+        return query, digest, False
+
+    if query_hash(query) != digest:
+        raise PersistedQueryError("provided sha does not match query", "INVALID_PERSISTED_QUERY_HASH", 400)
+    return query, digest, True
+
+
+def register_persisted_query(digest, query):
+    """Store a valid query under its hash; oversized ones are executed but not kept."""
+    if len(query) > getattr(settings, "PERSISTED_QUERY_MAX_LENGTH", 20_000):
+        return
+    _apq_cache().set(APQ_KEY_PREFIX + digest, query, timeout=getattr(settings, "PERSISTED_QUERY_TTL", 86400))
+
+
+class DocumentCache:
+    """LRU of parsed and validated documents, keyed by query hash.
+
+    Keys include the schema version, so a deploy that changes the schema
+    never serves a document validated against the old one.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._versions = {}
+
+    def _version(self, graphql_schema):
+        version = self._versions.get(id(graphql_schema))
+        if version is None:
+            version = self._versions[id(graphql_schema)] = schema_version(graphql_schema)
+        return version
+
+    def get(self, graphql_schema, query, digest=None, validation_rules=None):
+        """Return ``(document, errors)``; ``document`` is None on syntax errors."""
+        rules = tuple(validation_rules) if validation_rules else None
+        key = (self._version(graphql_schema), digest or query_hash(query), rules)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        try:
+            document = parse(query)
+        except GraphQLError as e:
+            entry = (None, [e])
+        else:
+            errors = validate(graphql_schema, document, validation_rules, graphene_settings.MAX_VALIDATION_ERRORS)
+            entry = (document, errors)
+
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = entry
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return entry
+
+
+document_cache = DocumentCache(maxsize=getattr(settings, "GRAPHQL_DOCUMENT_CACHE_SIZE", 256))
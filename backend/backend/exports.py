@@ -0,0 +1,246 @@
+import csv
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.db.models import Prefetch
+from django.utils.dateparse import parse_datetime
+
+from .db_router import REPLICA
+from .feed import refresh_listing_feed
+from .response_cache import invalidate_listings
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+FIELDS = (
+    "id", "title", "description", "price", "date_listed", "sold",
+    "seller_id", "seller_username", "seller_email", "image_urls",
+)
+# Bytes of encoded output handed on at a time.
+CHUNK_BYTES = 64 * 1024
+
+
+def export_database():
+    # Exports are long reads; keep them off the primary when a replica exists.
+    return REPLICA if REPLICA in settings.DATABASES else "default"
+
+
+def iter_listings(chunk_size=2000, using="default"):
+    """Yield every listing as a flat dict, ``chunk_size`` rows in memory at a time.
+
+    Uses a server-side cursor on Postgres; images arrive with one extra query
+    per chunk.
+    """
+    from .schema import Listing, ListingImage
+
+    images = ListingImage.objects.using(using).only("id", "listing_id", "image_url").order_by("id")
+    qs = (
+        Listing.objects.using(using)
+        .select_related("user")
+        .only("id", "title", "description", "price", "date_listed", "sold", "user__id", "user__username", "user__email")
+        .prefetch_related(Prefetch("images", queryset=images))
+        .order_by("id")
+    )
+    for listing in qs.iterator(chunk_size=chunk_size):
+        yield {
+            "id": listing.id,
+            "title": listing.title,
+            "description": listing.description,
+            "price": str(listing.price),
+            "date_listed": listing.date_listed.isoformat() if listing.date_listed else None,
+            "sold": listing.sold,
+            "seller_id": listing.user.id,
+            "seller_username": listing.user.username,
+            "seller_email": listing.user.email,
+            "image_urls": [img.image_url for img in listing.images.all()],
+        }
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def encode_rows(rows, fmt):
+    if fmt == "ndjson":
+        for row in rows:
+            yield json.dumps(row, separators=(",", ":")) + "\n"
+        return
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS)
+    for row in rows:
+        yield writer.writerow([
+            " ".join(row[f]) if f == "image_urls" else
+            ("true" if row[f] else "false") if f == "sold" else
+            ("" if row[f] is None else row[f])
+            for f in FIELDS
+        ])
+
+
+def export_chunks(fmt, chunk_size=2000, using="default"):
+    """Encoded export in ~CHUNK_BYTES pieces, for streaming."""
+    buffer, size = [], 0
+    for line in encode_rows(iter_listings(chunk_size, using), fmt):
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def read_rows(stream, fmt):
+    """Parse an export back into row dicts, one line at a time."""
+    if fmt == "ndjson":
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+        return
+    for record in csv.DictReader(stream):
+        record["sold"] = record.get("sold", "").strip().lower() in ("true", "t", "1", "yes")
+        record["image_urls"] = (record.get("image_urls") or "").split()
+        yield record
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ListingImporter:
+    """Bulk-load exported listings.
+
+    On Postgres (psycopg 3) rows are written with COPY; elsewhere with
+    bulk_create. Sellers are matched by username and created, with an
+    unusable password, when missing. Each batch is one transaction that
+    also refreshes the listing feed rows.
+    """
+
+    def __init__(self, batch_size=5000, keep_ids=False, create_sellers=True, queue_images=False):
+        self.batch_size = batch_size
+        self.keep_ids = keep_ids
+        self.create_sellers = create_sellers
+        self.queue_images = queue_images
+        self.sellers = {}
+        self.imported = self.images = self.skipped = 0
+
+    def run(self, rows):
+        conn = connections["default"]
+        use_copy = conn.vendor == "postgresql" and conn.Database.__name__ == "psycopg"
+        for batch in _batches(rows, self.batch_size):
+            with transaction.atomic():
+                batch = self._attach_sellers(batch)
+                ids = self._copy(batch) if use_copy else self._bulk_create(batch)
+                refresh_listing_feed(ids)
+        if self.keep_ids and use_copy:
+            self._reset_sequence()
+        if self.imported:
+            invalidate_listings()
+        return self.imported
+
+    def _attach_sellers(self, batch):
+        wanted = {r["seller_username"] for r in batch} - self.sellers.keys()
+        if wanted:
+            self.sellers.update(User.objects.filter(username__in=wanted).values_list("username", "id"))
+            missing = wanted - self.sellers.keys()
+            if missing and self.create_sellers:
+                unusable = make_password(None)
+                emails = {r["seller_username"]: r.get("seller_email") or "" for r in batch}
+                User.objects.bulk_create(
+                    [User(username=name, email=emails[name], password=unusable) for name in missing],
+                    ignore_conflicts=True,
+                )
+                self.sellers.update(User.objects.filter(username__in=missing).values_list("username", "id"))
+        kept = [r for r in batch if r["seller_username"] in self.sellers]
+        self.skipped += len(batch) - len(kept)
+        return kept
+
+    def _values(self, row):
+        """``(user_id, title, description, price, date_listed, sold)`` for a row."""
+        return (
+            self.sellers[row["seller_username"]],
+            row["title"],
+            row.get("description") or "",
+            Decimal(str(row["price"])),
+            parse_datetime(row["date_listed"]) if row.get("date_listed") else None,
+            bool(row.get("sold")),
+        )
+
+    def _bulk_create(self, batch):
+        from .schema import Listing, ListingImage, ListingImageRendition
+
+        listings = []
+        for row in batch:
+            user_id, title, description, price, date_listed, sold = self._values(row)
+            listings.append(Listing(
+                id=int(row["id"]) if self.keep_ids else None,
+                user_id=user_id,
+                title=title,
+                description=description,
+                price=price,
+                date_listed=date_listed,
+                sold=sold,
+            ))
+        Listing.objects.bulk_create(listings)
+        images = ListingImage.objects.bulk_create(
+            [ListingImage(listing_id=l.id, image_url=url) for l, row in zip(listings, batch) for url in row["image_urls"]],
+            batch_size=self.batch_size,
+        )
+        if self.queue_images and images:
+            ListingImageRendition.objects.bulk_create([ListingImageRendition(image=img) for img in images])
+        self.imported += len(listings)
+        self.images += len(images)
+        return [l.id for l in listings]
+
+    def _copy(self, batch):
+        from .schema import Listing, ListingImage, ListingImageRendition
+
+        listings, images = Listing._meta.db_table, ListingImage._meta.db_table
+        with connections["default"].cursor() as cursor:
+            if self.keep_ids:
+                ids = [int(row["id"]) for row in batch]
+            else:
+                cursor.execute(
+                    "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                    [listings, len(batch)],
+                )
+                ids = [r[0] for r in cursor.fetchall()]
+            raw = cursor.cursor
+            with raw.copy(
+                f"COPY {listings} (id, user_id, title, description, price, date_listed, sold) FROM STDIN"
+            ) as copy:
+                for pk, row in zip(ids, batch):
+                    copy.write_row((pk, *self._values(row)))
+            with raw.copy(f"COPY {images} (listing_id, image_url) FROM STDIN") as copy:
+                for pk, row in zip(ids, batch):
+                    for url in row["image_urls"]:
+                        copy.write_row((pk, url))
+                        self.images += 1
+            if self.queue_images:
+                cursor.execute(
+                    f"INSERT INTO {ListingImageRendition._meta.db_table} "
+                    "(image_id, status, variants, placeholder, attempts, error, updated_at) "
+                    f"SELECT id, %s, '{{}}', '', 0, '', now() FROM {images} WHERE listing_id = ANY(%s)",
+                    [ListingImageRendition.PENDING, ids],
+                )
+        self.imported += len(ids)
+        return ids
+
+    def _reset_sequence(self):
+        from .schema import Listing
+
+        table = Listing._meta.db_table
+        with connections["default"].cursor() as cursor:
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1))",
+                [table],
+            )
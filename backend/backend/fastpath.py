@@ -0,0 +1,257 @@
+from collections import defaultdict
+from types import SimpleNamespace
+
+from graphql import FragmentDefinitionNode, GraphQLObjectType, OperationType, get_named_type, get_operation_ast
+from graphql.execution.collect_fields import collect_fields, collect_sub_fields
+from graphql.execution.values import get_argument_values, get_variable_values
+
+from .pagination import encode_cursor, keyset_page
+
+# GraphQL field -> values() column for the scalars the fast path serves. A
+# selection that asks for anything else (UserType.listings, a field added
+# later) goes through the regular executor instead.
+LISTING_COLUMNS = {
+    "id": "id",
+    "title": "title",
+    "description": "description",
+    "price": "price",
+    "dateListed": "date_listed",
+    "sold": "sold",
+}
+USER_COLUMNS = {
+    "id": "user_id",
+    "username": "user__username",
+    "email": "user__email",
+    "firstName": "user__first_name",
+    "lastName": "user__last_name",
+}
+IMAGE_COLUMNS = {"id": "id", "imageUrl": "image_url"}
+IMAGE_FIELDS = {*IMAGE_COLUMNS, "url", "placeholder"}
+SUMMARY_COLUMNS = {
+    "id": "id",
+    "sellerId": "seller_id",
+    "sellerName": "seller_name",
+    "title": "title",
+    "price": "price",
+    "dateListed": "date_listed",
+    "sold": "sold",
+    "coverImageUrl": "cover_image_url",
+    "imageCount": "image_count",
+}
+PAGE_INFO_FIELDS = {"hasNextPage", "hasPreviousPage", "startCursor", "endCursor"}
+
+
+class Unsupported(Exception):
+    """The operation needs something only the regular executor provides."""
+
+
+class _Selection:
+    """Collected fields of one object type, as ``(response_key, field_name, field_def, nodes)``."""
+
+    def __init__(self, ctx, object_type, fields):
+        self.ctx = ctx
+        self.type = object_type
+        self.fields = []
+        for key, nodes in fields.items():
+            name = nodes[0].name.value
+            field_def = object_type.fields.get(name)
+            if field_def is None and name != "__typename":
+                raise Unsupported(name)
+            self.fields.append((key, name, field_def, nodes))
+
+    def names(self):
+        return {name for _, name, _, _ in self.fields} - {"__typename"}
+
+    def child(self, field_def, nodes, allowed=None):
+        named = get_named_type(field_def.type)
+        if not isinstance(named, GraphQLObjectType):
+            raise Unsupported(named.name)
+        ctx = self.ctx
+        child = _Selection(ctx, named, collect_sub_fields(ctx.schema, ctx.fragments, ctx.variables, named, nodes))
+        if allowed is not None and child.names() - allowed:
+            raise Unsupported(named.name)
+        return child
+
+    def arguments(self, field_def, nodes):
+        return get_argument_values(field_def, nodes[0], self.ctx.variables)
+
+    def one(self, name):
+        """The single field called ``name``; aliased repeats are left to the executor."""
+        found = [f for f in self.fields if f[1] == name]
+        if len(found) > 1:
+            raise Unsupported(name)
+        return found[0] if found else None
+
+
+def _serialize(field_def, value):
+    # What graphql-core's complete_leaf_value does, minus the resolver call.
+    return None if value is None else get_named_type(field_def.type).serialize(value)
+
+
+class _ConnectionPlan:
+    """One `listings`/`listingFeed` root field, fetched with values() and serialized directly."""
+
+    def __init__(self, root, field_def, nodes, columns, queryset):
+        self.columns = columns
+        self.queryset = queryset
+        self.args = root.arguments(field_def, nodes)
+        self.connection = root.child(field_def, nodes, {"edges", "pageInfo"})
+        self.edges = self.page_info = self.node = self.user = self.images = None
+
+        edges = self.connection.one("edges")
+        if edges is not None:
+            self.edges = self.connection.child(edges[2], edges[3], {"cursor", "node"})
+            node = self.edges.one("node")
+            if node is not None:
+                allowed = set(columns)
+                if columns is LISTING_COLUMNS:
+                    allowed |= {"user", "images"}
+                self.node = self.edges.child(node[2], node[3], allowed)
+                user, images = self.node.one("user"), self.node.one("images")
+                if user is not None:
+                    self.user = self.node.child(user[2], user[3], set(USER_COLUMNS))
+                if images is not None:
+                    self.images = self.node.child(images[2], images[3], IMAGE_FIELDS)
+        page_info = self.connection.one("pageInfo")
+        if page_info is not None:
+            self.page_info = self.connection.child(page_info[2], page_info[3], PAGE_INFO_FIELDS)
+
+    def run(self):
+        args = dict(self.args)
+        first, after = args.pop("first", None), args.pop("after", None)
+        qs, key, descending = self.queryset(**args)
+        columns = {"id", key}
+        if self.node is not None:
+            columns.update(self.columns[name] for name in self.node.names() & self.columns.keys())
+        if self.user is not None:
+            columns.update(USER_COLUMNS[name] for name in self.user.names())
+        rows, has_next = keyset_page(qs.values(*columns), first=first, after=after, key=key, descending=descending)
+        cursors = [encode_cursor(row[key], row["id"], key, descending) for row in rows]
+        images = self._images(rows) if self.images is not None else None
+
+        out = {}
+        for resp_key, name, _, _ in self.connection.fields:
+            if name == "__typename":
+                out[resp_key] = self.connection.type.name
+            elif name == "edges":
+                out[resp_key] = [self._edge(row, cursor, images) for row, cursor in zip(rows, cursors)]
+            else:
+                out[resp_key] = self._page_info(has_next, bool(after), cursors)
+        return out
+
+    def _page_info(self, has_next, has_previous, cursors):
+        values = {
+            "hasNextPage": has_next,
+            "hasPreviousPage": has_previous,
+            "startCursor": cursors[0] if cursors else None,
+            "endCursor": cursors[-1] if cursors else None,
+        }
+        return {
+            key: self.page_info.type.name if name == "__typename" else _serialize(field_def, values[name])
+            for key, name, field_def, _ in self.page_info.fields
+        }
+
+    def _edge(self, row, cursor, images):
+        out = {}
+        for key, name, _, _ in self.edges.fields:
+            if name == "__typename":
+                out[key] = self.edges.type.name
+            elif name == "cursor":
+                out[key] = cursor
+            else:
+                out[key] = self._node(row, images)
+        return out
+
+    def _node(self, row, images):
+        out = {}
+        for key, name, field_def, _ in self.node.fields:
+            if name == "__typename":
+                out[key] = self.node.type.name
+            elif name == "user":
+                out[key] = {
+                    k: self.user.type.name if n == "__typename" else _serialize(d, row[USER_COLUMNS[n]])
+                    for k, n, d, _ in self.user.fields
+                }
+            elif name == "images":
+                out[key] = [self._image(image) for image in images.get(row["id"], ())]
+            else:
+                out[key] = _serialize(field_def, row[self.columns[name]])
+        return out
+
+    def _images(self, rows):
+        from .schema import ListingImage, ListingImageRendition
+
+        # Ordered by id like the executor's images prefetch and loader.
+        image_rows = list(
+            ListingImage.objects.filter(listing__in=[row["id"] for row in rows])
+            .order_by("id")
+            .values("id", "listing_id", "image_url")
+        )
+        if image_rows and self.images.names() & {"url", "placeholder"}:
+            renditions = {
+                r["image_id"]: r
+                for r in ListingImageRendition.objects.filter(image_id__in=[i["id"] for i in image_rows]).values(
+                    "image_id", "status", "variants", "placeholder"
+                )
+            }
+            for image in image_rows:
+                image["rendition"] = renditions.get(image["id"])
+        grouped = defaultdict(list)
+        for image in image_rows:
+            grouped[image["listing_id"]].append(image)
+        return grouped
+
+    def _image(self, image):
+        from .schema import rendition_url
+
+        rendition = image.get("rendition")
+        out = {}
+        for key, name, field_def, nodes in self.images.fields:
+            if name == "__typename":
+                out[key] = self.images.type.name
+            elif name == "url":
+                status, variants = (rendition["status"], rendition["variants"]) if rendition else (None, None)
+                out[key] = rendition_url(image["image_url"], status, variants, **self.images.arguments(field_def, nodes))
+            elif name == "placeholder":
+                out[key] = (rendition["placeholder"] or None) if rendition else None
+            else:
+                out[key] = _serialize(field_def, image[IMAGE_COLUMNS[name]])
+        return out
+
+
+def plan(graphql_schema, document, operation_name, variables):
+    """Return a callable producing ``data`` for the operation, or None.
+
+    Only queries whose root fields are all `listings`/`listingFeed` (or
+    ``__typename``), selecting the fields listed above, qualify. The callable
+    does blocking ORM work and raises where the regular executor would report
+    an error (a bad cursor, say), so callers fall back to it then.
+    """
+    from .schema import listing_feed_queryset, listings_queryset
+
+    roots = {"listings": (LISTING_COLUMNS, listings_queryset), "listingFeed": (SUMMARY_COLUMNS, listing_feed_queryset)}
+    operation = get_operation_ast(document, operation_name)
+    if operation is None or operation.operation != OperationType.QUERY:
+        return None
+    coerced = get_variable_values(graphql_schema, operation.variable_definitions or (), variables or {})
+    if isinstance(coerced, list):
+        return None
+    fragments = {d.name.value: d for d in document.definitions if isinstance(d, FragmentDefinitionNode)}
+    query_type = graphql_schema.query_type
+    ctx = SimpleNamespace(schema=graphql_schema, fragments=fragments, variables=coerced)
+    try:
+        fields = collect_fields(graphql_schema, fragments, coerced, query_type, operation.selection_set)
+        root = _Selection(ctx, query_type, fields)
+        if not root.names() or root.names() - roots.keys():
+            return None
+        plans = [
+            (key, None if name == "__typename" else _ConnectionPlan(root, field_def, nodes, *roots[name]))
+            for key, name, field_def, nodes in root.fields
+        ]
+    except Unsupported:
+        return None
+
+    def run():
+        return {key: query_type.name if p is None else p.run() for key, p in plans}
+
+    return run
@@ -0,0 +1,79 @@
+from django.contrib.auth.models import User
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.signals import post_save
+
+from .response_cache import invalidate_listings
+
+FEED_FIELDS = ("seller_id", "seller_name", "title", "price", "date_listed", "sold", "cover_image_url", "image_count")
+# User fields that feed into seller_name.
+_NAME_FIELDS = {"username", "first_name", "last_name"}
+
+
+def seller_display_name(first_name, last_name, username):
+    return f"{first_name} {last_name}".strip() or username
+
+
+def refresh_listing_feed(listing_ids):
+    """Recompute the listing_feed rows of these listings from the source tables.
+
+    One read and one upsert regardless of how many listings changed; rows of
+    listings that no longer exist are removed.
+    """
+    from .schema import Listing, ListingFeedEntry, ListingImage
+
+    ids = set(listing_ids)
+    if not ids:
+        return
+    cover = ListingImage.objects.filter(listing=OuterRef("pk")).order_by("id").values("image_url")[:1]
+    rows = (
+        Listing.objects.filter(pk__in=ids)
+        .annotate(image_count=Count("images"), cover_image_url=Subquery(cover))
+        .values(
+            "id", "user_id", "user__username", "user__first_name", "user__last_name",
+            "title", "price", "date_listed", "sold", "cover_image_url", "image_count",
+        )
+    )
+    entries = [
+        ListingFeedEntry(
+            id=row["id"],
+            seller_id=row["user_id"],
+            seller_name=seller_display_name(row["user__first_name"], row["user__last_name"], row["user__username"]),
+            title=row["title"],
+            price=row["price"],
+            date_listed=row["date_listed"],
+            sold=row["sold"],
+            cover_image_url=row["cover_image_url"] or "",
+            image_count=row["image_count"],
+        )
+        for row in rows
+    ]
+    if entries:
+        ListingFeedEntry.objects.bulk_create(
+            entries, update_conflicts=True, unique_fields=["id"], update_fields=list(FEED_FIELDS)
+        )
+    missing = ids - {e.id for e in entries}
+    if missing:
+        ListingFeedEntry.objects.filter(pk__in=missing).delete()
+
+
+def _update_seller_name(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not _NAME_FIELDS & set(update_fields)):
+        return
+    from .schema import ListingFeedEntry
+
+    name = seller_display_name(instance.first_name, instance.last_name, instance.username)
+    stale = list(ListingFeedEntry.objects.filter(seller_id=instance.pk).exclude(seller_name=name).values_list("id", flat=True))
+    if stale:
+        ListingFeedEntry.objects.filter(pk__in=stale).update(seller_name=name)
+        # Cached `listing` responses embed the seller too.
+        invalidate_listings(listing_ids=stale, owner_ids=[instance.pk])
+
+
+def drop_listing_feed_entry(sender, instance, **kwargs):
+    # Connected to Listing's post_delete in schema.py, where the model is defined.
+    from .schema import ListingFeedEntry
+
+    ListingFeedEntry.objects.filter(pk=instance.pk).delete()
+
+
+post_save.connect(_update_seller_name, sender=User, dispatch_uid="listing_feed_seller_name")
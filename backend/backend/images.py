@@ -0,0 +1,97 @@
+import base64
+import io
+import urllib.request
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+# Longest edge, in pixels, of each stored variant.
+VARIANT_SIZES = getattr(settings, "LISTING_IMAGE_SIZES", {"thumb": 320, "medium": 960, "full": 2048})
+PLACEHOLDER_SIZE = 16
+FETCH_TIMEOUT = 15
+# Largest upload fetched for processing; bigger sources fail the rendition.
+MAX_BYTES = getattr(settings, "LISTING_IMAGE_MAX_BYTES", 20 * 2**20)
+
+
+def _encode(img, fmt, **options):
+    buf = io.BytesIO()
+    img.save(buf, format=fmt, **options)
+    return buf.getvalue()
+
+
+def render_variants(source):
+    """Decode ``source`` bytes and encode every variant plus a placeholder.
+
+    Runs in a worker process, so it takes and returns plain bytes/dicts only.
+    Returns ``({size: {"webp": bytes, "avif": bytes | None, "width", "height"}},
+    placeholder_data_uri)``.
+    """
+    from PIL import Image, ImageOps, features
+
+    avif = features.check("avif")
+    with Image.open(io.BytesIO(source)) as original:
+        img = ImageOps.exif_transpose(original).convert("RGB")
+
+    variants = {}
+    for size, edge in VARIANT_SIZES.items():
+        resized = img.copy()
+        resized.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        variants[size] = {
+            "webp": _encode(resized, "WEBP", quality=80, method=4),
+            "avif": _encode(resized, "AVIF", quality=60) if avif else None,
+            "width": resized.width,
+            "height": resized.height,
+        }
+
+    tiny = img.copy()
+    tiny.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.BILINEAR)
+    placeholder = "data:image/webp;base64," + base64.b64encode(_encode(tiny, "WEBP", quality=30)).decode()
+    return variants, placeholder
+
+
+def source_prefix():
+    """Public URL prefix of the uploads generateListingImageUploadUrl hands out."""
+    bucket = getattr(settings, "GCS_BUCKET_NAME", None)
+    if not bucket:
+        return None
+    return f"https://storage.googleapis.com/{bucket}/{getattr(settings, 'GCS_UPLOAD_PREFIX', 'listings')}/"
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        raise ValueError(f"Image URL redirected: {req.full_url!r}")
+
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def fetch_and_render(url):
+    # image_url is client-supplied: only fetch our own bucket's uploads, so it
+    # cannot be pointed at internal hosts, and never read more than MAX_BYTES.
+    prefix = source_prefix()
+    if prefix is None or not url.startswith(prefix) or ".." in urlparse(url).path:
+        raise ValueError(f"Image URL is not an upload in this bucket: {url!r}")
+    with _opener.open(url, timeout=FETCH_TIMEOUT) as resp:
+        source = resp.read(MAX_BYTES + 1)
+    if len(source) > MAX_BYTES:
+        raise ValueError(f"Image is larger than {MAX_BYTES} bytes: {url!r}")
+    return render_variants(source)
+
+
+def store_variants(storage, image_id, variants):
+    """Write rendered bytes through ``storage`` and return their public URLs."""
+    from django.core.files.base import ContentFile
+
+    stored = {}
+    for size, variant in variants.items():
+        entry = {"width": variant["width"], "height": variant["height"]}
+        for fmt in ("webp", "avif"):
+            data = variant[fmt]
+            if data is None:
+                continue
+            name = f"{image_id}/{size}.{fmt}"
+            if storage.exists(name):
+                storage.delete(name)
+            entry[fmt] = storage.url(storage.save(name, ContentFile(data)))
+        stored[size] = entry
+    return stored
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+from inspect import isawaitable
+from collections import defaultdict
+
+from graphql.execution.values import get_argument_values
+from graphql.language import FieldNode
+
+from .offload import in_event_loop, run_sync
+
+
+class Loader:
+    """Per-request batching cache in front of a ``batch_fn(keys) -> dict``.
+
+    Under the async view, ``load`` returns a future and every key requested
+    during the same event-loop tick is fetched by one ``batch_fn`` call on the
+    worker pool. Synchronous execution has no tick to wait for, so there
+    resolvers that know which keys are about to be requested (the parent
+    list, or sibling root fields) ``prime`` them, and the first ``load``
+    fetches everything queued so far in a single query.
+    """
+
+    def __init__(self, batch_fn, default=None):
+        self._batch_fn = batch_fn
+        self._default = default
+        self._cache = {}
+        self._queue = set()
+        self._pending = {}
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+    def prime(self, keys):
+        with self._lock:
+            self._queue.update(k for k in keys if k is not None and k not in self._cache)
+
+    def load(self, key):
+        if key in self._cache:
+            return self._cache[key]
+        if in_event_loop():
+            return self._load_async(key)
+        with self._lock:
+            keys, self._queue = self._queue | {key}, set()
+        self._store(keys, self._batch_fn(list(keys)))
+        return self._cache[key]
+
+    def _store(self, keys, found):
+        for k in keys:
+            self._cache[k] = found.get(k, self._default() if self._default else None)
+
+    def _load_async(self, key):
+        loop = asyncio.get_running_loop()
+        future = self._pending.get(key)
+        if future is None:
+            future = self._pending[key] = loop.create_future()
+            with self._lock:
+                self._queue.add(key)
+        if not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._dispatch)
+        return future
+
+    def _dispatch(self):
+        self._scheduled = False
+        with self._lock:
+            keys, self._queue = self._queue, set()
+        pending = {k: self._pending.pop(k) for k in keys if k in self._pending}
+        asyncio.ensure_future(self._fetch(keys, pending))
+
+    async def _fetch(self, keys, pending):
+        try:
+            found = await run_sync(self._batch_fn, list(keys))
+        except Exception as exc:
+            for future in pending.values():
+                future.set_exception(exc)
+            return
+        self._store(keys, found)
+        for k, future in pending.items():
+            future.set_result(self._cache[k])
+
+
+class Loaders:
+    def __init__(self):
+        self.user = Loader(self._users)
+        self.listing = Loader(self._listings)
+        self.images_by_listing = Loader(self._images_by_listing, default=list)
+        self.listings_by_user = Loader(self._listings_by_user, default=list)
+        self.rendition = Loader(self._renditions)
+
+    def _users(self, ids):
+        from django.contrib.auth.models import User
+
+        return User.objects.in_bulk(ids)
+
+    def _listings(self, ids):
+        from .schema import Listing
+
+        found = Listing.objects.select_related("user").in_bulk(ids)
+        self.images_by_listing.prime(found)
+        return found
+
+    def _images_by_listing(self, listing_ids):
+        from .schema import ListingImage
+
+        grouped = defaultdict(list)
+        images = list(ListingImage.objects.filter(listing_id__in=listing_ids).order_by("id"))
+        for image in images:
+            grouped[image.listing_id].append(image)
+        self.rendition.prime(image.id for image in images)
+        return grouped
+
+    def _renditions(self, image_ids):
+        from .schema import ListingImageRendition
+
+        return ListingImageRendition.objects.in_bulk(image_ids)
+
+    def _listings_by_user(self, user_ids):
+        from .schema import Listing
+
+        grouped = defaultdict(list)
+        qs = Listing.objects.select_related("user").filter(user_id__in=user_ids).order_by("-date_listed", "-id")
+        for listing in qs:
+            grouped[listing.user_id].append(listing)
+        self.images_by_listing.prime(l.id for ls in grouped.values() for l in ls)
+        return grouped
+
+
+def then(value, fn):
+    # Apply fn to a loader result, whether it is a value or (async) a future.
+    if isawaitable(value):
+        async def chained():
+            return fn(await value)
+        return chained()
+    return fn(value)
+
+
+def get_loaders(info):
+    # Loaders live on the request so their caches never outlive it.
+    req = info.context
+    loaders = getattr(req, "_loaders", None)
+    if loaders is None:
+        loaders = Loaders()
+        setattr(req, "_loaders", loaders)
+    return loaders
+
+
+def sibling_arguments(info, name):
+    """Values of argument ``name`` on every root-level alias of this field."""
+    field_def = info.parent_type.fields[info.field_name]
+    values = []
+    for node in info.operation.selection_set.selections:
+        if isinstance(node, FieldNode) and node.name.value == info.field_name:
+            args = get_argument_values(field_def, node, info.variable_values)
+            values.append(args.get(name))
+    return values
@@ -0,0 +1,72 @@
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from backend.schema import schema
+
+CREATE_ONE = """
+mutation($title: String!, $price: Decimal!, $urls: [String]) {
+  createListing(title: $title, description: "bench", price: $price, imageUrls: $urls) { success listing { id } }
+}
+"""
+CREATE_MANY = """
+mutation($input: [ListingInput!]!) {
+  createListings(input: $input) { success listing { id } }
+}
+"""
+SOLD_ONE = "mutation($id: ID!) { setListingSold(id: $id, sold: true) { success } }"
+SOLD_MANY = "mutation($ids: [ID!]!) { setListingsSold(ids: $ids, sold: true) { success } }"
+
+
+class Command(BaseCommand):
+    help = "Compare per-item listing mutations with the bulk variants. Rolls back everything it writes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=50)
+        parser.add_argument("--images", type=int, default=2, help="Image URLs per created listing.")
+
+    def handle(self, *args, **options):
+        count, images = options["count"], options["images"]
+        with transaction.atomic():
+            user = User.objects.create_user(f"bench_{uuid.uuid4().hex[:8]}", password=None)
+            factory = RequestFactory()
+
+            def run(query, variables):
+                request = factory.post("/graphql/")
+                request._current_user = user
+                result = schema.execute(query, variable_values=variables, context_value=request)
+                if result.errors:
+                    raise result.errors[0]
+                return result.data
+
+            def item(n):
+                return {"title": f"bench {n}", "price": "10.00", "urls": [f"https://example.com/{n}/{i}.jpg" for i in range(images)]}
+
+            def measure(label, fn):
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    out = fn()
+                    elapsed = time.perf_counter() - start
+                self.stdout.write(f"{label:<28} {elapsed * 1000:9.1f} ms {len(queries.captured_queries):6d} queries")
+                return out
+
+            single_ids = measure(
+                f"createListing x{count}",
+                lambda: [run(CREATE_ONE, item(n))["createListing"]["listing"]["id"] for n in range(count)],
+            )
+            bulk = measure(
+                f"createListings({count})",
+                lambda: run(CREATE_MANY, {"input": [
+                    {"title": i["title"], "description": "bench", "price": i["price"], "imageUrls": i["urls"]}
+                    for i in map(item, range(count))
+                ]}),
+            )
+            bulk_ids = [r["listing"]["id"] for r in bulk["createListings"]]
+            measure(f"setListingSold x{count}", lambda: [run(SOLD_ONE, {"id": pk}) for pk in single_ids])
+            measure(f"setListingsSold({count})", lambda: run(SOLD_MANY, {"ids": bulk_ids}))
+            transaction.set_rollback(True)
@@ -0,0 +1,72 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+
+from backend.schema import Listing, schema
+
+DETAIL = "query($id: ID!) { listing(id: $id) { id title price user { username } } }"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request latency of a cheap listing(id:) query when every request opens a new "
+        "database connection versus reusing one (persistent connection or pool, as configured)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        conn = connections[alias]
+        listing_id = Listing.objects.using(alias).values_list("id", flat=True).first()
+        if listing_id is None:
+            raise CommandError("Needs at least one listing (run bench_graphql --keep first).")
+
+        pooled = bool(conn.settings_dict.get("OPTIONS", {}).get("pool"))
+        factory = RequestFactory()
+        connects = []
+
+        def count(sender, connection, **kwargs):
+            if connection.alias == alias:
+                connects.append(1)
+
+        def request_cycle():
+            # What Django's request_started/request_finished handlers do.
+            close_old_connections()
+            start = time.perf_counter()
+            result = schema.execute(DETAIL, variable_values={"id": listing_id}, context_value=factory.post("/graphql/"))
+            elapsed = time.perf_counter() - start
+            close_old_connections()
+            if result.errors:
+                raise CommandError(str(result.errors[0]))
+            return elapsed
+
+        modes = [("new connection", 0), ("reused connection", None)]
+        if pooled:
+            # With a pool, closing just checks the connection back in.
+            modes = [("pool checkout", 0)]
+
+        connection_created.connect(count)
+        original = conn.settings_dict["CONN_MAX_AGE"]
+        try:
+            for label, max_age in modes:
+                conn.close()
+                conn.settings_dict["CONN_MAX_AGE"] = max_age
+                connects.clear()
+                request_cycle()
+                samples = sorted(request_cycle() * 1000 for _ in range(options["requests"]))
+                self.stdout.write(
+                    f"{label:<18} p50 {statistics.median(samples):7.2f} ms  "
+                    f"p99 {samples[min(len(samples) - 1, int(len(samples) * 0.99))]:7.2f} ms  "
+                    f"mean {statistics.fmean(samples):7.2f} ms  {len(connects)} connects"
+                )
+        finally:
+            connection_created.disconnect(count)
+            conn.settings_dict["CONN_MAX_AGE"] = original
+            conn.close()
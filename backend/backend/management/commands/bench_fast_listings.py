@@ -0,0 +1,157 @@
+import json
+import random
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from graphql import parse
+
+from backend.fastpath import plan
+from backend.schema import ListingImage, ListingImageRendition, schema
+
+from .bench_graphql import Command as GraphQLBench
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BROWSE = """
+query($first: Int, $after: String, $sort: ListingSort, $minPrice: Decimal, $hasImages: Boolean, $sold: Boolean) {
+  listings(first: $first, after: $after, sort: $sort, minPrice: $minPrice, hasImages: $hasImages, sold: $sold) {
+    __typename
+    edges { cursor node { __typename id title description price dateListed sold
+      user { id username email firstName lastName }
+      images { id imageUrl url thumb: url(size: THUMB, format: AVIF) placeholder } } }
+    pageInfo { hasNextPage hasPreviousPage startCursor endCursor }
+  }
+}
+"""
+FRAGMENTS = """
+query($first: Int, $withUser: Boolean!) {
+  a: listings(first: $first) { ...page }
+  b: listings(first: 3, sort: PRICE_DESC, includeSold: true) { edges { node { id price } } }
+}
+fragment page on ListingConnection {
+  edges { node { ...card user @include(if: $withUser) { username } } }
+  pageInfo { endCursor }
+}
+fragment card on ListingType { id title price }
+"""
+FEED = """
+query($first: Int, $after: String, $sort: ListingSort, $maxPrice: Decimal) {
+  listingFeed(first: $first, after: $after, sort: $sort, maxPrice: $maxPrice) {
+    edges { cursor node { id sellerId sellerName title price dateListed sold coverImageUrl imageCount } }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+"""
+CASES = [
+    ("browse", BROWSE, {"first": 20}),
+    ("browse_price_asc", BROWSE, {"first": 50, "sort": "PRICE_ASC", "minPrice": "50"}),
+    ("browse_price_desc_images", BROWSE, {"first": 100, "sort": "PRICE_DESC", "hasImages": True}),
+    ("browse_sold", BROWSE, {"first": 10, "sold": True}),
+    ("fragments", FRAGMENTS, {"first": 5, "withUser": True}),
+    ("fragments_skip", FRAGMENTS, {"first": 5, "withUser": False}),
+    ("feed", FEED, {"first": 100}),
+    ("feed_price", FEED, {"first": 30, "sort": "PRICE_ASC", "maxPrice": "200.50"}),
+]
+
+
+def _encode(data):
+    return orjson.dumps(data) if orjson is not None else json.dumps(data, separators=(",", ":")).encode()
+
+
+class Command(BaseCommand):
+    help = (
+        "Check that the fast listings path returns exactly what the GraphQL executor returns for a matrix "
+        "of queries (following every page), then time both. Exits non-zero on any difference."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=30)
+        parser.add_argument("--listings", type=int, default=20, help="Listings per user.")
+        parser.add_argument("--images", type=int, default=3, help="Images per listing.")
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--keep", action="store_true", help="Leave the seeded rows in the database.")
+
+    def handle(self, *args, **options):
+        seeder = GraphQLBench(stdout=self.stdout, stderr=self.stderr)
+        seeder.rng = random.Random(0)
+        seeder.prefix = f"bench_{uuid.uuid4().hex[:8]}"
+        _, listing_ids = seeder._seed(options["users"], options["listings"], options["images"])
+        self._renditions(listing_ids)
+        request = RequestFactory().post("/graphql/")
+        try:
+            for name, query, variables in CASES:
+                pages = self._compare(name, query, variables, request)
+                regular, fast = self._time(query, variables, request, options["iterations"])
+                self.stdout.write(
+                    f"{name:<26} identical over {pages} page(s)  executor {regular:7.2f} ms  "
+                    f"fast {fast:7.2f} ms  x{regular / fast:.1f}"
+                )
+        finally:
+            if not options["keep"]:
+                ListingImageRendition.objects.filter(image__listing_id__in=listing_ids).delete()
+                seeder._cleanup()
+
+    def _renditions(self, listing_ids):
+        # Mix ready/pending renditions so url and placeholder take both branches.
+        images = ListingImage.objects.filter(listing_id__in=listing_ids).values_list("id", flat=True)
+        ListingImageRendition.objects.bulk_create(
+            [
+                ListingImageRendition(
+                    image_id=pk,
+                    status=ListingImageRendition.READY if i % 2 else ListingImageRendition.PENDING,
+                    variants={"thumb": {"webp": f"/t/{pk}.webp", "avif": f"/t/{pk}.avif"}, "full": {"webp": f"/f/{pk}.webp"}},
+                    placeholder="data:image/webp;base64,AAAA" if i % 3 else "",
+                )
+                for i, pk in enumerate(images)
+                if i % 4
+            ],
+            batch_size=1000,
+        )
+
+    def _regular(self, query, variables, request):
+        result = schema.execute(query, variable_values=variables, context_value=request)
+        if result.errors:
+            raise CommandError(f"Executor errors: {result.errors}")
+        return result.data
+
+    def _fast(self, query, variables):
+        run = plan(schema.graphql_schema, parse(query), None, variables)
+        if run is None:
+            raise CommandError("Query did not qualify for the fast path.")
+        return run()
+
+    def _compare(self, name, query, variables, request):
+        pages, after = 0, None
+        while True:
+            current = {**variables, "after": after} if after else variables
+            expected, actual = self._regular(query, current, request), self._fast(query, current)
+            if _encode(expected) != _encode(actual):
+                raise CommandError(
+                    f"{name} page {pages + 1} differs:\n  executor {_encode(expected)[:400]!r}\n"
+                    f"  fast     {_encode(actual)[:400]!r}"
+                )
+            pages += 1
+            connection = next(iter(expected.values()))
+            page_info = connection.get("pageInfo") or {}
+            if "after" not in query or not page_info.get("hasNextPage"):
+                return pages
+            after = page_info["endCursor"]
+
+    def _time(self, query, variables, request, iterations):
+        def sample(fn):
+            times = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                _encode(fn())
+                times.append((time.perf_counter() - start) * 1000)
+            return statistics.median(times)
+
+        regular = sample(lambda: self._regular(query, variables, request))
+        fast = sample(lambda: self._fast(query, variables))
+        return regular, fast
@@ -0,0 +1,262 @@
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from backend.feed import refresh_listing_feed
+from backend.schema import Listing, ListingFeedEntry, ListingImage, schema
+
+PASSWORD = "bench-password"
+WORDS = (
+    "bike", "desk", "lamp", "chair", "textbook", "calculator", "monitor", "couch", "skis", "snowboard",
+    "guitar", "microwave", "fridge", "helmet", "backpack", "jacket", "printer", "keyboard", "tent", "rug",
+)
+
+BROWSE = """
+query($first: Int, $after: String) {
+  listings(first: $first, after: $after) {
+    edges { cursor node { id title price dateListed user { id username } images { id url } } }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+"""
+FEED = """
+query($first: Int) {
+  listingFeed(first: $first) {
+    edges { cursor node { id title price dateListed sellerName coverImageUrl imageCount } }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+"""
+SEARCH = """
+query($search: String) {
+  listings(search: $search, first: 20) { edges { node { id title price images { url } } } }
+}
+"""
+DETAIL = """
+query($id: ID!) {
+  listing(id: $id) { id title description price sold dateListed user { id username email } images { id url } }
+}
+"""
+LOGIN = "mutation($email: String!, $password: String!) { login(email: $email, password: $password) { success token } }"
+CREATE = """
+mutation($title: String!, $price: Decimal!, $urls: [String]) {
+  createListing(title: $title, description: "bench", price: $price, imageUrls: $urls) { success listing { id } }
+}
+"""
+UPDATE = "mutation($id: ID!, $price: Decimal) { updateListing(id: $id, price: $price) { success listing { id price } } }"
+
+SCENARIOS = ("browse", "feed", "search", "detail", "login", "create", "update")
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed users/listings/images and drive the GraphQL schema with representative operations, "
+        "reporting latency percentiles, throughput and SQL query counts. Seeded rows are removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--listings", type=int, default=20, help="Listings per user.")
+        parser.add_argument("--images", type=int, default=3, help="Images per listing.")
+        parser.add_argument("--iterations", type=int, default=200, help="Operations per scenario.")
+        parser.add_argument("--warmup", type=int, default=10, help="Untimed operations per scenario.")
+        parser.add_argument("--concurrency", type=int, default=1, help="Threads issuing operations.")
+        parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset to run.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for data and request mix.")
+        parser.add_argument("--output", help="Write results to this JSON file.")
+        parser.add_argument("--keep", action="store_true", help="Leave the seeded rows in the database.")
+
+    def handle(self, *args, **options):
+        scenarios = [s.strip() for s in options["scenarios"].split(",") if s.strip()]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        if "search" in scenarios and connection.vendor != "postgresql":
+            self.stderr.write("Skipping search: full-text search needs PostgreSQL.")
+            scenarios.remove("search")
+        if options["concurrency"] > 1 and connection.vendor == "sqlite" and connection.is_in_memory_db():
+            raise CommandError("--concurrency needs a database shared between threads.")
+
+        self.rng = random.Random(options["seed"])
+        self.factory = RequestFactory()
+        self.prefix = f"bench_{uuid.uuid4().hex[:8]}"
+
+        start = time.perf_counter()
+        self.users, self.listing_ids = self._seed(options["users"], options["listings"], options["images"])
+        self.stdout.write(
+            f"Seeded {len(self.users)} users, {len(self.listing_ids)} listings in {time.perf_counter() - start:.1f}s"
+        )
+        try:
+            results = {}
+            for name in scenarios:
+                results[name] = self._run_scenario(name, options)
+                self._report(name, results[name])
+        finally:
+            if not options["keep"]:
+                self._cleanup()
+
+        if options["output"]:
+            report = {
+                "meta": {
+                    "revision": _git_revision(),
+                    "timestamp": timezone.now().isoformat(),
+                    "python": platform.python_version(),
+                    "database": connection.vendor,
+                    **{k: options[k] for k in ("users", "listings", "images", "iterations", "concurrency", "seed")},
+                },
+                "scenarios": results,
+            }
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Wrote {options['output']}")
+
+    def _seed(self, n_users, per_user, per_listing):
+        password = make_password(PASSWORD)
+        users = User.objects.bulk_create(
+            User(username=f"{self.prefix}_{i}", email=f"{self.prefix}_{i}@example.com", password=password)
+            for i in range(n_users)
+        )
+        if not all(u.pk for u in users):
+            users = list(User.objects.filter(username__startswith=f"{self.prefix}_").order_by("id"))
+        now = timezone.now()
+        listings = Listing.objects.bulk_create(
+            Listing(
+                user=user,
+                title=" ".join(self.rng.sample(WORDS, 3)),
+                description="Seeded for benchmarking.",
+                price=Decimal(self.rng.randint(100, 50000)) / 100,
+                date_listed=now - timedelta(minutes=self.rng.randint(0, 60 * 24 * 90)),
+                sold=self.rng.random() < 0.1,
+            )
+            for user in users
+            for _ in range(per_user)
+        )
+        ids = [l.pk for l in listings] if all(l.pk for l in listings) else list(
+            Listing.objects.filter(user__in=users).values_list("id", flat=True)
+        )
+        ListingImage.objects.bulk_create(
+            (
+                ListingImage(listing_id=pk, image_url=f"https://storage.example.com/{self.prefix}/{pk}/{i}.jpg")
+                for pk in ids
+                for i in range(per_listing)
+            ),
+            batch_size=1000,
+        )
+        for i in range(0, len(ids), 1000):
+            refresh_listing_feed(ids[i:i + 1000])
+        return users, ids
+
+    def _cleanup(self):
+        users = User.objects.filter(username__startswith=f"{self.prefix}_")
+        ListingFeedEntry.objects.filter(seller_id__in=users.values("id")).delete()
+        ListingImage.objects.filter(listing__user__in=users).delete()
+        Listing.objects.filter(user__in=users).delete()
+        users.delete()
+
+    def _operation(self, name):
+        """Return ``(query, variables, user)`` for one operation of a scenario."""
+        rng = self.rng
+        if name == "browse":
+            return BROWSE, {"first": 20}, None
+        if name == "feed":
+            return FEED, {"first": 20}, None
+        if name == "search":
+            return SEARCH, {"search": rng.choice(WORDS)[:4]}, None
+        if name == "detail":
+            return DETAIL, {"id": rng.choice(self.listing_ids)}, None
+        if name == "login":
+            return LOGIN, {"email": rng.choice(self.users).email, "password": PASSWORD}, None
+        if name == "create":
+            title = " ".join(rng.sample(WORDS, 3))
+            urls = [f"https://storage.example.com/{self.prefix}/new/{uuid.uuid4().hex}.jpg"]
+            return CREATE, {"title": title, "price": "25.00", "urls": urls}, rng.choice(self.users)
+        pk = rng.choice(self.listing_ids)
+        owner = Listing.objects.only("user_id").get(pk=pk).user_id
+        user = next(u for u in self.users if u.pk == owner)
+        return UPDATE, {"id": pk, "price": f"{rng.randint(100, 50000) / 100:.2f}"}, user
+
+    def _execute(self, query, variables, user):
+        request = self.factory.post("/graphql/")
+        if user is not None:
+            request._current_user = user
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            result = schema.execute(query, variable_values=variables, context_value=request)
+            elapsed = time.perf_counter() - start
+        if result.errors:
+            raise CommandError(f"{result.errors[0]}")
+        return elapsed, len(queries.captured_queries)
+
+    def _run_scenario(self, name, options):
+        # Operations are generated up front so the request mix is reproducible
+        # for a given --seed regardless of thread scheduling.
+        ops = [self._operation(name) for _ in range(options["warmup"] + options["iterations"])]
+        warmup, timed = ops[: options["warmup"]], ops[options["warmup"]:]
+        for op in warmup:
+            self._execute(*op)
+
+        def worker(chunk):
+            try:
+                return [self._execute(*op) for op in chunk]
+            finally:
+                connections.close_all()
+
+        concurrency = max(1, options["concurrency"])
+        start = time.perf_counter()
+        if concurrency == 1:
+            samples = [self._execute(*op) for op in timed]
+        else:
+            with ThreadPoolExecutor(concurrency) as pool:
+                chunks = pool.map(worker, [timed[i::concurrency] for i in range(concurrency)])
+                samples = [s for chunk in chunks for s in chunk]
+        wall = time.perf_counter() - start
+
+        latencies = sorted(s[0] * 1000 for s in samples)
+        queries = [s[1] for s in samples]
+        return {
+            "iterations": len(samples),
+            "p50_ms": _percentile(latencies, 50),
+            "p90_ms": _percentile(latencies, 90),
+            "p99_ms": _percentile(latencies, 99),
+            "mean_ms": statistics.fmean(latencies) if latencies else None,
+            "max_ms": latencies[-1] if latencies else None,
+            "throughput_ops": len(samples) / wall if wall else None,
+            "queries_mean": statistics.fmean(queries) if queries else None,
+            "queries_max": max(queries, default=None),
+        }
+
+    def _report(self, name, r):
+        self.stdout.write(
+            f"{name:<8} p50 {r['p50_ms']:8.2f} ms  p99 {r['p99_ms']:8.2f} ms  "
+            f"{r['throughput_ops']:8.1f} ops/s  {r['queries_mean']:5.1f} queries (max {r['queries_max']})"
+        )
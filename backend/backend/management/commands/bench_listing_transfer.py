@@ -0,0 +1,90 @@
+import json
+import os
+import resource
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from backend.exports import ListingImporter, export_chunks, read_rows
+from backend.schema import Listing, ListingFeedEntry, ListingImage, ListingImageRendition
+
+
+def _max_rss_mb():
+    # ru_maxrss is KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Import N generated listings through the bulk importer, export them as NDJSON and CSV, and report "
+        "throughput and peak memory. Imported rows are deleted afterwards unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--images", type=int, default=2, help="Images per listing.")
+        parser.add_argument("--sellers", type=int, default=1000)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument("--keep", action="store_true")
+
+    def handle(self, *args, **options):
+        rows, prefix = options["rows"], f"xfer_{uuid.uuid4().hex[:8]}"
+        with tempfile.NamedTemporaryFile("w+", suffix=".ndjson", encoding="utf-8", delete=False) as f:
+            source = f.name
+            now = timezone.now()
+            for i in range(rows):
+                f.write(json.dumps({
+                    "title": f"item {i}",
+                    "description": "Generated for the transfer benchmark.",
+                    "price": f"{(i % 50000) / 100:.2f}",
+                    "date_listed": (now - timedelta(seconds=i)).isoformat(),
+                    "sold": i % 10 == 0,
+                    "seller_username": f"{prefix}_{i % options['sellers']}",
+                    "seller_email": f"{prefix}_{i % options['sellers']}@example.com",
+                    "image_urls": [f"https://storage.example.com/{prefix}/{i}/{n}.jpg" for n in range(options["images"])],
+                }) + "\n")
+        self.stdout.write(f"{connection.vendor}: {rows} rows, {rows * options['images']} images")
+        try:
+            baseline = _max_rss_mb()
+            importer = ListingImporter(batch_size=options["batch_size"])
+            start = time.perf_counter()
+            with open(source, encoding="utf-8") as stream:
+                importer.run(read_rows(stream, "ndjson"))
+            self._report("import", rows, time.perf_counter() - start, baseline)
+
+            for fmt in ("ndjson", "csv"):
+                baseline = _max_rss_mb()
+                start, written = time.perf_counter(), 0
+                with open(os.devnull, "w") as sink:
+                    for chunk in export_chunks(fmt, options["chunk_size"]):
+                        written += len(chunk)
+                        sink.write(chunk)
+                self._report(f"export {fmt}", rows, time.perf_counter() - start, baseline, written)
+        finally:
+            os.unlink(source)
+            if not options["keep"]:
+                self._cleanup(prefix)
+
+    def _report(self, label, rows, elapsed, baseline, written=None):
+        size = f"  {written / 2**20:8.1f} MiB" if written is not None else ""
+        self.stdout.write(
+            f"{label:<13} {elapsed:8.1f} s  {rows / elapsed:9.0f} rows/s  "
+            f"peak RSS +{max(0.0, _max_rss_mb() - baseline):.0f} MiB{size}"
+        )
+
+    def _cleanup(self, prefix):
+        sellers = User.objects.filter(username__startswith=f"{prefix}_").values("id")
+        listings = Listing.objects.filter(user__in=sellers).values("id")
+        # Plain DELETEs: the ORM collector would load every row to run signals.
+        ListingFeedEntry.objects.filter(seller_id__in=sellers)._raw_delete(connection.alias)
+        ListingImageRendition.objects.filter(image__listing__in=listings)._raw_delete(connection.alias)
+        ListingImage.objects.filter(listing__in=listings)._raw_delete(connection.alias)
+        Listing.objects.filter(user__in=sellers)._raw_delete(connection.alias)
+        User.objects.filter(username__startswith=f"{prefix}_")._raw_delete(connection.alias)
@@ -0,0 +1,165 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+# Runs in a fresh interpreter: set Django up, import the ASGI application, then
+# push two requests through it without a server. Prints one JSON line.
+CHILD = r"""
+import asyncio, json, sys, time
+spawned = float(sys.argv[1])
+t0 = time.perf_counter()
+import django
+django.setup()
+t1 = time.perf_counter()
+from backend.asgi import application
+t2 = time.perf_counter()
+
+async def request(body):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/graphql/", "raw_path": b"/graphql/", "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"localhost"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 0), "server": ("localhost", 80),
+    }
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+    response = {}
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+
+    await application(scope, receive, send)
+    return response.get("status")
+
+async def main():
+    body = json.dumps({"query": sys.argv[2]}).encode()
+    start = time.perf_counter()
+    status = await request(body)
+    first = time.perf_counter()
+    await request(body)
+    return status, start, first, time.perf_counter()
+
+status, start, first, second = asyncio.run(main())
+print(json.dumps({
+    "status": status,
+    "setup_ms": (t1 - t0) * 1000,
+    "import_app_ms": (t2 - t1) * 1000,
+    "first_request_ms": (first - start) * 1000,
+    "second_request_ms": (second - first) * 1000,
+    "ready_ms": (time.time() - spawned) * 1000 - (second - first) * 1000,
+    "modules": len(sys.modules),
+}))
+"""
+
+METRICS = ("ready_ms", "setup_ms", "import_app_ms", "first_request_ms", "second_request_ms", "modules")
+
+
+def _import_times(stderr):
+    """Cumulative import time (ms) of each top-level module from ``-X importtime``."""
+    totals = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            cumulative = int(cumulative)
+        except ValueError:
+            continue
+        # Nested imports are indented; only count the outermost ones.
+        if name.startswith("  "):
+            continue
+        totals[name.strip().split(".")[0]] += cumulative / 1000
+    return totals
+
+
+class Command(BaseCommand):
+    help = (
+        "Start fresh interpreters with each settings module and report import time and first-request "
+        "latency of the ASGI application, so cold-start regressions show up before autoscaling does."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--settings-modules", default="backend.settings,backend.settings_api",
+            help="Comma-separated DJANGO_SETTINGS_MODULE values to compare.",
+        )
+        parser.add_argument("--runs", type=int, default=5, help="Fresh processes per settings module.")
+        parser.add_argument("--query", default="{ __typename }", help="GraphQL query for the timed requests.")
+        parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list.")
+        parser.add_argument("--budget-ms", type=float, help="Fail if a median ready_ms exceeds this.")
+        parser.add_argument("--output", help="Write results to this JSON file.")
+
+    def handle(self, *args, **options):
+        results = {}
+        for module in [m.strip() for m in options["settings_modules"].split(",") if m.strip()]:
+            results[module] = self._bench(module, options)
+            self._report(module, results[module], options["top"])
+
+        if options["output"]:
+            report = {
+                "meta": {
+                    "timestamp": timezone.now().isoformat(),
+                    "python": platform.python_version(),
+                    "runs": options["runs"],
+                    "query": options["query"],
+                },
+                "profiles": results,
+            }
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Wrote {options['output']}")
+
+        budget = options["budget_ms"]
+        over = [m for m, r in results.items() if budget is not None and r["median"]["ready_ms"] > budget]
+        if over:
+            raise CommandError(f"Startup over the {budget:.0f} ms budget: {', '.join(over)}")
+
+    def _bench(self, module, options):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": module}
+        runs, imports = [], defaultdict(list)
+        for _ in range(options["runs"]):
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", CHILD, repr(time.time()), options["query"]],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, timeout=120,
+            )
+            lines = proc.stdout.strip().splitlines()
+            if proc.returncode or not lines:
+                tail = "\n".join(proc.stderr.strip().splitlines()[-5:])
+                raise CommandError(f"{module}: startup failed\n{tail}")
+            run = json.loads(lines[-1])
+            if run["status"] != 200:
+                raise CommandError(f"{module}: first request returned HTTP {run['status']}")
+            runs.append(run)
+            for name, ms in _import_times(proc.stderr).items():
+                imports[name].append(ms)
+        median = {k: statistics.median(r[k] for r in runs) for k in METRICS}
+        slowest = sorted(((statistics.median(v), k) for k, v in imports.items()), reverse=True)
+        return {
+            "median": median,
+            "max": {k: max(r[k] for r in runs) for k in METRICS},
+            "imports_ms": {name: ms for ms, name in slowest[: options["top"]]},
+        }
+
+    def _report(self, module, result, top):
+        m = result["median"]
+        self.stdout.write(
+            f"{module}: ready {m['ready_ms']:.0f} ms (setup {m['setup_ms']:.0f}, app import "
+            f"{m['import_app_ms']:.0f}, first request {m['first_request_ms']:.1f}, "
+            f"second {m['second_request_ms']:.1f}), {m['modules']:.0f} modules"
+        )
+        for name, ms in list(result["imports_ms"].items())[:top]:
+            self.stdout.write(f"    {ms:8.1f} ms  {name}")
@@ -0,0 +1,25 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from backend.exports import FORMATS, export_chunks, export_database
+
+
+class Command(BaseCommand):
+    help = "Stream every listing with its images and seller as NDJSON or CSV, in constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(FORMATS), default="ndjson")
+        parser.add_argument("--output", default="-", help="File to write, or - for stdout.")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched per round trip.")
+        parser.add_argument("--database", default=None, help="Alias to read from (default: replica if configured).")
+
+    def handle(self, *args, **options):
+        using = options["database"] or export_database()
+        out = sys.stdout if options["output"] == "-" else open(options["output"], "w", newline="", encoding="utf-8")
+        try:
+            for chunk in export_chunks(options["format"], options["chunk_size"], using):
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout:
+                out.close()
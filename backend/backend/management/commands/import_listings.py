@@ -0,0 +1,42 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.exports import FORMATS, ListingImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = "Load listings from an NDJSON or CSV export (COPY on Postgres, bulk_create elsewhere)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Export file, or - for stdin.")
+        parser.add_argument("--format", choices=sorted(FORMATS), help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--keep-ids", action="store_true", help="Reuse the exported listing ids.")
+        parser.add_argument("--no-create-sellers", action="store_true", help="Skip rows whose seller does not exist.")
+        parser.add_argument("--queue-images", action="store_true", help="Queue imported images for processing.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or path.rsplit(".", 1)[-1].lower()
+        if fmt not in FORMATS:
+            raise CommandError("Pass --format ndjson or --format csv.")
+        importer = ListingImporter(
+            batch_size=options["batch_size"],
+            keep_ids=options["keep_ids"],
+            create_sellers=not options["no_create_sellers"],
+            queue_images=options["queue_images"],
+        )
+        start = time.perf_counter()
+        stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        try:
+            importer.run(read_rows(stream, fmt))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"Imported {importer.imported} listings and {importer.images} images in {elapsed:.1f}s"
+            f" ({importer.imported / elapsed if elapsed else 0:.0f} listings/s); skipped {importer.skipped}."
+        )
@@ -0,0 +1,84 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import storages
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from backend.images import fetch_and_render, store_variants
+from backend.response_cache import invalidate_listings
+from backend.schema import ListingImageRendition
+
+MAX_ATTEMPTS = 3
+# A row stuck in PROCESSING this long belonged to a worker that died.
+STALE_AFTER = timedelta(minutes=10)
+
+
+class Command(BaseCommand):
+    help = "Render resized WebP/AVIF variants and placeholders for new listing images."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Process one batch and exit.")
+        parser.add_argument("--batch-size", type=int, default=32)
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds to sleep when idle.")
+        parser.add_argument(
+            "--processes", type=int, default=getattr(settings, "IMAGE_PIPELINE_PROCESSES", None),
+            help="Decoder processes (defaults to the CPU count).",
+        )
+
+    def handle(self, *args, **options):
+        storage = storages["listing_images"]
+        with ProcessPoolExecutor(max_workers=options["processes"]) as pool:
+            while True:
+                claimed = self._claim(options["batch_size"])
+                if claimed:
+                    self._process(pool, storage, claimed)
+                if options["once"]:
+                    break
+                if not claimed:
+                    time.sleep(options["interval"])
+
+    def _claim(self, limit):
+        stale = timezone.now() - STALE_AFTER
+        with transaction.atomic():
+            rows = list(
+                ListingImageRendition.objects.select_for_update(skip_locked=True)
+                .select_related("image__listing")
+                .filter(
+                    Q(status=ListingImageRendition.PENDING)
+                    | Q(status=ListingImageRendition.PROCESSING, updated_at__lt=stale),
+                    attempts__lt=MAX_ATTEMPTS,
+                )
+                .order_by("updated_at")[:limit]
+            )
+            ListingImageRendition.objects.filter(pk__in=[r.pk for r in rows]).update(
+                status=ListingImageRendition.PROCESSING, attempts=F("attempts") + 1, updated_at=timezone.now()
+            )
+        return rows
+
+    def _process(self, pool, storage, rows):
+        futures = {pool.submit(fetch_and_render, row.image.image_url): row for row in rows}
+        for future in as_completed(futures):
+            row = futures[future]
+            try:
+                variants, placeholder = future.result()
+                row.variants = store_variants(storage, row.pk, variants)
+                row.placeholder = placeholder
+                row.status = ListingImageRendition.READY
+                row.error = ""
+            except Exception as exc:
+                row.status = (
+                    ListingImageRendition.FAILED if row.attempts + 1 >= MAX_ATTEMPTS else ListingImageRendition.PENDING
+                )
+                row.error = str(exc)[:1000]
+                self.stderr.write(f"image {row.pk}: {exc}")
+            row.save(update_fields=["variants", "placeholder", "status", "error", "updated_at"])
+            if row.status == ListingImageRendition.READY:
+                # Cached listing responses embed the old image URLs.
+                listing = row.image.listing
+                invalidate_listings([listing.id], [listing.user_id])
+        self.stdout.write(f"Processed {len(rows)} image(s).")
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from backend.feed import refresh_listing_feed
+from backend.response_cache import invalidate_listings
+from backend.schema import Listing, ListingFeedEntry
+
+
+class Command(BaseCommand):
+    help = "Backfill or repair the listing_feed read model from listings, listing_images and auth_user."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        size = options["batch_size"]
+        last_id, done = 0, 0
+        while True:
+            ids = list(Listing.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:size])
+            if not ids:
+                break
+            with transaction.atomic():
+                refresh_listing_feed(ids)
+            last_id, done = ids[-1], done + len(ids)
+        with transaction.atomic():
+            orphans, _ = ListingFeedEntry.objects.exclude(id__in=Listing.objects.values("id")).delete()
+            invalidate_listings()
+        self.stdout.write(f"Rebuilt {done} feed rows, removed {orphans} orphans in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = []
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX IF NOT EXISTS listings_sold_date_id_idx "
+                "ON listings (sold, date_listed DESC NULLS LAST, id DESC);"
+            ),
+            reverse_sql="DROP INDEX IF EXISTS listings_sold_date_id_idx;",
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX IF NOT EXISTS listings_user_sold_date_id_idx "
+                "ON listings (user_id, sold, date_listed DESC NULLS LAST, id DESC);"
+            ),
+            reverse_sql="DROP INDEX IF EXISTS listings_user_sold_date_id_idx;",
+        ),
+    ]
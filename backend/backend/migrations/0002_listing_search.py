@@ -0,0 +1,31 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0001_listing_keyset_index"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunSQL(
+            sql=(
+                "ALTER TABLE listings ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                "GENERATED ALWAYS AS ("
+                "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+                ") STORED;"
+            ),
+            reverse_sql="ALTER TABLE listings DROP COLUMN IF EXISTS search_vector;",
+        ),
+        migrations.RunSQL(
+            sql="CREATE INDEX IF NOT EXISTS listings_search_vector_idx ON listings USING gin (search_vector);",
+            reverse_sql="DROP INDEX IF EXISTS listings_search_vector_idx;",
+        ),
+        migrations.RunSQL(
+            sql="CREATE INDEX IF NOT EXISTS listings_title_trgm_idx ON listings USING gin (title gin_trgm_ops);",
+            reverse_sql="DROP INDEX IF EXISTS listings_title_trgm_idx;",
+        ),
+    ]
@@ -0,0 +1,54 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0002_listing_search"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # listings and listing_images are not managed by Django; these only
+        # register them in the migration state so managed tables can point at them.
+        migrations.CreateModel(
+            name="Listing",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("title", models.CharField(max_length=255)),
+                ("description", models.TextField()),
+                ("price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("date_listed", models.DateTimeField(blank=True, db_column="date_listed", null=True)),
+                ("sold", models.BooleanField(default=False)),
+                ("user", models.ForeignKey(db_column="user_id", on_delete=django.db.models.deletion.CASCADE, related_name="listings", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={"db_table": "listings", "managed": False},
+        ),
+        migrations.CreateModel(
+            name="ListingImage",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("image_url", models.TextField()),
+                ("listing", models.ForeignKey(db_column="listing_id", on_delete=django.db.models.deletion.CASCADE, related_name="images", to="backend.listing")),
+            ],
+            options={"db_table": "listing_images", "managed": False},
+        ),
+        migrations.CreateModel(
+            name="ListingImageRendition",
+            fields=[
+                ("image", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="rendition", serialize=False, to="backend.listingimage")),
+                ("status", models.CharField(choices=[("pending", "Pending"), ("processing", "Processing"), ("ready", "Ready"), ("failed", "Failed")], default="pending", max_length=16)),
+                ("variants", models.JSONField(blank=True, default=dict)),
+                ("placeholder", models.TextField(blank=True, default="")),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("error", models.TextField(blank=True, default="")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "listing_image_renditions",
+                "indexes": [models.Index(fields=["status", "updated_at"], name="rendition_status_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0003_listing_image_renditions"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Login and registration look users up by LOWER(email).
+        migrations.RunSQL(
+            sql="CREATE INDEX IF NOT EXISTS auth_user_email_lower_idx ON auth_user (LOWER(email));",
+            reverse_sql="DROP INDEX IF EXISTS auth_user_email_lower_idx;",
+        ),
+    ]
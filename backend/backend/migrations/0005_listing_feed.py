@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0004_user_email_lower_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ListingFeedEntry",
+            fields=[
+                ("id", models.IntegerField(primary_key=True, serialize=False)),
+                ("seller_id", models.IntegerField()),
+                ("seller_name", models.CharField(max_length=301)),
+                ("title", models.CharField(max_length=255)),
+                ("price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("date_listed", models.DateTimeField(blank=True, null=True)),
+                ("sold", models.BooleanField(default=False)),
+                ("cover_image_url", models.TextField(blank=True, default="")),
+                ("image_count", models.PositiveIntegerField(default=0)),
+            ],
+            options={"db_table": "listing_feed"},
+        ),
+        # Same shapes as the listings keyset indexes in 0001, so feed pages are
+        # a single index range scan. Run `manage.py rebuild_listing_feed` after
+        # migrating to backfill existing listings.
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX IF NOT EXISTS listing_feed_sold_date_id_idx "
+                "ON listing_feed (sold, date_listed DESC NULLS LAST, id DESC);"
+            ),
+            reverse_sql="DROP INDEX IF EXISTS listing_feed_sold_date_id_idx;",
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX IF NOT EXISTS listing_feed_seller_sold_date_id_idx "
+                "ON listing_feed (seller_id, sold, date_listed DESC NULLS LAST, id DESC);"
+            ),
+            reverse_sql="DROP INDEX IF EXISTS listing_feed_seller_sold_date_id_idx;",
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0005_listing_feed"),
+    ]
+
+    # Browse filters (sold, listedAfter, minPrice/maxPrice, hasImages) combined
+    # with each sort. NEWEST already seeks on the (sold, date_listed, id)
+    # indexes from 0001/0005, which also serve listedAfter as a range; the
+    # price sorts and price ranges get (sold, price, id) in both directions so
+    # Postgres never has to sort. hasImages is an EXISTS probe on
+    # listing_images(listing_id) for listings and a partial index on the feed.
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE INDEX IF NOT EXISTS listings_sold_price_id_idx ON listings (sold, price, id);",
+            reverse_sql="DROP INDEX IF EXISTS listings_sold_price_id_idx;",
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX IF NOT EXISTS listings_sold_price_desc_id_idx "
+                "ON listings (sold, price DESC NULLS LAST, id DESC);"
+            ),
+            reverse_sql="DROP INDEX IF EXISTS listings_sold_price_desc_id_idx;",
+        ),
+        migrations.RunSQL(
+            sql="CREATE INDEX IF NOT EXISTS listing_images_listing_id_idx ON listing_images (listing_id);",
+            reverse_sql="DROP INDEX IF EXISTS listing_images_listing_id_idx;",
+        ),
+        migrations.RunSQL(
+            sql="CREATE INDEX IF NOT EXISTS listing_feed_sold_price_id_idx ON listing_feed (sold, price, id);",
+            reverse_sql="DROP INDEX IF EXISTS listing_feed_sold_price_id_idx;",
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX IF NOT EXISTS listing_feed_sold_price_desc_id_idx "
+                "ON listing_feed (sold, price DESC NULLS LAST, id DESC);"
+            ),
+            reverse_sql="DROP INDEX IF EXISTS listing_feed_sold_price_desc_id_idx;",
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX IF NOT EXISTS listing_feed_with_images_sold_date_id_idx "
+                "ON listing_feed (sold, date_listed DESC NULLS LAST, id DESC) WHERE image_count > 0;"
+            ),
+            reverse_sql="DROP INDEX IF EXISTS listing_feed_with_images_sold_date_id_idx;",
+        ),
+    ]
@@ -0,0 +1,52 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+# Blocking work (sync ORM calls, GCS signing, password hashing) issued from the
+# async GraphQL view runs here, so a slow call ties up one of these threads
+# rather than the event loop.
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "GRAPHQL_SYNC_WORKERS", 8),
+    thread_name_prefix="graphql-sync",
+)
+
+
+def in_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _call(fn, args, kwargs):
+    close_old_connections()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_sync(fn, *args, **kwargs):
+    return await sync_to_async(_call, thread_sensitive=False, executor=_executor)(fn, args, kwargs)
+
+
+class OffloadSyncResolvers:
+    """Graphene middleware for the async view.
+
+    Root fields whose resolvers are synchronous run on the worker pool;
+    ``native_fields`` are root fields that are already safe to call on the
+    event loop. Nested fields are left alone: the ones that touch the database
+    go through the request's loaders, which batch onto the pool themselves.
+    """
+
+    def __init__(self, native_fields=()):
+        self.native_fields = frozenset(native_fields)
+
+    def resolve(self, next, root, info, **args):
+        if info.path.prev is None and info.field_name not in self.native_fields:
+            return run_sync(next, root, info, **args)
+        return next(root, info, **args)
@@ -0,0 +1,107 @@
+import base64
+from datetime import datetime
+from decimal import Decimal
+
+from django.db import models
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Keys a listing page can be ordered by, with the parser for their cursor
+# value. Rows are ordered by (key, id) in one direction, NULLS LAST, so the
+# seek predicate below stays a plain range.
+_SORT_KEYS = {
+    "date_listed": datetime.fromisoformat,
+    "rank": float,
+    "price": Decimal,
+}
+
+
+def _cursor_tag(key, descending):
+    # Descending cursors keep the bare key so links handed out earlier still work.
+    return key if descending else f"{key}:asc"
+
+
+def encode_cursor(value, pk, key="date_listed", descending=True):
+    if value is None:
+        stamp = ""
+    elif isinstance(value, datetime):
+        stamp = value.isoformat()
+    elif isinstance(value, Decimal):
+        stamp = str(value)
+    else:
+        stamp = repr(value)
+    raw = f"{_cursor_tag(key, descending)}|{stamp}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, key="date_listed", descending=True):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_key, stamp, pk = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 2)
+        if cursor_key != _cursor_tag(key, descending):
+            raise ValueError
+        return (_SORT_KEYS[key](stamp) if stamp else None), int(pk)
+    except (ArithmeticError, ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor.")
+
+
+def _seek(qs, cursor, key, descending=True):
+    """The querysets that, read in turn, continue after ``cursor``.
+
+    Non-null keys come first: ``key <= value`` (``>=`` ascending) bounds the
+    index range scan and the OR only trims the rows tied with the cursor. The
+    NULL tail is a second range, read once the non-null rows run out.
+    """
+    value, pk = decode_cursor(cursor, key, descending)
+    after = "lt" if descending else "gt"
+    tail = qs.filter(**{f"{key}__isnull": True})
+    if value is None:
+        return [tail.filter(**{f"id__{after}": pk})]
+    head = qs.filter(
+        models.Q(**{f"{key}__{after}e": value}),
+        models.Q(**{f"{key}__{after}": value}) | models.Q(**{key: value, f"id__{after}": pk}),
+    )
+    return [head, tail]
+
+
+def clamp_page_size(first):
+    if first is None:
+        return DEFAULT_PAGE_SIZE
+    if first < 0:
+        raise ValueError("`first` must be non-negative.")
+    return min(first, MAX_PAGE_SIZE)
+
+
+def _page_querysets(qs, first, after, key, descending=True):
+    size = clamp_page_size(first)
+    if descending:
+        qs = qs.order_by(models.F(key).desc(nulls_last=True), models.F("id").desc())
+    else:
+        qs = qs.order_by(models.F(key).asc(nulls_last=True), models.F("id").asc())
+    return (_seek(qs, after, key, descending) if after else [qs]), size
+
+
+def keyset_page(qs, first=None, after=None, key="date_listed", descending=True):
+    """Return ``(rows, has_next_page)`` for one page of ``qs`` after ``after``.
+
+    Seeks on ``(key, id)`` instead of using OFFSET, so the cost of a page does
+    not depend on how deep into the result set it is.
+    """
+    parts, size = _page_querysets(qs, first, after, key, descending)
+    rows = []
+    for part in parts:
+        rows.extend(part[: size + 1 - len(rows)])
+        if len(rows) > size:
+            break
+    return rows[:size], len(rows) > size
+
+
+async def akeyset_page(qs, first=None, after=None, key="date_listed", descending=True):
+    parts, size = _page_querysets(qs, first, after, key, descending)
+    rows = []
+    for part in parts:
+        rows.extend([row async for row in part[: size + 1 - len(rows)]])
+        if len(rows) > size:
+            break
+    return rows[:size], len(rows) > size
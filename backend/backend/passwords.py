@@ -0,0 +1,135 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.contrib.auth import hashers
+
+WORKERS = getattr(settings, "PASSWORD_HASH_WORKERS", 2)
+MAX_PENDING = getattr(settings, "PASSWORD_HASH_MAX_PENDING", 4)
+TIMEOUT = getattr(settings, "PASSWORD_HASH_TIMEOUT", 5.0)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised instead of queueing when the hashing pool is saturated."""
+
+
+def _init_worker():
+    # Workers start from a clean interpreter (see _mp_context), without Django.
+    django.setup()
+
+
+def _mp_context():
+    # Forking a threaded server process would copy its DB connections and
+    # held locks into the child; start workers from a fresh interpreter.
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def _check(raw, encoded):
+    return hashers.check_password(raw, encoded)
+
+
+def _make(raw):
+    return hashers.make_password(raw)
+
+
+class HashPool:
+    """Runs PBKDF2 off the request threads, in a few dedicated processes.
+
+    At most ``max_pending`` hashes may be queued or running; further callers
+    get ``PasswordHasherBusy`` at once, so a login burst cannot occupy every
+    request thread. ``workers=0`` hashes inline (development). A hash that
+    outlives ``timeout`` recycles the pool, so a hung worker cannot hold its
+    slot forever.
+    """
+
+    def __init__(self, workers=WORKERS, max_pending=MAX_PENDING, timeout=TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=_mp_context(), initializer=_init_worker
+                )
+            return self._executor
+
+    def _recycle(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        # Killing the workers fails their pending futures, whose callbacks
+        # give the slots back; the next call starts a fresh pool.
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        if not self.workers:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            with self._lock:
+                self._executor = None
+            raise
+        # The slot stays taken until the worker is done or the pool is recycled.
+        future.add_done_callback(lambda f: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            self._recycle(executor)
+            raise PasswordHasherBusy()
+        except BrokenProcessPool:
+            # Recycled because another hash timed out.
+            raise PasswordHasherBusy()
+
+    def check_password(self, raw, encoded):
+        return self.run(_check, raw, encoded)
+
+    def make_password(self, raw):
+        return self.run(_make, raw)
+
+
+hash_pool = HashPool()
+
+
+def verify_user_password(user, raw):
+    """Check ``raw`` against ``user`` (None for an unknown account).
+
+    Unknown accounts still pay for one hash, as ModelBackend does, so response
+    time does not reveal which emails are registered. Hashes made with
+    outdated parameters are upgraded in place.
+    """
+    if user is None or not user.has_usable_password():
+        hash_pool.make_password(raw)
+        return False
+    if not hash_pool.check_password(raw, user.password):
+        return False
+    if hashers.identify_hasher(user.password).must_update(user.password):
+        try:
+            user.password = hash_pool.make_password(raw)
+        except PasswordHasherBusy:
+            return True  # upgrade on a later login
+        user.save(update_fields=["password"])
+    return True
@@ -0,0 +1,165 @@
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from .auth_cache import request_token, token_user_id
+from .offload import run_sync
+
+PATHS = tuple(getattr(settings, "RATE_LIMIT_PATHS", ("/graphql/",)))
+PROXY_COUNT = getattr(settings, "RATE_LIMIT_PROXY_COUNT", 0)
+KEY_PREFIX = "rl:"
+
+
+def _refill(state, now, rate, burst):
+    """Take one token from a bucket; return ``(new_state, retry_after)``.
+
+    ``state`` is ``(tokens, stamp)`` or None for a full bucket. ``retry_after``
+    is 0 when the request may proceed, otherwise the seconds until a token
+    will be available.
+    """
+    tokens, stamp = state or (burst, now)
+    tokens = min(burst, tokens + max(0.0, now - stamp) * rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0.0
+    return (tokens, now), (1 - tokens) / rate
+
+
+class MemoryBackend:
+    """Buckets in this process only; each worker process limits separately."""
+
+    blocking = False
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        now = time.monotonic()
+        with self._lock:
+            state, retry_after = _refill(self._buckets.get(key), now, rate, burst)
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+class DjangoCacheBackend:
+    """Buckets in a Django cache, shared by every process using it.
+
+    The read-modify-write is not atomic, so concurrent requests for one key
+    in different processes can occasionally both spend the same token.
+    """
+
+    blocking = True
+
+    def __init__(self, alias="default"):
+        self.cache = caches[alias]
+
+    def take(self, key, rate, burst):
+        now = time.time()
+        state, retry_after = _refill(self.cache.get(KEY_PREFIX + key), now, rate, burst)
+        # An untouched bucket is full again after burst / rate seconds.
+        self.cache.set(KEY_PREFIX + key, state, timeout=math.ceil(burst / rate) + 1)
+        return retry_after
+
+
+class RateLimiter:
+    """Token buckets keyed by authenticated user, or by client IP for anonymous requests."""
+
+    def __init__(self, backend, ip_rate, ip_burst, user_rate, user_burst):
+        self.backend = backend
+        self.limits = {"ip": (ip_rate, ip_burst), "user": (user_rate, user_burst)}
+
+    def identity(self, request):
+        token = request_token(request)
+        user_id = token_user_id(token) if token else None
+        if user_id is not None:
+            return "user", str(user_id)
+        return "ip", client_ip(request)
+
+    def check(self, scope, ident):
+        """Seconds to wait before retrying, or 0 if the request may proceed."""
+        rate, burst = self.limits[scope]
+        if rate <= 0:
+            return 0.0
+        return self.backend.take(f"{scope}:{ident}", rate, burst)
+
+
+def client_ip(request):
+    if PROXY_COUNT:
+        hops = [h.strip() for h in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if h.strip()]
+        if len(hops) >= PROXY_COUNT:
+            # The entry our outermost trusted proxy appended; earlier ones are client-supplied.
+            return hops[-PROXY_COUNT]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def _build_backend():
+    if getattr(settings, "RATE_LIMIT_BACKEND", "memory") == "django":
+        return DjangoCacheBackend(getattr(settings, "RATE_LIMIT_ALIAS", "default"))
+    return MemoryBackend(maxsize=getattr(settings, "RATE_LIMIT_MEMORY_SIZE", 10000))
+
+
+rate_limiter = RateLimiter(
+    _build_backend(),
+    ip_rate=getattr(settings, "RATE_LIMIT_IP_PER_SECOND", 10),
+    ip_burst=getattr(settings, "RATE_LIMIT_IP_BURST", 50),
+    user_rate=getattr(settings, "RATE_LIMIT_USER_PER_SECOND", 10),
+    user_burst=getattr(settings, "RATE_LIMIT_USER_BURST", 50),
+)
+
+
+def _too_many_requests(retry_after):
+    body = {"errors": [{"message": "Too many requests. Please slow down.", "extensions": {"code": "RATE_LIMITED"}}]}
+    response = HttpResponse(json.dumps(body), status=429, content_type="application/json")
+    response["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+class RateLimitMiddleware:
+    """Refuse requests to RATE_LIMIT_PATHS with 429 once their bucket is empty.
+
+    Runs before the view, so a refused request costs no database work; users
+    are identified from the verified bearer token alone.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "RATE_LIMIT_ENABLED", True)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _limited(self, request):
+        return self.enabled and request.method != "OPTIONS" and request.path.startswith(PATHS)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self._limited(request):
+            retry_after = rate_limiter.check(*rate_limiter.identity(request))
+            if retry_after:
+                return _too_many_requests(retry_after)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self._limited(request):
+            scope, ident = rate_limiter.identity(request)
+            if rate_limiter.backend.blocking:
+                retry_after = await run_sync(rate_limiter.check, scope, ident)
+            else:
+                retry_after = rate_limiter.check(scope, ident)
+            if retry_after:
+                return _too_many_requests(retry_after)
+        return await self.get_response(request)
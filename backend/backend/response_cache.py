@@ -0,0 +1,202 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from graphql import OperationType, get_operation_ast, parse, print_ast
+from graphql.execution.values import get_argument_values
+from graphql.language import FieldNode
+
+VERSION_PREFIX = "rcv:"
+ENTRY_PREFIX = "rc:"
+ALL_LISTINGS = "listings"
+
+
+def _listing_deps(args):
+    return [f"listing:{args.get('id')}"]
+
+
+def _listings_deps(args):
+    # Owner-scoped pages only change when that owner's listings do; any other
+    # browse/search page can be affected by every listing write.
+    owner_id = args.get("owner_id")
+    return [f"owner:{owner_id}"] if owner_id else [ALL_LISTINGS]
+
+
+# Root query fields whose results are identical for every caller, mapped to
+# the version keys their result depends on.
+CACHEABLE_FIELDS = {
+    "listing": _listing_deps,
+    "listings": _listings_deps,
+    "listingFeed": _listings_deps,
+    "listingFacets": _listings_deps,
+}
+
+
+class MemoryBackend:
+    """Per-process LRU. Versions are local too, so use it single-process."""
+
+    blocking = False
+
+    def __init__(self, maxsize=1000):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                if entry[0] is not None and entry[0] <= now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                found[key] = entry[1]
+        return found
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def set(self, key, value, timeout=None):
+        expires = time.monotonic() + timeout if timeout else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class DjangoCacheBackend:
+    """Stores entries and versions in a Django cache, shared by all processes."""
+
+    blocking = True
+
+    def __init__(self, alias="default"):
+        self.cache = caches[alias]
+
+    def get_many(self, keys):
+        return self.cache.get_many(keys)
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value, timeout=None):
+        self.cache.set(key, value, timeout=timeout)
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl=60, max_age=0, recent_window=0):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_age = max_age
+        self.recent_window = recent_window
+
+    def dependencies(self, graphql_schema, document, operation_name, variables):
+        """Version keys the operation depends on, or None if it is not cacheable."""
+        operation = get_operation_ast(document, operation_name)
+        if operation is None or operation.operation != OperationType.QUERY:
+            return None
+        deps = []
+        for node in operation.selection_set.selections:
+            if not isinstance(node, FieldNode) or node.directives:
+                return None
+            name = node.name.value
+            if name == "__typename":
+                continue
+            deps_for = CACHEABLE_FIELDS.get(name)
+            if deps_for is None:
+                return None
+            field_def = graphql_schema.query_type.fields[name]
+            try:
+                args = get_argument_values(field_def, node, variables or {})
+            except Exception:
+                return None
+            deps.extend(deps_for(args))
+        return sorted(set(deps)) or None
+
+    def _versions(self, deps):
+        return self.backend.get_many([VERSION_PREFIX + d for d in deps])
+
+    def key(self, query, operation_name, variables, deps, versions=None):
+        if versions is None:
+            versions = self._versions(deps)
+        material = json.dumps(
+            [
+                normalized_query_hash(query),
+                operation_name,
+                variables or {},
+                [[d, versions.get(VERSION_PREFIX + d, 0)] for d in deps],
+            ],
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        return self.backend.get(ENTRY_PREFIX + key)
+
+    def lookup(self, query, operation_name, variables, deps):
+        """Return ``(key, cached body or None, written_recently)``.
+
+        ``written_recently`` is True when a dependency was bumped less than
+        ``recent_window`` seconds ago. A replica may not have that write yet,
+        so the result to cache under the new key must come from the primary.
+        """
+        versions = self._versions(deps)
+        key = self.key(query, operation_name, variables, deps, versions)
+        newest = max(versions.values(), default=0)
+        return key, self.get(key), time.time_ns() - newest < self.recent_window * 1_000_000_000
+
+    def set(self, key, body):
+        self.backend.set(ENTRY_PREFIX + key, body, timeout=self.ttl)
+
+    def bump(self, deps):
+        stamp = time.time_ns()
+        for dep in set(deps):
+            self.backend.set(VERSION_PREFIX + dep, stamp)
+
+    def headers(self, key):
+        return {
+            "ETag": f'"{key[:32]}"',
+            "Cache-Control": f"public, max-age={self.max_age}, must-revalidate",
+            "Vary": "Accept-Encoding",
+        }
+
+
+@lru_cache(maxsize=256)
+def normalized_query_hash(query):
+    # Whitespace and comments do not change the key.
+    return hashlib.sha256(print_ast(parse(query, no_location=True)).encode("utf-8")).hexdigest()
+
+
+def _build_backend():
+    kind = getattr(settings, "RESPONSE_CACHE_BACKEND", "django")
+    if kind == "django":
+        return DjangoCacheBackend(getattr(settings, "RESPONSE_CACHE_ALIAS", "default"))
+    return MemoryBackend(maxsize=getattr(settings, "RESPONSE_CACHE_SIZE", 1000))
+
+
+response_cache = ResponseCache(
+    _build_backend(),
+    ttl=getattr(settings, "RESPONSE_CACHE_TTL", 60),
+    max_age=getattr(settings, "RESPONSE_CACHE_MAX_AGE", 0),
+    recent_window=getattr(settings, "DB_REPLICA_MAX_LAG", 0),
+)
+
+
+def invalidate_listings(listing_ids=(), owner_ids=()):
+    """Bump the versions covering these listings once the transaction commits."""
+    deps = [ALL_LISTINGS]
+    deps += [f"listing:{pk}" for pk in listing_ids]
+    deps += [f"owner:{pk}" for pk in owner_ids]
+    transaction.on_commit(lambda: response_cache.bump(deps))
@@ -8,52 +8,43 @@ import jwt
 from datetime import datetime, timedelta
 from decimal import Decimal
 from django.db import models, transaction
+from django.db.models import Count, Exists, Max, Min, OuterRef, Q
+from django.db.models.functions import Lower
+from django.db.models.signals import post_delete
 from django.utils import timezone
 from graphene_django import DjangoObjectType
 from django.contrib.auth.models import User
-from django.contrib.auth import authenticate
 import graphql_jwt
 from django.core.exceptions import PermissionDenied
-from google.cloud import storage
+from .auth_cache import request_token, user_for_token
+from .broker import LISTING_CREATED, LISTING_SOLD, LISTING_UPDATED, broker, listing_updated_topic, publish_listing_events
+from .feed import drop_listing_feed_entry, refresh_listing_feed
+from .gcs import get_signer
+from .loaders import get_loaders, sibling_arguments, then
+from .offload import in_event_loop
+from .pagination import akeyset_page, clamp_page_size, encode_cursor, keyset_page
+from .passwords import PasswordHasherBusy, hash_pool, verify_user_password
+from .response_cache import invalidate_listings
+from .search import search_listings
 
 if not settings.configured:
     django.setup()
 
 GCS_BUCKET_NAME = getattr(settings, "GCS_BUCKET_NAME", None)
 GCS_UPLOAD_PREFIX = getattr(settings, "GCS_UPLOAD_PREFIX", "listings")
+GCS_MAX_BATCH_UPLOADS = getattr(settings, "GCS_MAX_BATCH_UPLOADS", 20)
+BULK_MUTATION_MAX_ITEMS = getattr(settings, "BULK_MUTATION_MAX_ITEMS", 100)
+LISTING_PRICE_BUCKETS = getattr(settings, "LISTING_PRICE_BUCKETS", [0, 10, 25, 50, 100, 250, 500, 1000])
 
 def _current_user(info):
     req = info.context
-    auth = ""
-    # Django's WSGIRequest
-    if hasattr(req, "META"):
-        auth = req.META.get("HTTP_AUTHORIZATION", "") or auth
-    # Django >=2.2 convenience
-    if hasattr(req, "headers"):
-        auth = req.headers.get("Authorization", auth)
-
-    if not auth:
-        return None
-
-    parts = auth.strip().split()
-    if len(parts) == 2 and parts[0].lower() == "bearer":
-        token = parts[1]
-    else:
-        # allow raw token without the "Bearer" prefix, just in case
-        token = auth.strip()
-
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-    except Exception:
-        return None
-
-    uid = payload.get("user_id")
-    if not uid:
-        return None
-    try:
-        return User.objects.get(pk=uid)
-    except User.DoesNotExist:
-        return None
+    # Resolved once per request; every mutation in the operation reuses it.
+    if hasattr(req, "_current_user"):
+        return req._current_user
+    token = request_token(req)
+    user = user_for_token(token) if token else None
+    req._current_user = user
+    return user
 
 
 class Listing(models.Model):
@@ -69,6 +60,8 @@ class Listing(models.Model):
         managed = False
         app_label = "backend"
 
+post_delete.connect(drop_listing_feed_entry, sender=Listing, dispatch_uid="listing_feed_drop_listing")
+
 class ListingImage(models.Model):
     id = models.AutoField(primary_key=True)
     listing = models.ForeignKey(Listing, on_delete=models.CASCADE, db_column="listing_id", related_name="images")
@@ -78,21 +71,283 @@ class ListingImage(models.Model):
         managed = False
         app_label = "backend"
 
+class ListingImageRendition(models.Model):
+    # Resized variants produced by `manage.py process_listing_images`.
+    PENDING = "pending"
+    PROCESSING = "processing"
+    READY = "ready"
+    FAILED = "failed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (PROCESSING, "Processing"), (READY, "Ready"), (FAILED, "Failed")]
+
+    image = models.OneToOneField(ListingImage, on_delete=models.CASCADE, primary_key=True, related_name="rendition")
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    variants = models.JSONField(default=dict, blank=True)
+    placeholder = models.TextField(blank=True, default="")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+    class Meta:
+        db_table = "listing_image_renditions"
+        app_label = "backend"
+        indexes = [models.Index(fields=["status", "updated_at"], name="rendition_status_idx")]
+
+class ListingFeedEntry(models.Model):
+    # Denormalized browse-grid row per listing, kept current by the listing
+    # mutations (see backend/feed.py); `manage.py rebuild_listing_feed` backfills.
+    # Its browse indexes are raw SQL in migration 0005.
+    id = models.IntegerField(primary_key=True)  # the listing's id
+    seller_id = models.IntegerField()
+    seller_name = models.CharField(max_length=301)
+    title = models.CharField(max_length=255)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    date_listed = models.DateTimeField(null=True, blank=True)
+    sold = models.BooleanField(default=False)
+    cover_image_url = models.TextField(blank=True, default="")
+    image_count = models.PositiveIntegerField(default=0)
+    class Meta:
+        db_table = "listing_feed"
+        app_label = "backend"
+
+def _queue_image_processing(images):
+    ListingImageRendition.objects.bulk_create([ListingImageRendition(image=img) for img in images])
+
+def _int_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _int_ids(values):
+    return [pk for pk in map(_int_id, values) if pk is not None]
+
 class UserType(DjangoObjectType):
     class Meta:
         model = User
-        fields = ('id', 'username', 'email', 'first_name', 'last_name')
+        fields = ('id', 'username', 'email', 'first_name', 'last_name', 'listings')
+
+    def resolve_listings(self, info):
+        return get_loaders(info).listings_by_user.load(self.id)
+
+class ImageSize(graphene.Enum):
+    THUMB = "thumb"
+    MEDIUM = "medium"
+    FULL = "full"
+
+class ImageFormat(graphene.Enum):
+    WEBP = "webp"
+    AVIF = "avif"
+
+def rendition_url(image_url, status, variants, size=ImageSize.FULL, format=ImageFormat.WEBP):
+    size, format = getattr(size, "value", size), getattr(format, "value", format)
+    # Until the variants are ready clients get the original upload.
+    if status != ListingImageRendition.READY:
+        return image_url
+    variant = (variants or {}).get(size) or {}
+    return variant.get(format) or variant.get("webp") or image_url
 
 class ListingImageType(DjangoObjectType):
+    url = graphene.String(size=ImageSize(default_value=ImageSize.FULL), format=ImageFormat(default_value=ImageFormat.WEBP))
+    placeholder = graphene.String()
     class Meta:
         model = ListingImage
         fields = ("id", "image_url")
 
+    def resolve_url(self, info, size=ImageSize.FULL, format=ImageFormat.WEBP):
+        def pick(rendition):
+            if rendition is None:
+                return rendition_url(self.image_url, None, None, size, format)
+            return rendition_url(self.image_url, rendition.status, rendition.variants, size, format)
+        return then(get_loaders(info).rendition.load(self.id), pick)
+
+    def resolve_placeholder(self, info):
+        return then(get_loaders(info).rendition.load(self.id), lambda r: (r.placeholder or None) if r else None)
+
 class ListingType(DjangoObjectType):
     class Meta:
         model = Listing
         fields = ("id", "title", "description", "price", "date_listed", "sold", "user", "images")
 
+    def resolve_user(self, info):
+        if Listing.user.is_cached(self):
+            return self.user
+        return get_loaders(info).user.load(self.user_id)
+
+    def resolve_images(self, info):
+        loaders = get_loaders(info)
+        def prime(images):
+            loaders.rendition.prime(img.id for img in images)
+            return images
+        if "images" in getattr(self, "_prefetched_objects_cache", {}):
+            return prime(list(self.images.all()))
+        return then(loaders.images_by_listing.load(self.id), prime)
+
+class ListingConnection(graphene.relay.Connection):
+    class Meta:
+        node = ListingType
+
+    def resolve_edges(self, info):
+        # Synchronous execution resolves each listing's images depth-first, so
+        # queue the whole page's renditions before the first one is loaded.
+        get_loaders(info).rendition.prime(
+            img.id
+            for edge in self.edges
+            for img in getattr(edge.node, "_prefetched_objects_cache", {}).get("images", ())
+        )
+        return self.edges
+
+class ListingSummary(DjangoObjectType):
+    id = graphene.ID(required=True)  # same ID as the listing's ListingType
+    class Meta:
+        model = ListingFeedEntry
+        fields = ("id", "seller_id", "seller_name", "title", "price", "date_listed", "sold", "cover_image_url", "image_count")
+
+class ListingSummaryConnection(graphene.relay.Connection):
+    class Meta:
+        node = ListingSummary
+
+def _build_connection(rows, has_next, after, key, connection=ListingConnection, descending=True):
+    edges = [
+        connection.Edge(node=row, cursor=encode_cursor(getattr(row, key), row.id, key, descending))
+        for row in rows
+    ]
+    page_info = graphene.relay.PageInfo(
+        has_next_page=has_next,
+        has_previous_page=bool(after),
+        start_cursor=edges[0].cursor if edges else None,
+        end_cursor=edges[-1].cursor if edges else None,
+    )
+    return connection(edges=edges, page_info=page_info)
+
+async def _alisting_connection(qs, first=None, after=None, key="date_listed", connection=ListingConnection, descending=True):
+    rows, has_next = await akeyset_page(qs, first=first, after=after, key=key, descending=descending)
+    return _build_connection(rows, has_next, after, key, connection, descending)
+
+def _listing_connection(qs, first=None, after=None, key="date_listed", connection=ListingConnection, descending=True):
+    # Under the async view this hands back a coroutine that uses the async ORM.
+    if in_event_loop():
+        return _alisting_connection(qs, first=first, after=after, key=key, connection=connection, descending=descending)
+    rows, has_next = keyset_page(qs, first=first, after=after, key=key, descending=descending)
+    return _build_connection(rows, has_next, after, key, connection, descending)
+
+class ListingSort(graphene.Enum):
+    NEWEST = "newest"
+    PRICE_ASC = "price_asc"
+    PRICE_DESC = "price_desc"
+
+# Sort -> (key, descending). Each one is backed by a (sold, key, id) index on
+# listings and listing_feed (migrations 0001, 0005 and 0006).
+_SORTS = {
+    "newest": ("date_listed", True),
+    "price_asc": ("price", False),
+    "price_desc": ("price", True),
+}
+
+def _listing_filters(qs, images, owner_field="user_id", owner_id=None, include_sold=False, sold=None,
+                     min_price=None, max_price=None, listed_after=None, has_images=None):
+    """Apply the browse filters shared by `listings`, `listingFeed` and `listingFacets`.
+
+    ``images`` is the "has at least one image" condition for ``qs``'s model.
+    """
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise ValueError("`minPrice` must not be greater than `maxPrice`.")
+    if owner_id:
+        qs = qs.filter(**{owner_field: owner_id})
+    if sold is not None:
+        qs = qs.filter(sold=sold)
+    elif not include_sold:
+        qs = qs.filter(sold=False)
+    if listed_after is not None:
+        qs = qs.filter(date_listed__gt=listed_after)
+    if has_images is not None:
+        qs = qs.filter(images if has_images else ~images)
+    return qs.filter(_price_range(min_price, max_price))
+
+def _price_range(min_price=None, max_price=None):
+    q = Q()
+    if min_price is not None:
+        q &= Q(price__gte=min_price)
+    if max_price is not None:
+        q &= Q(price__lte=max_price)
+    return q
+
+def _has_listing_images():
+    return Exists(ListingImage.objects.filter(listing_id=OuterRef("pk")))
+
+def _sort_key(sort):
+    return _SORTS[getattr(sort, "value", sort) or "newest"]
+
+def _images_by_id():
+    # Same order as the images_by_listing loader and the fast path.
+    return models.Prefetch("images", queryset=ListingImage.objects.order_by("id"))
+
+def listings_queryset(search=None, sort=None, **filters):
+    """Filtered `listings` rows with the ``(key, descending)`` to page them by."""
+    qs = _listing_filters(Listing.objects.all(), _has_listing_images(), **filters)
+    if search and search.strip():
+        qs = search_listings(qs, search)
+        if sort is None:
+            return qs, "rank", True
+    return (qs, *_sort_key(sort))
+
+def listing_feed_queryset(sort=None, **filters):
+    qs = _listing_filters(ListingFeedEntry.objects.all(), Q(image_count__gt=0), owner_field="seller_id", **filters)
+    return (qs, *_sort_key(sort))
+
+class PriceBucket(graphene.ObjectType):
+    min = graphene.Decimal(required=True)
+    max = graphene.Decimal()  # null for the open-ended top bucket
+    count = graphene.Int(required=True)
+
+class ListingFacets(graphene.ObjectType):
+    count = graphene.Int(required=True)
+    with_images = graphene.Int(required=True)
+    # The price facets ignore minPrice/maxPrice so a range slider can show the
+    # whole distribution while a range is selected.
+    min_price = graphene.Decimal()
+    max_price = graphene.Decimal()
+    price_buckets = graphene.List(graphene.NonNull(PriceBucket), required=True)
+
+def _price_bounds():
+    bounds = sorted(Decimal(str(b)) for b in LISTING_PRICE_BUCKETS)
+    return list(zip(bounds, bounds[1:] + [None]))
+
+def _facet_aggregates(price_q):
+    """Aggregates for `listingFacets`, all computed in one pass over the rows."""
+    images = Q(_has_listing_images())
+    aggregates = {
+        "count": Count("id", filter=price_q) if price_q else Count("id"),
+        "with_images": Count("id", filter=price_q & images if price_q else images),
+        "min_price": Min("price"),
+        "max_price": Max("price"),
+    }
+    for i, (low, high) in enumerate(_price_bounds()):
+        aggregates[f"bucket_{i}"] = Count("id", filter=_price_range(low) & (Q(price__lt=high) if high is not None else Q()))
+    return aggregates
+
+def _cents(value):
+    # SQLite hands MIN/MAX of a decimal column back via float.
+    return None if value is None else Decimal(value).quantize(Decimal("0.01"))
+
+def _listing_facets(row):
+    return ListingFacets(
+        count=row["count"],
+        with_images=row["with_images"],
+        min_price=_cents(row["min_price"]),
+        max_price=_cents(row["max_price"]),
+        price_buckets=[
+            PriceBucket(min=low, max=high, count=row[f"bucket_{i}"]) for i, (low, high) in enumerate(_price_bounds())
+        ],
+    )
+
+async def _alisting_facets(qs, aggregates):
+    return _listing_facets(await qs.aaggregate(**aggregates))
+
+BUSY_MESSAGE = "Too many sign-in requests right now. Please try again in a moment."
+
+def _users_by_email(email):
+    # Matches the LOWER(email) index from migration 0004.
+    return User.objects.alias(email_lower=Lower("email")).filter(email_lower=email.strip().lower())
+
 class AuthPayload(graphene.ObjectType):
     token = graphene.String()
     user = graphene.Field(UserType)
@@ -105,10 +360,12 @@ class LoginMutation(graphene.Mutation):
         password = graphene.String(required=True)
     Output = AuthPayload
     def mutate(self, info, email, password):
+        user = _users_by_email(email).order_by("id").first()
         try:
-            user = User.objects.get(email=email)
-            user = authenticate(username=user.username, password=password)
-        except User.DoesNotExist:
+            valid = verify_user_password(user, password)
+        except PasswordHasherBusy:
+            return AuthPayload(token=None, user=None, success=False, message=BUSY_MESSAGE)
+        if not valid:
             user = None
         if user is not None and user.is_active:
             payload = {
@@ -134,15 +391,20 @@ class RegisterMutation(graphene.Mutation):
         try:
             if User.objects.filter(username=username).exists():
                 return AuthPayload(token=None, user=None, success=False, message="Username already exists")
-            if User.objects.filter(email=email).exists():
+            if _users_by_email(email).exists():
                 return AuthPayload(token=None, user=None, success=False, message="Email already exists")
-            user = User.objects.create_user(
-                username=username,
-                email=email,
-                password=password,
+            try:
+                encoded = hash_pool.make_password(password)
+            except PasswordHasherBusy:
+                return AuthPayload(token=None, user=None, success=False, message=BUSY_MESSAGE)
+            user = User(
+                username=User.normalize_username(username),
+                email=User.objects.normalize_email(email),
+                password=encoded,
                 first_name=first_name,
                 last_name=last_name
             )
+            user.save()
             payload = {
                 'user_id': user.id,
                 'username': user.username,
@@ -154,55 +416,117 @@ class RegisterMutation(graphene.Mutation):
             return AuthPayload(token=None, user=None, success=False, message=f"Registration failed: {str(e)}")
 
 class Query(graphene.ObjectType):
-    users = graphene.List(UserType)
+    # Pages in id order: pass the last id of one page as `after` to get the next.
+    users = graphene.List(UserType, first=graphene.Int(), after=graphene.ID())
     user = graphene.Field(UserType, id=graphene.Int(required=True))
     me = graphene.Field(UserType)
 
-    listings = graphene.List(
-        ListingType,
+    listings = graphene.Field(
+        ListingConnection,
+        search=graphene.String(),
+        owner_id=graphene.Int(),
+        include_sold=graphene.Boolean(default_value=False),
+        sold=graphene.Boolean(),
+        min_price=graphene.Decimal(),
+        max_price=graphene.Decimal(),
+        listed_after=graphene.DateTime(),
+        has_images=graphene.Boolean(),
+        sort=ListingSort(description="Defaults to NEWEST, or to relevance when searching."),
+        first=graphene.Int(),
+        after=graphene.String(),
+    )
+    # Grid/browse variant of `listings`, served from the listing_feed read model.
+    listing_feed = graphene.Field(
+        ListingSummaryConnection,
+        owner_id=graphene.Int(),
+        include_sold=graphene.Boolean(default_value=False),
+        sold=graphene.Boolean(),
+        min_price=graphene.Decimal(),
+        max_price=graphene.Decimal(),
+        listed_after=graphene.DateTime(),
+        has_images=graphene.Boolean(),
+        sort=ListingSort(),
+        first=graphene.Int(),
+        after=graphene.String(),
+    )
+    # Counts and a price histogram for the listings the same filters would return.
+    listing_facets = graphene.Field(
+        graphene.NonNull(ListingFacets),
         search=graphene.String(),
         owner_id=graphene.Int(),
         include_sold=graphene.Boolean(default_value=False),
         sold=graphene.Boolean(),
+        min_price=graphene.Decimal(),
+        max_price=graphene.Decimal(),
+        listed_after=graphene.DateTime(),
+        has_images=graphene.Boolean(),
     )
     listing = graphene.Field(ListingType, id=graphene.ID(required=True))
-    my_listings = graphene.List(ListingType, include_sold=graphene.Boolean(default_value=False))
+    my_listings = graphene.Field(
+        ListingConnection,
+        include_sold=graphene.Boolean(default_value=False),
+        first=graphene.Int(),
+        after=graphene.String(),
+    )
 
-    def resolve_users(self, info):
-        return User.objects.all()
+    def resolve_users(self, info, first=None, after=None):
+        qs = User.objects.order_by("id")
+        if after is not None:
+            after_id = _int_id(after)
+            if after_id is None:
+                raise ValueError("Invalid `after` id.")
+            # Seek on the primary key rather than OFFSET, as the listing connections do.
+            qs = qs.filter(id__gt=after_id)
+        users = list(qs[: clamp_page_size(first)])
+        get_loaders(info).listings_by_user.prime(u.id for u in users)
+        return users
 
     def resolve_user(self, info, id):
-        return User.objects.get(pk=id)
+        loader = get_loaders(info).user
+        loader.prime(_int_ids(sibling_arguments(info, "id")))
+        user = loader.load(int(id))
+        if user is None:
+            raise User.DoesNotExist("User matching query does not exist.")
+        return user
 
     def resolve_me(self, info):
         return _current_user(info)
 
-    def resolve_listings(self, info, search=None, owner_id=None, include_sold=False, sold=None):
-        qs = Listing.objects.select_related("user").prefetch_related("images").order_by("-date_listed", "-id")
-        if owner_id:
-            qs = qs.filter(user_id=owner_id)
-        if search:
-            qs = qs.filter(models.Q(title__icontains=search) | models.Q(description__icontains=search))
-        if sold is not None:
-            qs = qs.filter(sold=sold)
-        elif not include_sold:
-            qs = qs.filter(sold=False)
-        return qs
+    def resolve_listings(self, info, first=None, after=None, **filters):
+        qs, key, descending = listings_queryset(**filters)
+        qs = qs.select_related("user").prefetch_related(_images_by_id())
+        return _listing_connection(qs, first=first, after=after, key=key, descending=descending)
+
+    def resolve_listing_feed(self, info, first=None, after=None, **filters):
+        qs, key, descending = listing_feed_queryset(**filters)
+        return _listing_connection(
+            qs, first=first, after=after, key=key, connection=ListingSummaryConnection, descending=descending
+        )
+
+    def resolve_listing_facets(self, info, search=None, min_price=None, max_price=None, **filters):
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise ValueError("`minPrice` must not be greater than `maxPrice`.")
+        qs = _listing_filters(Listing.objects.all(), _has_listing_images(), **filters)
+        if search and search.strip():
+            qs = search_listings(qs, search)
+        aggregates = _facet_aggregates(_price_range(min_price, max_price))
+        if in_event_loop():
+            return _alisting_facets(qs, aggregates)
+        return _listing_facets(qs.aggregate(**aggregates))
 
     def resolve_listing(self, info, id):
-        try:
-            return Listing.objects.select_related("user").prefetch_related("images").get(pk=id)
-        except Listing.DoesNotExist:
-            return None
+        loader = get_loaders(info).listing
+        loader.prime(_int_ids(sibling_arguments(info, "id")))
+        return loader.load(int(id))
 
-    def resolve_my_listings(self, info, include_sold=False):
+    def resolve_my_listings(self, info, include_sold=False, first=None, after=None):
         user = _current_user(info)
         if not user:
-            return []
-        qs = Listing.objects.filter(user=user).prefetch_related("images").order_by("-date_listed", "-id")
+            return _listing_connection(Listing.objects.none(), first=first)
+        qs = Listing.objects.filter(user=user).prefetch_related(_images_by_id())
         if not include_sold:
             qs = qs.filter(sold=False)
-        return qs
+        return _listing_connection(qs, first=first, after=after)
 
 class ListingPayload(graphene.ObjectType):
     success = graphene.Boolean()
@@ -233,9 +557,12 @@ class CreateListing(graphene.Mutation):
                 sold=False,
             )
             if image_urls:
-                ListingImage.objects.bulk_create(
+                _queue_image_processing(ListingImage.objects.bulk_create(
                     [ListingImage(listing=listing, image_url=url) for url in image_urls]
-                )
+                ))
+            refresh_listing_feed([listing.id])
+            invalidate_listings([listing.id], [user.id])
+            publish_listing_events([listing.id], created=True)
         return ListingPayload(success=True, message="Listing created.", listing=listing)
 
 class UpdateListing(graphene.Mutation):
@@ -272,11 +599,14 @@ class UpdateListing(graphene.Mutation):
                 listing.sold = sold
             listing.save()
             if add_image_urls:
-                ListingImage.objects.bulk_create(
+                _queue_image_processing(ListingImage.objects.bulk_create(
                     [ListingImage(listing=listing, image_url=url) for url in add_image_urls]
-                )
+                ))
             if remove_image_ids:
                 ListingImage.objects.filter(id__in=remove_image_ids, listing=listing).delete()
+            refresh_listing_feed([listing.id])
+            invalidate_listings([listing.id], [listing.user_id])
+            publish_listing_events([listing.id], sold=bool(sold))
         return ListingPayload(success=True, message="Listing updated.", listing=listing)
 
 class SetListingSold(graphene.Mutation):
@@ -295,7 +625,11 @@ class SetListingSold(graphene.Mutation):
         if not (listing.user_id == user.id or user.is_staff):
             raise PermissionDenied("Not allowed to update this listing.")
         listing.sold = sold
-        listing.save(update_fields=["sold"])
+        with transaction.atomic():
+            listing.save(update_fields=["sold"])
+            ListingFeedEntry.objects.filter(pk=listing.id).update(sold=sold)
+            invalidate_listings([listing.id], [listing.user_id])
+            publish_listing_events([listing.id], sold=sold)
         msg = "Listing marked as sold." if sold else "Listing restored."
         return ListingPayload(success=True, message=msg, listing=listing)
 
@@ -313,27 +647,140 @@ class DeleteListingImage(graphene.Mutation):
             return False
         if not (img.listing.user_id == user.id or user.is_staff):
             raise PermissionDenied("Not allowed.")
-        img.delete()
+        with transaction.atomic():
+            img.delete()
+            refresh_listing_feed([img.listing_id])
+            invalidate_listings([img.listing_id], [img.listing.user_id])
+            publish_listing_events([img.listing_id])
         return True
 
+class ListingInput(graphene.InputObjectType):
+    title = graphene.String(required=True)
+    description = graphene.String(required=True)
+    price = graphene.Decimal(required=True)
+    image_urls = graphene.List(graphene.String)
+
+def _check_bulk_size(items):
+    if len(items) > BULK_MUTATION_MAX_ITEMS:
+        raise ValueError(f"At most {BULK_MUTATION_MAX_ITEMS} items per request.")
+
+class CreateListings(graphene.Mutation):
+    class Arguments:
+        input = graphene.List(graphene.NonNull(ListingInput), required=True)
+    Output = graphene.List(ListingPayload)
+    def mutate(self, info, input):
+        _check_bulk_size(input)
+        user = _current_user(info)
+        if not user:
+            return [ListingPayload(success=False, message="Authentication required.", listing=None) for _ in input]
+        results = [None] * len(input)
+        pending = []
+        now = timezone.now()
+        for i, item in enumerate(input):
+            price_dec = Decimal(item.price)
+            if price_dec < Decimal("0"):
+                results[i] = ListingPayload(success=False, message="Price must be non-negative.", listing=None)
+                continue
+            listing = Listing(
+                user=user,
+                title=item.title,
+                description=item.description,
+                price=price_dec,
+                date_listed=now,
+                sold=False,
+            )
+            pending.append((i, listing, item.image_urls or []))
+        with transaction.atomic():
+            Listing.objects.bulk_create([listing for _, listing, _ in pending])
+            images = ListingImage.objects.bulk_create(
+                [ListingImage(listing=listing, image_url=url) for _, listing, urls in pending for url in urls]
+            )
+            if images:
+                _queue_image_processing(images)
+            if pending:
+                created_ids = [listing.id for _, listing, _ in pending]
+                refresh_listing_feed(created_ids)
+                invalidate_listings(created_ids, [user.id])
+                publish_listing_events(created_ids, created=True)
+        for i, listing, _ in pending:
+            results[i] = ListingPayload(success=True, message="Listing created.", listing=listing)
+        return results
+
+class SetListingsSold(graphene.Mutation):
+    class Arguments:
+        ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+        sold = graphene.Boolean(required=True)
+    Output = graphene.List(ListingPayload)
+    def mutate(self, info, ids, sold):
+        _check_bulk_size(ids)
+        user = _current_user(info)
+        if not user:
+            return [ListingPayload(success=False, message="Authentication required.", listing=None) for _ in ids]
+        found = Listing.objects.in_bulk(_int_ids(ids))
+        allowed = {pk: l for pk, l in found.items() if l.user_id == user.id or user.is_staff}
+        with transaction.atomic():
+            if allowed:
+                Listing.objects.filter(pk__in=list(allowed)).update(sold=sold)
+                ListingFeedEntry.objects.filter(pk__in=list(allowed)).update(sold=sold)
+                invalidate_listings(list(allowed), {l.user_id for l in allowed.values()})
+                publish_listing_events(list(allowed), sold=sold)
+        msg = "Listing marked as sold." if sold else "Listing restored."
+        results = []
+        for raw in ids:
+            pk = _int_id(raw)
+            if pk not in found:
+                results.append(ListingPayload(success=False, message="Listing not found.", listing=None))
+            elif pk not in allowed:
+                results.append(ListingPayload(success=False, message="Not allowed to update this listing.", listing=None))
+            else:
+                allowed[pk].sold = sold
+                results.append(ListingPayload(success=True, message=msg, listing=allowed[pk]))
+        return results
+
+class ImageDeletionResult(graphene.ObjectType):
+    id = graphene.ID()
+    success = graphene.Boolean()
+    message = graphene.String()
+
+class DeleteListingImages(graphene.Mutation):
+    class Arguments:
+        ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+    Output = graphene.List(ImageDeletionResult)
+    def mutate(self, info, ids):
+        _check_bulk_size(ids)
+        user = _current_user(info)
+        if not user:
+            return [ImageDeletionResult(id=i, success=False, message="Authentication required.") for i in ids]
+        found = ListingImage.objects.select_related("listing").in_bulk(_int_ids(ids))
+        allowed = {pk: img for pk, img in found.items() if img.listing.user_id == user.id or user.is_staff}
+        with transaction.atomic():
+            if allowed:
+                ListingImage.objects.filter(pk__in=list(allowed)).delete()
+                listing_ids = {img.listing_id for img in allowed.values()}
+                refresh_listing_feed(listing_ids)
+                invalidate_listings(listing_ids, {img.listing.user_id for img in allowed.values()})
+                publish_listing_events(listing_ids)
+        results = []
+        for raw in ids:
+            pk = _int_id(raw)
+            if pk not in found:
+                results.append(ImageDeletionResult(id=raw, success=False, message="Image not found."))
+            elif pk not in allowed:
+                results.append(ImageDeletionResult(id=raw, success=False, message="Not allowed."))
+            else:
+                results.append(ImageDeletionResult(id=raw, success=True, message="Image deleted."))
+        return results
+
 def _secure_name(name: str) -> str:
     base = re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("._")
     return base or f"file_{uuid.uuid4().hex}"
 
 def _signed_put_url(object_name: str, content_type: str, minutes: int = 10):
-    if not GCS_BUCKET_NAME:
-        raise RuntimeError("GCS_BUCKET_NAME is not configured.")
-    client = storage.Client()
-    bucket = client.bucket(GCS_BUCKET_NAME)
-    blob = bucket.blob(object_name)
-    url = blob.generate_signed_url(
-        version="v4",
-        expiration=timedelta(minutes=minutes),
-        method="PUT",
-        content_type=content_type,
-    )
-    public_url = f"https://storage.googleapis.com/{GCS_BUCKET_NAME}/{object_name}"
-    return url, public_url
+    return get_signer().put_url(object_name, content_type, minutes=minutes)
+
+def _upload_object_name(user, filename):
+    safe = _secure_name(filename)
+    return f"{GCS_UPLOAD_PREFIX}/user_{user.id}/{uuid.uuid4().hex}_{safe}"
 
 class UploadURLPayload(graphene.ObjectType):
     signed_url = graphene.String()
@@ -351,11 +798,33 @@ class GenerateListingImageUploadUrl(graphene.Mutation):
         user = _current_user(info)
         if not user:
             raise PermissionDenied("Authentication required.")
-        safe = _secure_name(filename)
-        object_name = f"{GCS_UPLOAD_PREFIX}/user_{user.id}/{uuid.uuid4().hex}_{safe}"
+        object_name = _upload_object_name(user, filename)
         signed_url, public_url = _signed_put_url(object_name, content_type, minutes=10)
         return UploadURLPayload(signed_url=signed_url, public_url=public_url, object_name=object_name)
 
+class UploadFileInput(graphene.InputObjectType):
+    filename = graphene.String(required=True)
+    content_type = graphene.String(required=True)
+
+class GenerateListingImageUploadUrls(graphene.Mutation):
+    class Arguments:
+        files = graphene.List(graphene.NonNull(UploadFileInput), required=True)
+    Output = graphene.List(UploadURLPayload)
+    def mutate(self, info, files):
+        if len(files) > GCS_MAX_BATCH_UPLOADS:
+            raise ValueError(f"At most {GCS_MAX_BATCH_UPLOADS} uploads per request.")
+        if any(not f.content_type.startswith("image/") for f in files):
+            raise ValueError("Only image uploads are allowed.")
+        user = _current_user(info)
+        if not user:
+            raise PermissionDenied("Authentication required.")
+        payloads = []
+        for f in files:
+            object_name = _upload_object_name(user, f.filename)
+            signed_url, public_url = _signed_put_url(object_name, f.content_type, minutes=10)
+            payloads.append(UploadURLPayload(signed_url=signed_url, public_url=public_url, object_name=object_name))
+        return payloads
+
 class Mutation(graphene.ObjectType):
     login = LoginMutation.Field()
     register = RegisterMutation.Field()
@@ -366,6 +835,35 @@ class Mutation(graphene.ObjectType):
     update_listing = UpdateListing.Field()
     set_listing_sold = SetListingSold.Field()
     delete_listing_image = DeleteListingImage.Field()
+    create_listings = CreateListings.Field()
+    set_listings_sold = SetListingsSold.Field()
+    delete_listing_images = DeleteListingImages.Field()
     generate_listing_image_upload_url = GenerateListingImageUploadUrl.Field()
+    generate_listing_image_upload_urls = GenerateListingImageUploadUrls.Field()
+
+def _summary_from_event(row):
+    # Events carry the feed row, so no query is needed per subscriber.
+    return ListingFeedEntry(**{f.attname: f.to_python(row.get(f.attname)) for f in ListingFeedEntry._meta.concrete_fields})
+
+class Subscription(graphene.ObjectType):
+    listing_created = graphene.Field(ListingSummary)
+    listing_updated = graphene.Field(ListingSummary, id=graphene.ID())
+    listing_sold = graphene.Field(ListingSummary)
+
+    async def subscribe_listing_created(root, info):
+        async for row in broker.subscribe(LISTING_CREATED):
+            yield _summary_from_event(row)
+
+    async def subscribe_listing_updated(root, info, id=None):
+        topic = LISTING_UPDATED if id is None else listing_updated_topic(_int_id(id))
+        async for row in broker.subscribe(topic):
+            yield _summary_from_event(row)
+
+    async def subscribe_listing_sold(root, info):
+        async for row in broker.subscribe(LISTING_SOLD):
+            yield _summary_from_event(row)
+
+schema = graphene.Schema(query=Query, mutation=Mutation, subscription=Subscription)
 
-schema = graphene.Schema(query=Query, mutation=Mutation)
+# Root fields whose resolvers are safe to call directly on the event loop.
+ASYNC_ROOT_FIELDS = ("listings", "listingFeed", "listingFacets", "listing")
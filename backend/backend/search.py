@@ -0,0 +1,51 @@
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVectorField,
+    TrigramWordSimilarity,
+)
+from django.db import models
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+SEARCH_CONFIG = "english"
+
+# listings.search_vector is a STORED generated column maintained by Postgres
+# (see migration 0002). It is deliberately not a model field so that plain
+# listing queries never fetch it.
+_SEARCH_VECTOR = RawSQL('"listings"."search_vector"', [], output_field=SearchVectorField())
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _prefix_tsquery(term):
+    # "red bik" -> "red & bik:*", so the word being typed matches as a prefix.
+    tokens = _TOKEN_RE.findall(term.lower())
+    if not tokens:
+        return None
+    tokens[-1] = f"{tokens[-1]}:*"
+    return " & ".join(tokens)
+
+
+def search_listings(qs, term):
+    """Filter ``qs`` to listings matching ``term`` and annotate ``rank``.
+
+    Full-text matches on title/description are ranked with ``ts_rank``; the
+    trigram word similarity on the title is added on top so misspelled terms
+    still match and near-misses sort below exact hits.
+    """
+    term = term.strip()
+    qs = qs.alias(search_vector=_SEARCH_VECTOR)
+    similarity = TrigramWordSimilarity(term, "title")
+    condition = models.Q(title__trigram_word_similar=term)
+    raw = _prefix_tsquery(term)
+    if raw:
+        query = SearchQuery(raw, config=SEARCH_CONFIG, search_type="raw")
+        condition |= models.Q(search_vector=query)
+        rank = SearchRank(models.F("search_vector"), query) + similarity
+    else:
+        rank = similarity
+    # ts_rank returns float4; cast so the value round-trips exactly through a cursor.
+    return qs.annotate(rank=Cast(rank, models.FloatField())).filter(condition)
@@ -16,15 +16,18 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'corsheaders',
     'graphene_django',
     'graphql_jwt',
+    'backend',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'backend.ratelimit.RateLimitMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -53,17 +56,66 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend.wsgi.application'
+ASGI_APPLICATION = 'backend.asgi.application'
 
-DATABASES = {
-    "default": {
+# Connection reuse. DB_POOL=1 gives each worker process a psycopg 3 pool that
+# threads check connections out of per request; otherwise every thread keeps
+# its own connection open for DB_CONN_MAX_AGE seconds. Both re-check a reused
+# connection before handing it out.
+DB_POOL = os.environ.get("DB_POOL", "0") == "1"
+
+
+def _database(host, port):
+    db = {
         "ENGINE": "django.db.backends.postgresql",
         "NAME": os.environ.get("DB_NAME"),
         "USER": os.environ.get("DB_USER"),
         "PASSWORD": os.environ.get("DB_PASSWORD"),
-        "HOST": os.environ.get("DB_HOST"),
-        "PORT": os.environ.get("DB_PORT"),
+        "HOST": host,
+        "PORT": port,
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {"connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", "5"))},
     }
-}
+    if DB_POOL:
+        from psycopg_pool import ConnectionPool
+
+        # Django closes (returns) pooled connections itself; persistence is the pool's job.
+        db["CONN_MAX_AGE"] = 0
+        db["CONN_HEALTH_CHECKS"] = False
+        db["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+            "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", "300")),
+            "check": ConnectionPool.check_connection,
+        }
+    return db
+
+
+DATABASES = {"default": _database(os.environ.get("DB_HOST"), os.environ.get("DB_PORT"))}
+
+# Optional streaming replica. GraphQL queries read from it; mutations, admin
+# and management commands stay on the primary (see backend/db_router.py).
+DB_REPLICA_HOST = os.environ.get("DB_REPLICA_HOST")
+if DB_REPLICA_HOST:
+    DATABASES["replica"] = {
+        **_database(DB_REPLICA_HOST, os.environ.get("DB_REPLICA_PORT", os.environ.get("DB_PORT"))),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["backend.db_router.PrimaryReplicaRouter"]
+# Seconds the replica may trail the primary. Cacheable queries whose listings
+# changed more recently than this read from the primary, so a stale replica
+# result is never cached under the post-write version.
+DB_REPLICA_MAX_LAG = float(os.environ.get("DB_REPLICA_MAX_LAG", "5"))
+
+# Shared cache for state that must agree across worker processes. Without
+# REDIS_URL each process falls back to its own in-memory cache.
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL}}
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -77,6 +129,9 @@ TIME_ZONE = 'UTC'
 USE_I18N = True
 USE_TZ = True
 
+# Creates the unmanaged listings tables in the test database (backend/test_runner.py).
+TEST_RUNNER = "backend.test_runner.UnmanagedModelTestRunner"
+
 GRAPHENE = {
     "SCHEMA": "backend.schema.schema",
     # "MIDDLEWARE": ["graphql_jwt.middleware.JSONWebTokenMiddleware"],
@@ -89,6 +144,16 @@ GRAPHQL_JWT = {
     'JWT_AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Login/registration hash passwords in a small process pool (backend/passwords.py).
+# Beyond MAX_PENDING queued or running hashes, requests are refused immediately.
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", "4"))
+PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", "5"))
+
+# Verified JWT -> user snapshot cache used by schema._current_user.
+AUTH_TOKEN_CACHE_SIZE = int(os.environ.get("AUTH_TOKEN_CACHE_SIZE", "1024"))
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get("AUTH_TOKEN_CACHE_TTL", "60"))
+
 AUTHENTICATION_BACKENDS = [
     "graphql_jwt.backends.JSONWebTokenBackend",
     "django.contrib.auth.backends.ModelBackend",
@@ -101,8 +166,112 @@ CSRF_TRUSTED_ORIGINS = [
 
 STATIC_URL = 'static/'
 
+MEDIA_URL = os.environ.get("MEDIA_URL", "/media/")
+MEDIA_ROOT = Path(os.environ.get("MEDIA_ROOT", BASE_DIR / "media"))
+
+# Where processed listing photo variants are written. Any Django storage
+# backend works; the default keeps them on the local filesystem.
+LISTING_IMAGE_STORAGE_BACKEND = os.environ.get(
+    "LISTING_IMAGE_STORAGE_BACKEND", "django.core.files.storage.FileSystemStorage"
+)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "listing_images": {
+        "BACKEND": LISTING_IMAGE_STORAGE_BACKEND,
+        "OPTIONS": (
+            {"location": MEDIA_ROOT / "listing-images", "base_url": f"{MEDIA_URL}listing-images/"}
+            if LISTING_IMAGE_STORAGE_BACKEND.endswith("FileSystemStorage")
+            else {}
+        ),
+    },
+}
+IMAGE_PIPELINE_PROCESSES = int(os.environ["IMAGE_PIPELINE_PROCESSES"]) if os.environ.get("IMAGE_PIPELINE_PROCESSES") else None
+# Uploads bigger than this are not fetched for processing.
+LISTING_IMAGE_MAX_BYTES = int(os.environ.get("LISTING_IMAGE_MAX_BYTES", str(20 * 2**20)))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Parsed/validated GraphQL documents kept per process, and the cache alias
+# holding automatic persisted query text (shared between processes).
+GRAPHQL_DOCUMENT_CACHE_SIZE = int(os.environ.get("GRAPHQL_DOCUMENT_CACHE_SIZE", "256"))
+PERSISTED_QUERY_CACHE = "default"
+# Registered queries expire after PERSISTED_QUERY_TTL seconds (clients resend the
+# text on a miss); longer query texts are executed but never stored.
+PERSISTED_QUERY_TTL = int(os.environ.get("PERSISTED_QUERY_TTL", "86400"))
+PERSISTED_QUERY_MAX_LENGTH = int(os.environ.get("PERSISTED_QUERY_MAX_LENGTH", "20000"))
+
+# Result cache for public listing queries. "django" uses RESPONSE_CACHE_ALIAS;
+# "memory" is a per-process LRU, only safe with a single worker because a write
+# invalidates the cache of the process that handled it and no other. Off unless
+# REDIS_URL gives the workers a shared store.
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "1" if REDIS_URL else "0") == "1"
+RESPONSE_CACHE_BACKEND = os.environ.get("RESPONSE_CACHE_BACKEND", "django")
+RESPONSE_CACHE_ALIAS = "default"
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "1000"))
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", "60"))
+RESPONSE_CACHE_MAX_AGE = int(os.environ.get("RESPONSE_CACHE_MAX_AGE", "0"))
+# Identical public queries already running in this process share one execution.
+SINGLE_FLIGHT_ENABLED = os.environ.get("SINGLE_FLIGHT_ENABLED", "1") == "1"
+# Serve plain listings/listingFeed queries from values() rows without the
+# per-field GraphQL executor (backend/fastpath.py); output is unchanged.
+GRAPHQL_FAST_LIST_QUERIES = os.environ.get("GRAPHQL_FAST_LIST_QUERIES", "1") == "1"
+
+# Token buckets for /graphql/ (backend/ratelimit.py): per user for requests with
+# a valid bearer token, per client IP otherwise. A rate of 0 disables that bucket.
+# "memory" limits each process separately; "django" shares RATE_LIMIT_ALIAS.
+# Reverse proxies in front of Django that append to X-Forwarded-For; 0 uses
+# REMOTE_ADDR. Behind a proxy every client shares its address, so the limiter
+# stays off by default until the deployment says how many proxies there are.
+RATE_LIMIT_PROXY_COUNT = int(os.environ.get("RATE_LIMIT_PROXY_COUNT", "0"))
+RATE_LIMIT_ENABLED = os.environ.get(
+    "RATE_LIMIT_ENABLED", "1" if "RATE_LIMIT_PROXY_COUNT" in os.environ else "0"
+) == "1"
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "django" if REDIS_URL else "memory")
+RATE_LIMIT_ALIAS = "default"
+RATE_LIMIT_IP_PER_SECOND = float(os.environ.get("RATE_LIMIT_IP_PER_SECOND", "10"))
+RATE_LIMIT_IP_BURST = int(os.environ.get("RATE_LIMIT_IP_BURST", "50"))
+RATE_LIMIT_USER_PER_SECOND = float(os.environ.get("RATE_LIMIT_USER_PER_SECOND", "10"))
+RATE_LIMIT_USER_BURST = int(os.environ.get("RATE_LIMIT_USER_BURST", "50"))
+
+# Cost/depth budget enforced before execution (see backend/complexity.py).
+GRAPHQL_MAX_COST = int(os.environ.get("GRAPHQL_MAX_COST", "1000"))
+GRAPHQL_MAX_DEPTH = int(os.environ.get("GRAPHQL_MAX_DEPTH", "10"))
+
+# Threads available to blocking resolvers under the async /graphql/ view.
+GRAPHQL_SYNC_WORKERS = int(os.environ.get("GRAPHQL_SYNC_WORKERS", "8"))
+
+# GraphQL subscriptions (WebSocket on /graphql/, see backend/asgi.py). "postgres"
+# relays events between workers with LISTEN/NOTIFY; "memory" only reaches clients
+# of the publishing process, so it suits a single worker. Empty picks "postgres"
+# when the default database is Postgres.
+SUBSCRIPTION_BROKER = os.environ.get("SUBSCRIPTION_BROKER", "")
+SUBSCRIPTION_QUEUE_SIZE = int(os.environ.get("SUBSCRIPTION_QUEUE_SIZE", "100"))
+SUBSCRIPTION_MAX_PER_CONNECTION = int(os.environ.get("SUBSCRIPTION_MAX_PER_CONNECTION", "20"))
+
+# Per-resolver and SQL tracing (see backend/tracing.py). Off by default; when
+# enabled, SAMPLE_RATE of requests are traced and fed to the /metrics histograms.
+GRAPHQL_TRACING_ENABLED = os.environ.get("GRAPHQL_TRACING_ENABLED", "0") == "1"
+GRAPHQL_TRACING_SAMPLE_RATE = float(os.environ.get("GRAPHQL_TRACING_SAMPLE_RATE", "0.01"))
+# Return the Apollo tracing and SQL summary in response extensions.
+GRAPHQL_TRACING_EXTENSIONS = os.environ.get("GRAPHQL_TRACING_EXTENSIONS", "1" if DEBUG else "0") == "1"
+# Repeats of one SQL statement in a request that count as an N+1.
+GRAPHQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get("GRAPHQL_N_PLUS_ONE_THRESHOLD", "5"))
+# Bearer token required to scrape /metrics; empty leaves it open.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Upper bound on items in createListings / setListingsSold / deleteListingImages.
+BULK_MUTATION_MAX_ITEMS = int(os.environ.get("BULK_MUTATION_MAX_ITEMS", "100"))
+# Lower bounds of the listingFacets price histogram buckets; the last is open-ended.
+LISTING_PRICE_BUCKETS = [
+    b.strip() for b in os.environ.get("LISTING_PRICE_BUCKETS", "0,10,25,50,100,250,500,1000").split(",") if b.strip()
+]
+
 GCS_BUCKET_NAME = os.environ.get("GCS_BUCKET_NAME")
 GCS_UPLOAD_PREFIX = os.environ.get("GCS_UPLOAD_PREFIX", "listings")
+# Service-account key used to sign upload URLs locally.
+GCS_SIGNING_KEY_FILE = os.environ.get("GCS_SIGNING_KEY_FILE") or os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+# "fake" signs with a throwaway key, for offline development and benchmarks.
+GCS_SIGNING_MODE = os.environ.get("GCS_SIGNING_MODE", "")
+GCS_MAX_BATCH_UPLOADS = int(os.environ.get("GCS_MAX_BATCH_UPLOADS", "20"))
 
@@ -0,0 +1,34 @@
+# backend/settings_api.py
+# API-only profile for the GraphQL containers:
+#   DJANGO_SETTINGS_MODULE=backend.settings_api
+# The endpoints here are JSON with bearer-token auth, so the admin, sessions,
+# messages and static files apps, and the middleware that serves them, are
+# left out; they only add import time and per-request work. Run migrations
+# and the admin with backend.settings.
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS  # noqa: F405
+    if app not in (
+        "django.contrib.admin",
+        "django.contrib.sessions",
+        "django.contrib.messages",
+        "django.contrib.staticfiles",
+    )
+]
+
+MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "corsheaders.middleware.CorsMiddleware",
+    "backend.ratelimit.RateLimitMiddleware",
+    "django.middleware.common.CommonMiddleware",
+]
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [],
+        "APP_DIRS": True,
+        "OPTIONS": {"context_processors": []},
+    },
+]
@@ -0,0 +1,30 @@
+import asyncio
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key onto one execution.
+
+    The first caller starts the work as its own task; callers arriving while
+    it runs await that task instead of repeating it. The task is shielded, so
+    a caller that disconnects does not cancel the others' result. Nothing is
+    kept once the task finishes.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, fn, *args):
+        loop = asyncio.get_running_loop()
+        task = self._calls.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(fn(*args))
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,36 @@
+from django.apps import apps
+from django.db import connections
+from django.db.models.signals import post_migrate
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+def _create_backend_tables(sender, using, **kwargs):
+    connection = connections[using]
+    existing = set(connection.introspection.table_names())
+    missing = [m for m in apps.get_app_config("backend").get_models() if m._meta.db_table not in existing]
+    if missing:
+        with connection.schema_editor() as editor:
+            for model in missing:
+                editor.create_model(model)
+
+
+class UnmanagedModelTestRunner(DiscoverRunner):
+    """Build the backend tables of the test database from the models.
+
+    listings and listing_images are created outside Django, the migrations
+    only add Postgres indexes and columns to them, and the models live in
+    schema.py rather than models.py, so syncdb would skip them. Migrations are
+    turned off for the app and every backend table is created once the test
+    database is migrated (before it is cloned for --parallel).
+    """
+
+    def setup_databases(self, **kwargs):
+        import backend.schema  # noqa: F401  (registers the models)
+
+        post_migrate.connect(_create_backend_tables, dispatch_uid="test_runner_backend_tables")
+        try:
+            with override_settings(MIGRATION_MODULES={"backend": None}):
+                return super().setup_databases(**kwargs)
+        finally:
+            post_migrate.disconnect(dispatch_uid="test_runner_backend_tables")
@@ -0,0 +1,91 @@
+import time
+from unittest import mock
+
+import jwt
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+
+from backend import auth_cache
+from backend.auth_cache import TokenCache, token_cache, user_for_token
+
+
+def _snapshot(user_id):
+    return {"id": user_id, "username": f"user{user_id}", "is_active": True}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+class TokenCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch.object(auth_cache, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_entries_expire_after_the_ttl(self):
+        cache = TokenCache(ttl=60)
+        cache.set("t", _snapshot(1))
+        self.clock.now += 59
+        self.assertEqual(cache.get("t"), _snapshot(1))
+        self.clock.now += 1
+        self.assertIsNone(cache.get("t"))
+
+    def test_entries_never_outlive_the_token(self):
+        cache = TokenCache(ttl=60)
+        cache.set("t", _snapshot(1), token_exp=self.clock.now + 10)
+        self.clock.now += 10
+        self.assertIsNone(cache.get("t"))
+        cache.set("expired", _snapshot(1), token_exp=self.clock.now - 1)
+        self.assertIsNone(cache.get("expired"))
+
+    def test_least_recently_used_entry_is_dropped_past_maxsize(self):
+        cache = TokenCache(maxsize=2)
+        cache.set("a", _snapshot(1))
+        cache.set("b", _snapshot(2))
+        cache.get("a")
+        cache.set("c", _snapshot(3))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual([cache.get("a")["id"], cache.get("c")["id"]], [1, 3])
+        self.assertNotIn(2, cache._tokens_by_user)
+
+
+class UserForTokenTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.user = User.objects.create_user(username="ada", password="old-password")
+        self.token = jwt.encode(
+            {"user_id": self.user.pk, "exp": int(time.time()) + 3600}, settings.SECRET_KEY, algorithm="HS256"
+        )
+
+    def test_cache_hit_skips_the_user_query(self):
+        self.assertEqual(user_for_token(self.token).pk, self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(user_for_token(self.token).username, "ada")
+
+    def test_deactivation_is_seen_on_the_next_request(self):
+        user_for_token(self.token)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(user_for_token(self.token))
+
+    def test_password_change_evicts_the_cached_user(self):
+        user_for_token(self.token)
+        self.user.set_password("new-password")
+        self.user.save()
+        self.assertIsNone(token_cache.get(self.token))
+
+    def test_deleted_user_is_evicted(self):
+        user_for_token(self.token)
+        self.user.delete()
+        self.assertIsNone(user_for_token(self.token))
@@ -0,0 +1,157 @@
+import asyncio
+import json
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+
+from backend import broker as broker_module, schema as schema_module
+from backend.broker import (
+    LISTING_CREATED,
+    LISTING_SOLD,
+    LISTING_UPDATED,
+    Hub,
+    MemoryBroker,
+    PostgresBroker,
+    listing_updated_topic,
+    publish_listing_events,
+)
+from backend.feed import refresh_listing_feed
+from backend.schema import Listing, schema
+from backend.websocket import PROTOCOL, GraphQLWebSocket
+
+
+ROW = {
+    "id": 7, "seller_id": 1, "seller_name": "ada", "title": "lamp", "price": "5.00",
+    "date_listed": "2024-01-01T00:00:00Z", "sold": False, "cover_image_url": "", "image_count": 0,
+}
+
+
+async def _next(stream):
+    return await asyncio.wait_for(stream.__anext__(), 1)
+
+
+async def _subscribed(hub, topic):
+    while not hub.has_subscribers([topic]):
+        await asyncio.sleep(0.01)
+
+
+class HubTests(SimpleTestCase):
+    async def test_events_fan_out_to_every_subscriber_of_the_topic(self):
+        broker = MemoryBroker(Hub())
+        first, second = broker.subscribe(LISTING_CREATED), broker.subscribe(LISTING_CREATED)
+        other = broker.subscribe(LISTING_SOLD)
+        pending = [asyncio.ensure_future(_next(s)) for s in (first, second)]
+        sold = asyncio.ensure_future(_next(other))
+        await _subscribed(broker.hub, LISTING_CREATED)
+        await _subscribed(broker.hub, LISTING_SOLD)
+        self.assertTrue(broker.wants([LISTING_CREATED]))
+        self.assertFalse(broker.wants([LISTING_UPDATED]))
+
+        broker.publish(LISTING_CREATED, {"id": 1})
+        broker.publish(LISTING_UPDATED, {"id": 2})
+        self.assertEqual(await asyncio.gather(*pending), [{"id": 1}, {"id": 1}])
+        await asyncio.sleep(0)
+        self.assertFalse(sold.done())
+        sold.cancel()
+        for stream in (first, second):
+            await stream.aclose()
+        self.assertFalse(broker.wants([LISTING_CREATED]))
+
+    async def test_slow_subscriber_loses_the_oldest_events(self):
+        hub = Hub(queue_size=2)
+        stream = hub.subscribe(LISTING_CREATED)
+        first = asyncio.ensure_future(_next(stream))
+        await _subscribed(hub, LISTING_CREATED)
+        hub.publish(LISTING_CREATED, 0)
+        self.assertEqual(await first, 0)
+        for n in range(1, 4):
+            hub.publish(LISTING_CREATED, n)
+        self.assertEqual([await _next(stream), await _next(stream)], [2, 3])
+        await stream.aclose()
+
+
+class PostgresBrokerTests(SimpleTestCase):
+    def test_notification_carries_only_topic_and_id(self):
+        broker = PostgresBroker()
+        row = {"id": 7, "title": "x" * 10_000}
+        with mock.patch.object(broker_module, "connection") as connection:
+            broker.publish(LISTING_UPDATED, row)
+        cursor = connection.cursor.return_value.__enter__.return_value
+        sql, (channel, payload) = cursor.execute.call_args.args
+        self.assertEqual(json.loads(payload), {"topic": LISTING_UPDATED, "id": 7})
+
+
+class PublishTests(TestCase):
+    def setUp(self):
+        seller = User.objects.create(username="ada")
+        self.listing = Listing.objects.create(user=seller, title="lamp", description="", price=5, sold=True)
+        refresh_listing_feed([self.listing.pk])
+
+    def test_feed_row_is_published_to_each_topic(self):
+        broker = mock.Mock()
+        with mock.patch.object(broker_module, "broker", broker), self.captureOnCommitCallbacks(execute=True):
+            publish_listing_events([self.listing.pk], sold=True)
+        topics = [c.args[0] for c in broker.publish.call_args_list]
+        self.assertEqual(topics, [LISTING_UPDATED, listing_updated_topic(self.listing.pk), LISTING_SOLD])
+        self.assertEqual(broker.publish.call_args.args[1]["title"], "lamp")
+
+    def test_failed_publish_does_not_escape_the_commit(self):
+        broker = mock.Mock()
+        broker.publish.side_effect = RuntimeError("payload string too long")
+        with mock.patch.object(broker_module, "broker", broker), self.assertLogs("django.test"), \
+                self.captureOnCommitCallbacks(execute=True):
+            publish_listing_events([self.listing.pk], created=True)
+        broker.publish.assert_called_once()
+
+
+class DeliveryTests(SimpleTestCase):
+    async def test_listener_loads_the_row_for_local_subscribers(self):
+        broker = PostgresBroker(hub=Hub())
+        stream = broker.hub.subscribe(LISTING_CREATED)
+        event = asyncio.ensure_future(_next(stream))
+        await _subscribed(broker.hub, LISTING_CREATED)
+        row = {"id": 7, "title": "lamp", "price": Decimal("5.00")}
+        with mock.patch.object(broker_module, "_summary_payloads", return_value=[row]) as load:
+            await broker._deliver(LISTING_SOLD, 7)  # nobody listening here: nothing is loaded
+            load.assert_not_called()
+            await broker._deliver(LISTING_CREATED, 7)
+        load.assert_called_once_with([7])
+        self.assertEqual(await event, {"id": 7, "title": "lamp", "price": "5.00"})
+        await stream.aclose()
+
+    async def test_websocket_subscription_receives_published_listing(self):
+        broker = MemoryBroker(Hub())
+        inbox, outbox = asyncio.Queue(), asyncio.Queue()
+
+        async def receive_text():
+            message = await asyncio.wait_for(outbox.get(), 1)
+            return message.get("text") and json.loads(message["text"])
+
+        with mock.patch.object(schema_module, "broker", broker):
+            app = GraphQLWebSocket(schema)
+            scope = {"type": "websocket", "subprotocols": [PROTOCOL]}
+            server = asyncio.ensure_future(app(scope, inbox.get, outbox.put))
+            await inbox.put({"type": "websocket.connect"})
+            for message in (
+                {"type": "connection_init"},
+                {"id": "1", "type": "subscribe", "payload": {"query": "subscription { listingCreated { id title } }"}},
+            ):
+                await inbox.put({"type": "websocket.receive", "text": json.dumps(message)})
+            self.assertEqual((await asyncio.wait_for(outbox.get(), 1))["subprotocol"], PROTOCOL)
+            self.assertEqual(await receive_text(), {"type": "connection_ack"})
+            await _subscribed(broker.hub, LISTING_CREATED)
+            broker.publish(LISTING_CREATED, ROW)
+            self.assertEqual(
+                await receive_text(),
+                {"id": "1", "type": "next", "payload": {"data": {"listingCreated": {"id": "7", "title": "lamp"}}}},
+            )
+            await inbox.put({"type": "websocket.disconnect"})
+            await asyncio.wait_for(server, 1)
+
+    async def test_websocket_without_the_subprotocol_is_refused(self):
+        inbox, outbox = asyncio.Queue(), asyncio.Queue()
+        await inbox.put({"type": "websocket.connect"})
+        await GraphQLWebSocket(schema)({"type": "websocket", "subprotocols": []}, inbox.get, outbox.put)
+        self.assertEqual(await outbox.get(), {"type": "websocket.close", "code": 4406})
@@ -0,0 +1,119 @@
+import time
+from unittest import mock
+
+import jwt
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase
+
+from backend import schema as schema_module
+from backend.feed import refresh_listing_feed
+from backend.schema import Listing, ListingFeedEntry, ListingImage, ListingImageRendition, schema
+
+CREATE = """
+mutation($input: [ListingInput!]!) {
+  createListings(input: $input) { success message listing { id title } }
+}
+"""
+SET_SOLD = """
+mutation($ids: [ID!]!, $sold: Boolean!) {
+  setListingsSold(ids: $ids, sold: $sold) { success message listing { id sold } }
+}
+"""
+DELETE_IMAGES = """
+mutation($ids: [ID!]!) {
+  deleteListingImages(ids: $ids) { id success message }
+}
+"""
+
+
+class BulkMutationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ada = User.objects.create(username="ada")
+        cls.bob = User.objects.create(username="bob")
+        cls.own = Listing.objects.create(user=cls.ada, title="lamp", description="", price=5)
+        cls.other = Listing.objects.create(user=cls.bob, title="chair", description="", price=9)
+        cls.own_image = ListingImage.objects.create(listing=cls.own, image_url="https://example.com/a.jpg")
+        cls.other_image = ListingImage.objects.create(listing=cls.other, image_url="https://example.com/b.jpg")
+        refresh_listing_feed([cls.own.pk, cls.other.pk])
+
+    def execute(self, query, variables, user=None):
+        user = user or self.ada
+        token = jwt.encode({"user_id": user.pk, "exp": int(time.time()) + 600}, settings.SECRET_KEY, algorithm="HS256")
+        request = RequestFactory().post("/graphql/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        return schema.execute(query, variable_values=variables, context_value=request)
+
+    def data(self, query, variables, field, user=None):
+        result = self.execute(query, variables, user)
+        self.assertIsNone(result.errors)
+        return result.data[field]
+
+    def test_create_reports_each_item(self):
+        items = [
+            {"title": "desk", "description": "", "price": "20"},
+            {"title": "broken", "description": "", "price": "-1"},
+            {"title": "shelf", "description": "", "price": "15", "imageUrls": ["https://example.com/s.jpg"]},
+        ]
+        results = self.data(CREATE, {"input": items}, "createListings")
+        self.assertEqual([r["success"] for r in results], [True, False, True])
+        self.assertEqual(results[1]["message"], "Price must be non-negative.")
+        created = [int(results[i]["listing"]["id"]) for i in (0, 2)]
+        feed = ListingFeedEntry.objects.in_bulk(created)
+        self.assertEqual([(feed[pk].title, feed[pk].seller_name, feed[pk].image_count) for pk in created],
+                         [("desk", "ada", 0), ("shelf", "ada", 1)])
+        self.assertFalse(Listing.objects.filter(title="broken").exists())
+        self.assertEqual(ListingImageRendition.objects.get().image.listing_id, created[1])
+
+    def test_set_sold_refuses_other_users_listings_per_item(self):
+        ids = [str(self.own.pk), str(self.other.pk), "999999", "nope"]
+        results = self.data(SET_SOLD, {"ids": ids, "sold": True}, "setListingsSold")
+        self.assertEqual(
+            [(r["success"], r["message"]) for r in results],
+            [
+                (True, "Listing marked as sold."),
+                (False, "Not allowed to update this listing."),
+                (False, "Listing not found."),
+                (False, "Listing not found."),
+            ],
+        )
+        self.assertEqual(results[0]["listing"], {"id": str(self.own.pk), "sold": True})
+        sold = dict(Listing.objects.values_list("pk", "sold"))
+        self.assertEqual((sold[self.own.pk], sold[self.other.pk]), (True, False))
+
+    def test_sold_flags_are_mirrored_into_the_feed(self):
+        self.data(SET_SOLD, {"ids": [str(self.own.pk)], "sold": True}, "setListingsSold")
+        self.assertEqual(dict(ListingFeedEntry.objects.values_list("pk", "sold")), {self.own.pk: True, self.other.pk: False})
+        self.data(SET_SOLD, {"ids": [str(self.own.pk)], "sold": False}, "setListingsSold")
+        self.assertFalse(ListingFeedEntry.objects.get(pk=self.own.pk).sold)
+
+    def test_delete_images_refuses_other_users_images_per_item(self):
+        ids = [str(self.own_image.pk), str(self.other_image.pk), "999999"]
+        results = self.data(DELETE_IMAGES, {"ids": ids}, "deleteListingImages")
+        self.assertEqual(
+            [(r["id"], r["success"], r["message"]) for r in results],
+            [(ids[0], True, "Image deleted."), (ids[1], False, "Not allowed."), (ids[2], False, "Image not found.")],
+        )
+        self.assertEqual(list(ListingImage.objects.values_list("pk", flat=True)), [self.other_image.pk])
+        counts = dict(ListingFeedEntry.objects.values_list("pk", "image_count"))
+        self.assertEqual((counts[self.own.pk], counts[self.other.pk]), (0, 1))
+
+    def test_staff_may_act_on_any_listing(self):
+        staff = User.objects.create(username="mod", is_staff=True)
+        results = self.data(SET_SOLD, {"ids": [str(self.other.pk)], "sold": True}, "setListingsSold", user=staff)
+        self.assertTrue(results[0]["success"])
+
+    def test_batches_over_the_cap_are_rejected(self):
+        cases = [
+            ("createListings", CREATE, {"input": [{"title": "x", "description": "", "price": "1"}] * 3}),
+            ("setListingsSold", SET_SOLD, {"ids": [str(self.own.pk)] * 3, "sold": True}),
+            ("deleteListingImages", DELETE_IMAGES, {"ids": [str(self.own_image.pk)] * 3}),
+        ]
+        with mock.patch.object(schema_module, "BULK_MUTATION_MAX_ITEMS", 2):
+            for field, query, variables in cases:
+                with self.subTest(field=field):
+                    result = self.execute(query, variables)
+                    self.assertIn("At most 2 items per request.", str(result.errors))
+        self.assertEqual(Listing.objects.count(), 2)
+        self.assertFalse(ListingFeedEntry.objects.filter(sold=True).exists())
+        self.assertEqual(ListingImage.objects.count(), 2)
@@ -0,0 +1,32 @@
+from django.test import SimpleTestCase
+from graphql import parse
+
+from backend.complexity import analyze
+from backend.pagination import DEFAULT_PAGE_SIZE
+from backend.schema import schema
+
+CONNECTIONS = {
+    "listings": "edges { node { id title user { username } images { url } } }",
+    "myListings": "edges { node { id title images { url } } }",
+    "listingFeed": "edges { node { id title sellerName } }",
+}
+
+
+class ComplexityTests(SimpleTestCase):
+    def cost(self, query, variables=None):
+        return analyze(schema.graphql_schema, parse(query), variables=variables)[0]
+
+    def test_connection_without_first_costs_a_default_page(self):
+        for field, selection in CONNECTIONS.items():
+            with self.subTest(field=field):
+                implicit = self.cost(f"{{ {field} {{ {selection} }} }}")
+                explicit = self.cost(f"{{ {field}(first: {DEFAULT_PAGE_SIZE}) {{ {selection} }} }}")
+                null = self.cost(f"query($n: Int) {{ {field}(first: $n) {{ {selection} }} }}", {"n": None})
+                self.assertEqual(implicit, explicit)
+                self.assertEqual(null, explicit)
+
+    def test_cost_scales_with_first(self):
+        selection = CONNECTIONS["listings"]
+        small = self.cost(f"{{ listings(first: 10) {{ {selection} }} }}")
+        large = self.cost(f"{{ listings(first: 100) {{ {selection} }} }}")
+        self.assertGreater(large, small)
@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from graphql import parse
+
+from backend.fastpath import plan
+from backend.feed import refresh_listing_feed
+from backend.schema import Listing, ListingImage, ListingImageRendition, schema
+
+LISTINGS = """
+query($first: Int, $after: String, $sort: ListingSort, $minPrice: Decimal, $maxPrice: Decimal,
+      $hasImages: Boolean, $sold: Boolean, $includeSold: Boolean, $ownerId: Int) {
+  listings(first: $first, after: $after, sort: $sort, minPrice: $minPrice, maxPrice: $maxPrice,
+           hasImages: $hasImages, sold: $sold, includeSold: $includeSold, ownerId: $ownerId) {
+    __typename
+    edges { cursor node { __typename id title description price dateListed sold
+      user { id username email firstName lastName }
+      images { id imageUrl url thumb: url(size: THUMB, format: AVIF) medium: url(size: MEDIUM) placeholder } } }
+    pageInfo { hasNextPage hasPreviousPage startCursor endCursor }
+  }
+}
+"""
+FRAGMENTS = """
+query($first: Int, $after: String, $withUser: Boolean!) {
+  a: listings(first: $first, after: $after) { ...page }
+  b: listings(first: 3, sort: PRICE_DESC, includeSold: true) { edges { node { id price } } }
+}
+fragment page on ListingConnection {
+  edges { node { ...card user @include(if: $withUser) { username } } }
+  pageInfo { hasNextPage endCursor }
+}
+fragment card on ListingType { id title price }
+"""
+FEED = """
+query($first: Int, $after: String, $sort: ListingSort, $maxPrice: Decimal, $hasImages: Boolean) {
+  listingFeed(first: $first, after: $after, sort: $sort, maxPrice: $maxPrice, hasImages: $hasImages) {
+    edges { cursor node { id sellerId sellerName title price dateListed sold coverImageUrl imageCount } }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+"""
+CASES = [
+    (LISTINGS, {"first": 4}),
+    (LISTINGS, {"first": 3, "sort": "PRICE_ASC", "minPrice": "5"}),
+    (LISTINGS, {"first": 5, "sort": "PRICE_DESC", "hasImages": True, "includeSold": True}),
+    (LISTINGS, {"first": 1, "sold": True}),
+    (LISTINGS, {"first": 3, "maxPrice": "12.50", "hasImages": False}),
+    (FRAGMENTS, {"first": 4, "withUser": True}),
+    (FRAGMENTS, {"first": 4, "withUser": False}),
+    (FEED, {"first": 4}),
+    (FEED, {"first": 3, "sort": "PRICE_ASC", "maxPrice": "15"}),
+    (FEED, {"first": 3, "sort": "PRICE_DESC", "hasImages": True}),
+]
+
+
+class FastPathTests(TestCase):
+    """The values()-based fast path must return exactly what the executor returns."""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        users = [
+            User.objects.create(username="ada", email="ada@example.com", first_name="Ada", last_name="L"),
+            User.objects.create(username="bob", email="bob@example.com"),
+        ]
+        ids = []
+        for n in range(14):
+            listing = Listing.objects.create(
+                user=users[n % 2], title=f"item {n}", description=f"about {n}",
+                # Repeated prices and a run of null dates exercise the tie and NULL cursor branches.
+                price=f"{n % 5 * 3 + 1}.25",
+                date_listed=None if n % 4 == 0 else now - timedelta(hours=n),
+                sold=n % 6 == 5,
+            )
+            ids.append(listing.pk)
+            for i in range(n % 3):
+                image = ListingImage.objects.create(listing=listing, image_url=f"https://example.com/{listing.pk}/{i}.jpg")
+                if (n + i) % 2:
+                    ListingImageRendition.objects.create(
+                        image=image,
+                        status=ListingImageRendition.READY if n % 3 == 1 else ListingImageRendition.PENDING,
+                        variants={"thumb": {"webp": f"/t/{image.pk}.webp", "avif": f"/t/{image.pk}.avif"},
+                                  "medium": {"webp": f"/m/{image.pk}.webp"}},
+                        placeholder="data:image/webp;base64,AAAA" if i else "",
+                    )
+        refresh_listing_feed(ids)
+
+    def regular(self, query, variables):
+        result = schema.execute(query, variable_values=variables, context_value=RequestFactory().post("/graphql/"))
+        self.assertIsNone(result.errors)
+        return result.data
+
+    def fast(self, query, variables):
+        run = plan(schema.graphql_schema, parse(query), None, variables)
+        self.assertIsNotNone(run, "query should qualify for the fast path")
+        return run()
+
+    def test_matches_executor_on_every_page(self):
+        for case, (query, variables) in enumerate(CASES):
+            with self.subTest(case=case, variables=variables):
+                after, pages = None, 0
+                while True:
+                    current = {**variables, "after": after}
+                    expected = self.regular(query, current)
+                    self.assertEqual(self.fast(query, current), expected)
+                    pages += 1
+                    page_info = next(iter(expected.values())).get("pageInfo") or {}
+                    if not page_info.get("hasNextPage"):
+                        break
+                    after = page_info["endCursor"]
+                if variables["first"] < 4:
+                    self.assertGreater(pages, 1)
+
+    def test_images_are_read_in_id_order_on_both_paths(self):
+        variables = {"first": 10}
+        for run in (self.regular, self.fast):
+            with self.subTest(path=run.__name__), CaptureQueriesContext(connection) as queries:
+                run(LISTINGS, variables)
+            image_queries = [q["sql"] for q in queries if 'FROM "listing_images"' in q["sql"]]
+            self.assertTrue(image_queries)
+            for sql in image_queries:
+                self.assertIn("ORDER BY", sql)
+
+    def test_unsupported_selections_fall_back(self):
+        for query in (
+            "{ listings { edges { node { id user { listings { id } } } } } }",
+            "{ listings { edges { node { id } } } me { id } }",
+            "{ listings { edges { node { id } } more: edges { cursor } } }",
+            "mutation { logout { success } }",
+        ):
+            with self.subTest(query=query):
+                self.assertIsNone(plan(schema.graphql_schema, parse(query), None, {}))
@@ -0,0 +1,34 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from backend.feed import refresh_listing_feed
+from backend.response_cache import ALL_LISTINGS, response_cache
+from backend.schema import Listing, ListingFeedEntry
+
+
+class SellerRenameTests(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create(username="ada")
+        self.listings = [
+            Listing.objects.create(user=self.seller, title=f"item {n}", description="", price=1) for n in range(2)
+        ]
+        refresh_listing_feed([l.pk for l in self.listings])
+
+    def rename(self, **fields):
+        for name, value in fields.items():
+            setattr(self.seller, name, value)
+        with mock.patch.object(response_cache, "bump") as bump, self.captureOnCommitCallbacks(execute=True):
+            self.seller.save()
+        return {dep for call in bump.call_args_list for dep in call.args[0]}
+
+    def test_rename_rewrites_feed_rows_and_bumps_each_listing(self):
+        bumped = self.rename(first_name="Ada", last_name="Lovelace")
+        self.assertEqual(set(ListingFeedEntry.objects.values_list("seller_name", flat=True)), {"Ada Lovelace"})
+        self.assertEqual(
+            bumped, {ALL_LISTINGS, f"owner:{self.seller.pk}", *(f"listing:{l.pk}" for l in self.listings)}
+        )
+
+    def test_unrelated_save_bumps_nothing(self):
+        self.assertEqual(self.rename(email="ada@example.com"), set())
@@ -0,0 +1,37 @@
+import io
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from backend import images
+
+UPLOAD = "https://storage.googleapis.com/market/listings/user_1/abc_photo.jpg"
+
+
+@override_settings(GCS_BUCKET_NAME="market", GCS_UPLOAD_PREFIX="listings")
+class FetchAndRenderTests(SimpleTestCase):
+    def test_only_fetches_uploads_in_the_bucket(self):
+        for url in (
+            "http://169.254.169.254/computeMetadata/v1/",
+            "file:///etc/passwd",
+            "https://storage.googleapis.com/other-bucket/listings/x.jpg",
+            "https://storage.googleapis.com/market/private/x.jpg",
+            "https://storage.googleapis.com.evil.example/market/listings/x.jpg",
+            "https://storage.googleapis.com/market/listings/../private/x.jpg",
+        ):
+            with self.subTest(url=url), mock.patch.object(images._opener, "open") as opened:
+                with self.assertRaises(ValueError):
+                    images.fetch_and_render(url)
+                opened.assert_not_called()
+
+    @override_settings(GCS_BUCKET_NAME=None)
+    def test_nothing_is_fetched_without_a_bucket(self):
+        with self.assertRaises(ValueError):
+            images.fetch_and_render(UPLOAD)
+
+    def test_reads_at_most_max_bytes(self):
+        response = mock.MagicMock()
+        response.__enter__.return_value = io.BytesIO(b"x" * 11)
+        with mock.patch.object(images, "MAX_BYTES", 10), mock.patch.object(images._opener, "open", return_value=response):
+            with self.assertRaisesMessage(ValueError, "larger than 10 bytes"):
+                images.fetch_and_render(UPLOAD)
@@ -0,0 +1,128 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from backend.feed import refresh_listing_feed
+from backend.schema import Listing, ListingImage, schema
+
+ARGS = """
+$ownerId: Int, $includeSold: Boolean, $sold: Boolean, $minPrice: Decimal, $maxPrice: Decimal,
+$listedAfter: DateTime, $hasImages: Boolean, $sort: ListingSort
+"""
+PASS = """
+ownerId: $ownerId, includeSold: $includeSold, sold: $sold, minPrice: $minPrice, maxPrice: $maxPrice,
+listedAfter: $listedAfter, hasImages: $hasImages, sort: $sort, first: 100
+"""
+LISTINGS = f"query({ARGS}) {{ listings({PASS}) {{ edges {{ node {{ id }} }} }} }}"
+FEED = f"query({ARGS}) {{ listingFeed({PASS}) {{ edges {{ node {{ id }} }} }} }}"
+FACETS = """
+query($minPrice: Decimal, $maxPrice: Decimal, $sold: Boolean) {
+  listingFacets(includeSold: true, sold: $sold, minPrice: $minPrice, maxPrice: $maxPrice) {
+    count withImages minPrice maxPrice priceBuckets { min max count }
+  }
+}
+"""
+
+
+class ListingFilterTests(TestCase):
+    """`listings`, `listingFeed` and `listingFacets` apply the same filters."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        cls.ada = User.objects.create(username="ada")
+        cls.bob = User.objects.create(username="bob")
+        # (seller, price, days ago, images, sold)
+        rows = [
+            (cls.ada, 5, 1, 1, False),
+            (cls.ada, 30, 2, 0, False),
+            (cls.ada, 120, 3, 2, True),
+            (cls.bob, 30, 4, 0, False),
+            (cls.bob, 600, 10, 1, False),
+            (cls.bob, 2000, 11, 0, True),
+        ]
+        cls.ids = []
+        for seller, price, days, images, sold in rows:
+            listing = Listing.objects.create(
+                user=seller, title=f"item {price}", description="", price=price, sold=sold,
+                date_listed=cls.now - timedelta(days=days),
+            )
+            ListingImage.objects.bulk_create(
+                ListingImage(listing=listing, image_url=f"https://example.com/{listing.pk}/{i}.jpg") for i in range(images)
+            )
+            cls.ids.append(listing.pk)
+        refresh_listing_feed(cls.ids)
+
+    def execute(self, query, variables):
+        result = schema.execute(query, variable_values=variables, context_value=RequestFactory().post("/graphql/"))
+        self.assertIsNone(result.errors)
+        return result.data
+
+    def page(self, **variables):
+        """Ids from `listings`, checked against `listingFeed` for the same arguments."""
+        pages = []
+        for query, field in ((LISTINGS, "listings"), (FEED, "listingFeed")):
+            pages.append([int(e["node"]["id"]) for e in self.execute(query, variables)[field]["edges"]])
+        self.assertEqual(pages[0], pages[1])
+        return pages[0]
+
+    def pick(self, *positions):
+        return [self.ids[p] for p in positions]
+
+    def test_filters(self):
+        cases = [
+            ({}, (0, 1, 3, 4)),
+            ({"includeSold": True}, (0, 1, 2, 3, 4, 5)),
+            ({"sold": True}, (2, 5)),
+            ({"sold": False, "includeSold": True}, (0, 1, 3, 4)),
+            ({"minPrice": "10", "maxPrice": "100"}, (1, 3)),
+            ({"minPrice": "600"}, (4,)),
+            ({"hasImages": True}, (0, 4)),
+            ({"hasImages": False}, (1, 3)),
+            ({"listedAfter": (self.now - timedelta(days=5)).isoformat()}, (0, 1, 3)),
+            ({"ownerId": self.bob.pk, "includeSold": True}, (3, 4, 5)),
+        ]
+        for variables, expected in cases:
+            with self.subTest(**variables):
+                self.assertEqual(self.page(**variables), self.pick(*expected))
+
+    def test_inverted_price_range_is_rejected(self):
+        result = schema.execute(
+            LISTINGS, variable_values={"minPrice": "50", "maxPrice": "10"}, context_value=RequestFactory().post("/graphql/")
+        )
+        self.assertIn("`minPrice` must not be greater than `maxPrice`.", str(result.errors))
+
+    def test_sort_orders(self):
+        cases = {
+            "NEWEST": (0, 1, 2, 3, 4, 5),
+            "PRICE_ASC": (0, 1, 3, 2, 4, 5),  # equal prices fall back to id order
+            "PRICE_DESC": (5, 4, 2, 3, 1, 0),
+        }
+        for sort, expected in cases.items():
+            with self.subTest(sort=sort):
+                self.assertEqual(self.page(includeSold=True, sort=sort), self.pick(*expected))
+
+    def test_facets_count_the_range_and_bucket_every_price(self):
+        with CaptureQueriesContext(connection) as queries:
+            facets = self.execute(FACETS, {"minPrice": "10", "maxPrice": "500"})["listingFacets"]
+        self.assertEqual(len(queries), 1)
+        self.assertEqual((facets["count"], facets["withImages"]), (3, 1))
+        # The price facets ignore the selected range.
+        self.assertEqual((Decimal(facets["minPrice"]), Decimal(facets["maxPrice"])), (Decimal(5), Decimal(2000)))
+        buckets = [
+            (Decimal(b["min"]), b["max"] and Decimal(b["max"]), b["count"]) for b in facets["priceBuckets"]
+        ]
+        self.assertEqual(buckets, [
+            (0, 10, 1), (10, 25, 0), (25, 50, 2), (50, 100, 0),
+            (100, 250, 1), (250, 500, 0), (500, 1000, 1), (1000, None, 1),
+        ])
+
+    def test_facets_apply_the_other_filters(self):
+        facets = self.execute(FACETS, {"sold": True})["listingFacets"]
+        self.assertEqual((facets["count"], facets["withImages"]), (2, 1))
+        self.assertEqual(sum(b["count"] for b in facets["priceBuckets"]), 2)
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from backend.pagination import encode_cursor, keyset_page
+from backend.schema import Listing, schema
+
+
+class KeysetPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username="seller")
+        now = timezone.now()
+        for n in range(23):
+            Listing.objects.create(
+                user=user, title=f"item {n}", description="", price=n % 4,
+                # Ties on both keys and a NULL tail.
+                date_listed=None if n % 5 == 0 else now - timedelta(days=n % 7),
+            )
+
+    def walk(self, key, descending, first):
+        rows, after = [], None
+        while True:
+            page, has_next = keyset_page(Listing.objects.all(), first=first, after=after, key=key, descending=descending)
+            rows.extend(page)
+            if not has_next:
+                return rows
+            after = encode_cursor(getattr(page[-1], key), page[-1].id, key, descending)
+
+    def test_pages_follow_key_then_id_with_nulls_last(self):
+        listings = list(Listing.objects.all())
+        for key in ("date_listed", "price"):
+            for descending in (True, False):
+                non_null = sorted(
+                    (l for l in listings if getattr(l, key) is not None),
+                    key=lambda l: (getattr(l, key), l.id), reverse=descending,
+                )
+                nulls = sorted((l for l in listings if getattr(l, key) is None), key=lambda l: l.id, reverse=descending)
+                for first in (1, 4, 7, 100):
+                    with self.subTest(key=key, descending=descending, first=first):
+                        self.assertEqual([l.id for l in self.walk(key, descending, first)], [l.id for l in non_null + nulls])
+
+    def test_null_tail_is_only_read_once_non_null_rows_run_out(self):
+        first, _ = keyset_page(Listing.objects.all(), first=2)
+        after = encode_cursor(first[-1].date_listed, first[-1].id)
+        with CaptureQueriesContext(connection) as queries:
+            keyset_page(Listing.objects.all(), first=2, after=after)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("IS NULL", queries[0]["sql"])
+
+
+class UserPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ids = [User.objects.create(username=f"user{n}").id for n in range(5)]
+
+    def execute(self, query):
+        return schema.execute(query, context_value=RequestFactory().post("/graphql/"))
+
+    def page(self, args):
+        result = self.execute(f"{{ users({args}) {{ id }} }}")
+        self.assertIsNone(result.errors)
+        return [int(u["id"]) for u in result.data["users"]]
+
+    def test_after_continues_from_the_last_id(self):
+        self.assertEqual(self.page("first: 2"), self.ids[:2])
+        self.assertEqual(self.page(f'first: 2, after: "{self.ids[1]}"'), self.ids[2:4])
+        self.assertEqual(self.page(f'first: 2, after: "{self.ids[-1]}"'), [])
+
+    def test_invalid_after_is_an_error(self):
+        result = self.execute('{ users(after: "x") { id } }')
+        self.assertIn("Invalid `after` id.", str(result.errors))
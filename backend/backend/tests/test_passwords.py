@@ -0,0 +1,57 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from backend.passwords import HashPool, PasswordHasherBusy
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+class HashPoolTests(SimpleTestCase):
+    def pool(self, **kwargs):
+        pool = HashPool(**kwargs)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_workers_are_not_forked(self):
+        pool = self.pool(workers=1, max_pending=1, timeout=30)
+        self.assertEqual(pool.run(_sleep, 0), 0)
+        self.assertNotEqual(pool._executor._mp_context.get_start_method(), "fork")
+
+    def test_saturated_pool_refuses_at_once(self):
+        pool = self.pool(workers=1, max_pending=1, timeout=30)
+        pool.run(_sleep, 0)  # start the worker
+        busy = threading.Thread(target=pool.run, args=(_sleep, 1))
+        busy.start()
+        self.addCleanup(busy.join)
+        time.sleep(0.1)
+        start = time.monotonic()
+        with self.assertRaises(PasswordHasherBusy):
+            pool.run(_sleep, 0)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_timed_out_hash_gives_its_slot_back(self):
+        pool = self.pool(workers=1, max_pending=1, timeout=30)
+        pool.run(_sleep, 0)  # worker startup is not what is being timed
+        pool.timeout = 0.5
+        with self.assertRaises(PasswordHasherBusy):
+            pool.run(_sleep, 60)
+        # The hung worker is killed and a new pool serves the next call.
+        pool.timeout = 30
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                self.assertEqual(pool.run(_sleep, 0), 0)
+                break
+            except PasswordHasherBusy:
+                if time.monotonic() > deadline:
+                    self.fail("slot was never released after the timeout")
+                time.sleep(0.05)
+
+    def test_inline_mode_releases_its_slot(self):
+        pool = self.pool(workers=0, max_pending=1)
+        self.assertEqual([pool.run(_sleep, 0) for _ in range(3)], [0, 0, 0])
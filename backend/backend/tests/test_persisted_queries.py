@@ -0,0 +1,41 @@
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from backend.documents import APQ_KEY_PREFIX, query_hash
+
+
+@override_settings(RATE_LIMIT_ENABLED=False)
+class PersistedQueryTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+
+    def post(self, query, digest=None):
+        body = {"extensions": {"persistedQuery": {"version": 1, "sha256Hash": digest or query_hash(query)}}}
+        if query is not None:
+            body["query"] = query
+        return self.client.post("/graphql/", body, content_type="application/json").json()
+
+    def stored(self, query):
+        return caches["default"].get(APQ_KEY_PREFIX + query_hash(query))
+
+    def test_valid_query_is_registered_and_served_by_hash(self):
+        query = "{ __typename }"
+        self.assertEqual(self.post(query)["data"], {"__typename": "Query"})
+        self.assertEqual(self.stored(query), query)
+        self.assertEqual(self.post(None, query_hash(query))["data"], {"__typename": "Query"})
+
+    def test_invalid_queries_are_not_registered(self):
+        for query in ("{ __typename", "{ noSuchField }"):
+            with self.subTest(query=query):
+                self.assertIn("errors", self.post(query))
+                self.assertIsNone(self.stored(query))
+
+    @override_settings(PERSISTED_QUERY_MAX_LENGTH=30)
+    def test_oversized_queries_run_but_are_not_registered(self):
+        query = "{ __typename }" + " " * 40
+        self.assertEqual(self.post(query)["data"], {"__typename": "Query"})
+        self.assertIsNone(self.stored(query))
+
+    def test_unknown_hash_asks_for_the_query(self):
+        errors = self.post(None, "0" * 64)["errors"]
+        self.assertEqual(errors[0]["extensions"]["code"], "PERSISTED_QUERY_NOT_FOUND")
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from backend.feed import refresh_listing_feed
+from backend.schema import Listing, ListingImage, schema
+
+USERS = """
+{
+  users(first: 50) {
+    id username
+    listings { id title user { id username } images { id url placeholder } }
+  }
+}
+"""
+LISTINGS = """
+{
+  listings(first: 100) {
+    edges { node { id title price user { id username } images { id url } } }
+  }
+}
+"""
+DETAIL = """
+query($a: ID!, $b: ID!) {
+  a: listing(id: $a) { id user { username } images { url } }
+  b: listing(id: $b) { id user { username } images { url } }
+}
+"""
+FEED = """
+{
+  listingFeed(first: 100) {
+    edges { node { id sellerName title price coverImageUrl imageCount } }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+"""
+
+
+class QueryCountTests(TestCase):
+    """The number of SQL queries a read takes must not grow with the data it returns."""
+
+    def seed(self, users, listings, images):
+        start = User.objects.count()
+        now = timezone.now()
+        ids = []
+        for u in range(start, start + users):
+            user = User.objects.create(username=f"seller{u}", email=f"seller{u}@example.com")
+            for n in range(listings):
+                listing = Listing.objects.create(
+                    user=user, title=f"item {u}-{n}", description="", price=n + 1,
+                    date_listed=now - timedelta(minutes=len(ids)),
+                )
+                ListingImage.objects.bulk_create(
+                    ListingImage(listing=listing, image_url=f"https://example.com/{listing.pk}/{i}.jpg")
+                    for i in range(images)
+                )
+                ids.append(listing.pk)
+        refresh_listing_feed(ids)
+        return ids
+
+    def count(self, query, variables=None):
+        with CaptureQueriesContext(connection) as queries:
+            result = schema.execute(query, variable_values=variables, context_value=RequestFactory().post("/graphql/"))
+        self.assertIsNone(result.errors)
+        return len(queries), result.data
+
+    def assert_constant(self, query, variables=lambda ids: None):
+        ids = self.seed(users=2, listings=2, images=1)
+        small, small_data = self.count(query, variables(ids))
+        ids = self.seed(users=6, listings=5, images=3)
+        large, large_data = self.count(query, variables(ids))
+        self.assertNotEqual(small_data, large_data)
+        self.assertEqual(small, large)
+
+    def test_users_listings_images(self):
+        self.assert_constant(USERS)
+
+    def test_listings_user_and_images(self):
+        self.assert_constant(LISTINGS)
+
+    def test_listing_detail_batch(self):
+        self.assert_constant(DETAIL, lambda ids: {"a": ids[0], "b": ids[-1]})
+
+    def test_listing_feed(self):
+        self.assert_constant(FEED)
@@ -0,0 +1,96 @@
+import asyncio
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from backend import ratelimit
+from backend.ratelimit import MemoryBackend, RateLimiter, RateLimitMiddleware, _refill, client_ip
+from backend.singleflight import SingleFlight
+
+
+class BucketTests(SimpleTestCase):
+    def test_bucket_refills_at_the_rate_up_to_the_burst(self):
+        state, wait = None, 0
+        for _ in range(3):
+            state, wait = _refill(state, 100.0, rate=2, burst=3)
+            self.assertEqual(wait, 0)
+        state, wait = _refill(state, 100.0, rate=2, burst=3)
+        self.assertEqual(wait, 0.5)
+        state, wait = _refill(state, 100.5, rate=2, burst=3)
+        self.assertEqual(wait, 0)
+        # A long idle period refills to the burst, not beyond it.
+        state, _ = _refill(state, 1000.0, rate=2, burst=3)
+        self.assertEqual(state, (2, 1000.0))
+
+    def test_memory_backend_keeps_a_bucket_per_key(self):
+        backend = MemoryBackend()
+        self.assertEqual([backend.take("ip:a", 1, 1), backend.take("ip:b", 1, 1)], [0, 0])
+        self.assertGreater(backend.take("ip:a", 1, 1), 0)
+
+
+@override_settings(RATE_LIMIT_ENABLED=True)
+class MiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        limiter = RateLimiter(MemoryBackend(), ip_rate=0.5, ip_burst=1, user_rate=0.5, user_burst=1)
+        patcher = mock.patch.object(ratelimit, "rate_limiter", limiter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.middleware = RateLimitMiddleware(lambda request: HttpResponse("ok"))
+
+    def test_empty_bucket_gets_429_with_retry_after(self):
+        request = RequestFactory().post("/graphql/", REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(self.middleware(request).status_code, 200)
+        response = self.middleware(request)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "2")
+        self.assertIn("RATE_LIMITED", response.content.decode())
+
+    def test_other_paths_and_preflight_are_not_limited(self):
+        factory = RequestFactory()
+        for request in (factory.get("/admin/"), factory.options("/graphql/")) * 2:
+            self.assertEqual(self.middleware(request).status_code, 200)
+
+
+class ClientIpTests(SimpleTestCase):
+    def ip(self, forwarded, proxies):
+        request = RequestFactory().get("/", REMOTE_ADDR="10.0.0.9", HTTP_X_FORWARDED_FOR=forwarded)
+        with mock.patch.object(ratelimit, "PROXY_COUNT", proxies):
+            return client_ip(request)
+
+    def test_takes_the_hop_appended_by_the_outermost_trusted_proxy(self):
+        self.assertEqual(self.ip("6.6.6.6, 1.2.3.4", 1), "1.2.3.4")
+        self.assertEqual(self.ip("6.6.6.6, 1.2.3.4, 10.0.0.2", 2), "1.2.3.4")
+
+    def test_short_chain_falls_back_to_the_peer_address(self):
+        self.assertEqual(self.ip("1.2.3.4", 2), "10.0.0.9")
+        self.assertEqual(self.ip("", 1), "10.0.0.9")
+
+    def test_header_is_ignored_without_trusted_proxies(self):
+        self.assertEqual(self.ip("1.2.3.4", 0), "10.0.0.9")
+
+
+class SingleFlightTests(SimpleTestCase):
+    async def test_concurrent_calls_share_one_execution(self):
+        flight, calls = SingleFlight(), []
+
+        async def load(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(*(flight.do("k", load, n) for n in range(3)))
+        self.assertEqual((results, calls), ([0, 0, 0], [0]))
+        self.assertEqual(await flight.do("k", load, 5), 5)  # nothing is kept once it finishes
+
+    async def test_errors_reach_every_waiter(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+        self.assertEqual([str(r) for r in results], ["boom", "boom"])
+        self.assertIs(results[0], results[1])
+        self.assertEqual(flight._calls, {})
@@ -0,0 +1,39 @@
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from backend.db_router import REPLICA, PrimaryReplicaRouter, pin_to_primary, read_from_replica
+from backend.response_cache import ALL_LISTINGS, VERSION_PREFIX, MemoryBackend, ResponseCache
+
+
+class RecentWriteTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = ResponseCache(MemoryBackend(), recent_window=5)
+
+    def lookup(self):
+        return self.cache.lookup("{ listings { edges { node { id } } } }", None, {}, [ALL_LISTINGS])
+
+    def test_lookup_flags_dependencies_written_inside_the_window(self):
+        self.assertFalse(self.lookup()[2])
+        self.cache.bump([ALL_LISTINGS])
+        self.assertTrue(self.lookup()[2])
+        self.cache.backend.set(VERSION_PREFIX + ALL_LISTINGS, time.time_ns() - 6 * 1_000_000_000)
+        self.assertFalse(self.lookup()[2])
+
+    def test_window_of_zero_never_flags(self):
+        self.cache.recent_window = 0
+        self.cache.bump([ALL_LISTINGS])
+        self.assertFalse(self.lookup()[2])
+
+
+class RouterTests(SimpleTestCase):
+    def test_pinned_reads_skip_the_replica(self):
+        router = PrimaryReplicaRouter()
+        with mock.patch.dict(settings.DATABASES, {REPLICA: {}}), read_from_replica(True):
+            self.assertEqual(router.db_for_read(None), REPLICA)
+            with pin_to_primary(True):
+                self.assertIsNone(router.db_for_read(None))
+            with pin_to_primary(False):
+                self.assertEqual(router.db_for_read(None), REPLICA)
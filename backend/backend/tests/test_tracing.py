@@ -0,0 +1,40 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase
+from prometheus_client import REGISTRY
+
+from backend import tracing, views
+from backend.schema import schema
+
+QUERY = "{ users(first: 5) { id username } }"
+
+
+class TracingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(username="ada")
+
+    def post(self):
+        return self.client.post("/graphql/", {"query": QUERY}, content_type="application/json").json()
+
+    def requests_observed(self):
+        return REGISTRY.get_sample_value("graphql_request_duration_seconds_count", {"operation_type": "query"}) or 0
+
+    def test_untraced_requests_get_no_tracing_middleware(self):
+        view = views.AsyncGraphQLView(schema=schema)
+        request = RequestFactory().post("/graphql/")
+        self.assertFalse(tracing.ENABLED)
+        self.assertIsNone(tracing.start_trace(request))
+        self.assertFalse(any(isinstance(m, tracing.TracingMiddleware) for m in view.get_middleware(request)))
+        self.assertNotIn("tracing", self.post().get("extensions", {}))
+
+    def test_sampled_requests_record_spans_and_metrics(self):
+        with mock.patch.object(tracing, "ENABLED", True), mock.patch.object(tracing, "SAMPLE_RATE", 1.0), \
+                mock.patch.object(views, "EXPOSE_EXTENSIONS", True):
+            before = self.requests_observed()
+            extensions = self.post()["extensions"]
+        resolvers = extensions["tracing"]["execution"]["resolvers"]
+        self.assertIn(["users"], [r["path"] for r in resolvers])
+        self.assertIn("validation", extensions["tracing"])
+        self.assertEqual(self.requests_observed(), before + 1)
@@ -0,0 +1,62 @@
+import re
+import time
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+import jwt
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+
+from backend import schema as schema_module
+from backend.gcs import get_signer, reset_signer
+from backend.schema import schema
+
+BATCH = """
+mutation($files: [UploadFileInput!]!) {
+  generateListingImageUploadUrls(files: $files) { signedUrl publicUrl objectName }
+}
+"""
+
+
+@override_settings(GCS_SIGNING_MODE="fake", GCS_BUCKET_NAME="test-bucket")
+class FakeSigningTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="ada")
+
+    def setUp(self):
+        reset_signer()
+        self.addCleanup(reset_signer)
+
+    def execute(self, files):
+        token = jwt.encode({"user_id": self.user.pk, "exp": int(time.time()) + 600}, settings.SECRET_KEY, algorithm="HS256")
+        request = RequestFactory().post("/graphql/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        return schema.execute(BATCH, variable_values={"files": files}, context_value=request)
+
+    def test_batch_is_signed_locally_with_one_signer(self):
+        files = [{"filename": "front view.jpg", "contentType": "image/jpeg"}, {"filename": "../back.png", "contentType": "image/png"}]
+        result = self.execute(files)
+        self.assertIsNone(result.errors)
+        payloads = result.data["generateListingImageUploadUrls"]
+        self.assertEqual(len(payloads), 2)
+        for payload, name in zip(payloads, ("front_view.jpg", "back.png")):
+            with self.subTest(name=name):
+                self.assertRegex(payload["objectName"], rf"^listings/user_{self.user.pk}/[0-9a-f]{{32}}_{re.escape(name)}$")
+                self.assertEqual(payload["publicUrl"], f"https://storage.googleapis.com/test-bucket/{payload['objectName']}")
+                url = urlsplit(payload["signedUrl"])
+                self.assertEqual(f"{url.scheme}://{url.netloc}{url.path}", payload["publicUrl"])
+                query = parse_qs(url.query)
+                self.assertEqual(query["X-Goog-Algorithm"], ["GOOG4-RSA-SHA256"])
+                self.assertEqual(query["X-Goog-Expires"], ["600"])
+                self.assertIn("content-type", query["X-Goog-SignedHeaders"][0])
+                self.assertIn("X-Goog-Signature", query)
+        self.assertIs(get_signer(), get_signer())
+
+    def test_batches_over_the_cap_are_refused_before_signing(self):
+        files = [{"filename": f"{n}.jpg", "contentType": "image/jpeg"} for n in range(3)]
+        with mock.patch.object(schema_module, "GCS_MAX_BATCH_UPLOADS", 2), \
+                mock.patch.object(schema_module, "get_signer") as signer:
+            result = self.execute(files)
+        self.assertIn("At most 2 uploads per request.", str(result.errors))
+        signer.assert_not_called()
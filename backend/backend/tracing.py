@@ -0,0 +1,189 @@
+import contextvars
+import os
+import random
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from inspect import isawaitable
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+ENABLED = getattr(settings, "GRAPHQL_TRACING_ENABLED", False)
+SAMPLE_RATE = getattr(settings, "GRAPHQL_TRACING_SAMPLE_RATE", 0.0)
+EXPOSE_EXTENSIONS = getattr(settings, "GRAPHQL_TRACING_EXTENSIONS", settings.DEBUG)
+N_PLUS_ONE_THRESHOLD = getattr(settings, "GRAPHQL_N_PLUS_ONE_THRESHOLD", 5)
+FORCE_HEADER = "X-GraphQL-Trace"
+
+# Set for the duration of a sampled request. asgiref copies the context into
+# offloaded threads, so SQL run on the worker pool is attributed correctly.
+_current = contextvars.ContextVar("graphql_trace", default=None)
+
+
+class Trace:
+    def __init__(self):
+        self.start_wall = datetime.now(timezone.utc)
+        self.start = time.perf_counter_ns()
+        self.phases = {}
+        self.resolvers = []
+        self.sql = []
+
+    def offset(self):
+        return time.perf_counter_ns() - self.start
+
+    def phase(self, name, start_offset):
+        self.phases[name] = {"startOffset": start_offset, "duration": self.offset() - start_offset}
+
+    def add_resolver(self, info, start_offset):
+        self.resolvers.append({
+            "path": info.path.as_list(),
+            "parentType": info.parent_type.name,
+            "fieldName": info.field_name,
+            "returnType": str(info.return_type),
+            "startOffset": start_offset,
+            "duration": self.offset() - start_offset,
+        })
+
+    def n_plus_one(self):
+        counts = Counter(sql for sql, _ in self.sql)
+        return [{"sql": sql, "count": n} for sql, n in counts.most_common() if n >= N_PLUS_ONE_THRESHOLD]
+
+    def extensions(self):
+        duration = self.offset()
+        return {
+            "tracing": {
+                "version": 1,
+                "startTime": self.start_wall.isoformat(),
+                "endTime": datetime.now(timezone.utc).isoformat(),
+                "duration": duration,
+                **self.phases,
+                "execution": {"resolvers": self.resolvers},
+            },
+            "sql": {
+                "count": len(self.sql),
+                "duration": sum(d for _, d in self.sql),
+                "nPlusOne": self.n_plus_one(),
+            },
+        }
+
+
+def start_trace(request):
+    """Begin tracing this request if it is sampled; returns the Trace or None."""
+    if not ENABLED:
+        return None
+    forced = settings.DEBUG and request.headers.get(FORCE_HEADER) == "1"
+    if not forced and random.random() >= SAMPLE_RATE:
+        return None
+    trace = Trace()
+    trace.token = _current.set(trace)
+    return trace
+
+
+def finish_trace(trace, operation_type):
+    _current.reset(trace.token)
+    metrics.observe_request(trace, operation_type)
+
+
+def current_trace():
+    return _current.get()
+
+
+class TracingMiddleware:
+    """Graphene middleware timing every resolver of sampled requests."""
+
+    def resolve(self, next, root, info, **args):
+        trace = _current.get()
+        if trace is None:
+            return next(root, info, **args)
+        start = trace.offset()
+        result = next(root, info, **args)
+        if isawaitable(result):
+            async def timed():
+                try:
+                    return await result
+                finally:
+                    trace.add_resolver(info, start)
+            return timed()
+        trace.add_resolver(info, start)
+        return result
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    trace = _current.get()
+    if trace is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter_ns()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        trace.sql.append((sql, time.perf_counter_ns() - start))
+
+
+def _install_sql_wrapper(sender, connection, **kwargs):
+    if _sql_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_sql_wrapper)
+
+
+if ENABLED:
+    connection_created.connect(_install_sql_wrapper, dispatch_uid="graphql_tracing_sql")
+
+
+class _Metrics:
+    """Prometheus histograms, created on first use (prometheus_client is optional)."""
+
+    def __init__(self):
+        self._ready = False
+
+    def _setup(self):
+        from prometheus_client import Counter as PromCounter, Histogram
+
+        self.request_seconds = Histogram(
+            "graphql_request_duration_seconds", "GraphQL request latency.", ["operation_type"]
+        )
+        self.resolver_seconds = Histogram(
+            "graphql_resolver_duration_seconds", "Resolver latency.", ["parent_type", "field"],
+            buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+        )
+        self.sql_queries = Histogram(
+            "graphql_request_sql_queries", "SQL queries per request.", ["operation_type"],
+            buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+        )
+        self.sql_seconds = Histogram(
+            "graphql_request_sql_duration_seconds", "Total SQL time per request.", ["operation_type"]
+        )
+        self.n_plus_one = PromCounter(
+            "graphql_n_plus_one_total", "Sampled requests that repeated one SQL statement too often."
+        )
+        self._ready = True
+
+    def observe_request(self, trace, operation_type):
+        if not self._ready:
+            self._setup()
+        op = operation_type or "unknown"
+        self.request_seconds.labels(op).observe(trace.offset() / 1e9)
+        self.sql_queries.labels(op).observe(len(trace.sql))
+        self.sql_seconds.labels(op).observe(sum(d for _, d in trace.sql) / 1e9)
+        # Leaf scalar fields are timed for the extensions but skipped here to
+        # keep series count and per-request overhead down.
+        for r in trace.resolvers:
+            if len(r["path"]) == 1 or r["duration"] > 100_000:
+                self.resolver_seconds.labels(r["parentType"], r["fieldName"]).observe(r["duration"] / 1e9)
+        if trace.n_plus_one():
+            self.n_plus_one.inc()
+
+
+metrics = _Metrics()
+
+
+def render_metrics():
+    """Return ``(body, content_type)`` in the Prometheus exposition format."""
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # Each gunicorn worker writes its own files; aggregate them per scrape.
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
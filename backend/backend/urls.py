@@ -1,12 +1,25 @@
-from django.contrib import admin
+from django.conf import settings
+from django.conf.urls.static import static
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
-from graphene_django.views import GraphQLView
-from .views import ProtectGraphQL
-from .schema import schema
+from .views import AsyncGraphQLView, ProtectGraphQL, export_listings_view, metrics_view
+from .schema import ASYNC_ROOT_FIELDS, schema
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
-    path("graphql/", csrf_exempt(GraphQLView.as_view(schema=schema, graphiql=False))),
-    path("graphql/sandbox/", ProtectGraphQL.as_view(schema=schema, graphiql=True)),
+    path("graphql/", csrf_exempt(AsyncGraphQLView.as_view(schema=schema, async_root_fields=ASYNC_ROOT_FIELDS))),
+    path("metrics", metrics_view),
+    path("export/listings", export_listings_view),
 ]
+
+# The admin and the login-protected sandbox need sessions; the API-only
+# profile (backend/settings_api.py) leaves them out.
+if "django.contrib.admin" in settings.INSTALLED_APPS:
+    from django.contrib import admin
+
+    urlpatterns += [
+        path("admin/", admin.site.urls),
+        path("graphql/sandbox/", ProtectGraphQL.as_view(schema=schema, graphiql=True)),
+    ]
+
+# Locally stored listing image variants (production serves these from storage/CDN).
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,10 +1,289 @@
+import asyncio
+import json
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder produces the same JSON
+    orjson = None
+from concurrent.futures import ThreadPoolExecutor
+from inspect import isawaitable
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed, StreamingHttpResponse
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from graphene_django.views import GraphQLView
+from graphene_django.views import GraphQLView, HttpError
+from graphql import ExecutionResult, OperationType, execute, get_operation_ast
+
+from .auth_cache import request_token, user_for_token
+from .complexity import QueryComplexityError, check_complexity
+from .db_router import pin_to_primary, read_from_replica
+from .documents import PersistedQueryError, document_cache, register_persisted_query, resolve_persisted_query
+from .exports import FORMATS, export_chunks, export_database
+from .fastpath import plan as fast_plan
+from .offload import OffloadSyncResolvers, run_sync
+from .response_cache import normalized_query_hash, response_cache
+from .singleflight import single_flight
+from .tracing import EXPOSE_EXTENSIONS, TracingMiddleware, current_trace, finish_trace, render_metrics, start_trace
+
+RESPONSE_CACHE_ENABLED = getattr(settings, "RESPONSE_CACHE_ENABLED", True)
+SINGLE_FLIGHT_ENABLED = getattr(settings, "SINGLE_FLIGHT_ENABLED", True)
+FAST_LIST_QUERIES = getattr(settings, "GRAPHQL_FAST_LIST_QUERIES", True)
 
 class ProtectGraphQL(LoginRequiredMixin, UserPassesTestMixin, GraphQLView):
     login_url = "/admin/login/" 
     redirect_field_name = "next"  
     def test_func(self):
         return self.request.user.is_superuser
+
+class AsyncGraphQLView(GraphQLView):
+    """JSON-only GraphQL endpoint executed on the event loop.
+
+    Root fields listed in ``async_root_fields`` run as coroutines; every other
+    root resolver is offloaded to the bounded worker pool in ``offload``.
+    """
+    view_is_async = True
+    async_root_fields = ()
+
+    def __init__(self, async_root_fields=None, **kwargs):
+        super().__init__(**kwargs)
+        if async_root_fields is not None:
+            self.async_root_fields = async_root_fields
+        self._offload = OffloadSyncResolvers(self.async_root_fields)
+        self._tracing = TracingMiddleware()
+
+    def get_middleware(self, request):
+        # Only sampled requests pay for wrapping every resolver. The last
+        # middleware is outermost, so resolver timings include offloading.
+        tracing = (self._tracing,) if current_trace() is not None else ()
+        return [*(self.middleware or ()), self._offload, *tracing]
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            if request.method.lower() not in ("get", "post"):
+                raise HttpError(
+                    HttpResponseNotAllowed(["GET", "POST"], "GraphQL only supports GET and POST requests.")
+                )
+            data = self.parse_body(request)
+            result, status_code, headers = await self.get_response_async(request, data)
+            response = HttpResponse(status=status_code, content=result, content_type="application/json")
+            for name, value in headers.items():
+                response[name] = value
+            return response
+        except HttpError as e:
+            response = e.response
+            response["Content-Type"] = "application/json"
+            response.content = self.json_encode(request, {"errors": [self.format_error(e)]})
+            return response
+
+    def json_encode(self, request, d, pretty=False):
+        if orjson is None or self.pretty or pretty or request.GET.get("pretty"):
+            return super().json_encode(request, d, pretty)
+        try:
+            return orjson.dumps(d)
+        except TypeError:  # e.g. integers beyond 64 bits
+            return super().json_encode(request, d, pretty)
+
+    @staticmethod
+    def get_extensions(request, data):
+        extensions = request.GET.get("extensions") or data.get("extensions")
+        if extensions and isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+        return extensions if isinstance(extensions, dict) else None
+
+    async def get_response_async(self, request, data):
+        trace = start_trace(request)
+        if trace is None:
+            return await self._get_response_async(request, data, None)
+        try:
+            return await self._get_response_async(request, data, trace)
+        finally:
+            finish_trace(trace, getattr(trace, "operation_type", None))
+
+    async def _get_response_async(self, request, data, trace):
+        query, variables, operation_name, _ = self.get_graphql_params(request, data)
+        try:
+            query, digest, register = resolve_persisted_query(query, self.get_extensions(request, data))
+        except PersistedQueryError as e:
+            error = {"message": str(e), "extensions": {"code": e.code}}
+            return self.json_encode(request, {"errors": [error]}), e.status, {}
+        if not query:
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        schema = self.schema.graphql_schema
+        # Parsing and validation are cached per (schema version, query hash).
+        start = trace and trace.offset()
+        document, validation_errors = document_cache.get(schema, query, digest, self.validation_rules)
+        if trace:
+            trace.phase("validation", start)
+            operation_ast = document and get_operation_ast(document, operation_name)
+            trace.operation_type = operation_ast.operation.value if operation_ast else None
+
+        cost = None
+        if document is not None and not validation_errors:
+            if register:
+                register_persisted_query(digest, query)
+            # Admission control: refuse over-budget operations before any resolver runs.
+            try:
+                cost = check_complexity(schema, document, operation_name, variables)
+            except QueryComplexityError as e:
+                return self.json_encode(request, {"errors": [self.format_error(e)]}), 400, {}
+
+        # Only public queries (the same result for every caller) are cached or shared.
+        deps = None
+        if cost is not None and (RESPONSE_CACHE_ENABLED or SINGLE_FLIGHT_ENABLED):
+            deps = response_cache.dependencies(schema, document, operation_name, variables)
+
+        cache_key, written_recently = None, False
+        if deps and RESPONSE_CACHE_ENABLED:
+            cache_key, cached, written_recently = await self._response_cache(
+                response_cache.lookup, query, operation_name, variables, deps
+            )
+            headers = response_cache.headers(cache_key)
+            if request.headers.get("If-None-Match") == headers["ETag"]:
+                return b"", 304, headers
+            if cached is not None:
+                return cached, 200, headers
+
+        args = (request, document, validation_errors, variables, operation_name, cost, trace, cache_key)
+        # Right after a write the replica may still return the old rows; read
+        # them from the primary rather than cache them under the new version.
+        with pin_to_primary(written_recently):
+            if deps and SINGLE_FLIGHT_ENABLED and not (trace and EXPOSE_EXTENSIONS):
+                # A burst of identical cold-cache requests runs the resolvers once.
+                flight_key = cache_key or json.dumps(
+                    [normalized_query_hash(query), operation_name, variables or {}], sort_keys=True, default=str
+                )
+                return await single_flight.do(flight_key, self._execute_response, *args)
+            return await self._execute_response(*args)
+
+    async def _execute_response(self, request, document, validation_errors, variables, operation_name, cost, trace, cache_key):
+        execution_result = await self.execute_graphql_request_async(
+            request, document, validation_errors, variables, operation_name
+        )
+
+        status_code = 200
+        response = {}
+        if execution_result.errors:
+            response["errors"] = [self.format_error(e) for e in execution_result.errors]
+        if execution_result.errors and any(not getattr(e, "path", None) for e in execution_result.errors):
+            status_code = 400
+        else:
+            response["data"] = execution_result.data
+        if cost is not None:
+            response["extensions"] = {"cost": cost}
+        if trace and EXPOSE_EXTENSIONS:
+            response.setdefault("extensions", {}).update(trace.extensions())
+        result = self.json_encode(request, response)
+
+        if cache_key and not execution_result.errors and not (trace and EXPOSE_EXTENSIONS):
+            await self._response_cache(response_cache.set, cache_key, result)
+            return result, status_code, response_cache.headers(cache_key)
+        return result, status_code, {}
+
+    @staticmethod
+    async def _response_cache(fn, *args):
+        # Shared cache backends do network I/O; keep it off the event loop.
+        if response_cache.backend.blocking:
+            return await run_sync(fn, *args)
+        return fn(*args)
+
+    async def execute_graphql_request_async(self, request, document, validation_errors, variables, operation_name):
+        if document is None:
+            return ExecutionResult(errors=validation_errors)
+
+        operation_ast = get_operation_ast(document, operation_name)
+        if (
+            request.method.lower() == "get"
+            and operation_ast is not None
+            and operation_ast.operation != OperationType.QUERY
+        ):
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ["POST"],
+                    f"Can only perform a {operation_ast.operation.value} operation from a POST request.",
+                )
+            )
+
+        if validation_errors:
+            return ExecutionResult(data=None, errors=validation_errors)
+
+        read_only = operation_ast is not None and operation_ast.operation == OperationType.QUERY
+        if read_only and FAST_LIST_QUERIES:
+            fast = fast_plan(self.schema.graphql_schema, document, operation_name, variables)
+            if fast is not None:
+                try:
+                    with read_from_replica(True):
+                        return ExecutionResult(data=await run_sync(fast))
+                except Exception:
+                    # Errors (an invalid cursor, say) are reported by the regular executor below.
+                    pass
+        try:
+            with read_from_replica(read_only):
+                result = execute(
+                    self.schema.graphql_schema,
+                    document,
+                    root_value=self.get_root_value(request),
+                    context_value=self.get_context(request),
+                    variable_values=variables,
+                    operation_name=operation_name,
+                    middleware=self.get_middleware(request),
+                )
+                if isawaitable(result):
+                    result = await result
+            return result
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+
+def metrics_view(request):
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponse(status=401)
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
+
+async def _stream_export(fmt, chunk_size):
+    # One dedicated thread per export so the server-side cursor stays on one
+    # connection; the event loop only ever holds one chunk.
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(1, thread_name_prefix="export")
+    chunks = export_chunks(fmt, chunk_size, export_database())
+
+    def finish():
+        chunks.close()
+        connections.close_all()
+
+    try:
+        while (chunk := await loop.run_in_executor(pool, next, chunks, None)) is not None:
+            yield chunk
+    finally:
+        await loop.run_in_executor(pool, finish)
+        pool.shutdown(wait=False)
+
+
+async def export_listings_view(request):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    token = request_token(request)
+    user = await run_sync(user_for_token, token) if token else None
+    if user is None:
+        return HttpResponse(status=401)
+    if not user.is_staff:
+        return HttpResponse(status=403)
+    fmt = request.GET.get("format", "ndjson")
+    if fmt not in FORMATS:
+        return HttpResponseBadRequest("format must be ndjson or csv.")
+    try:
+        chunk_size = min(max(int(request.GET.get("chunk_size", 2000)), 100), 10_000)
+    except ValueError:
+        return HttpResponseBadRequest("chunk_size must be an integer.")
+    response = StreamingHttpResponse(_stream_export(fmt, chunk_size), content_type=FORMATS[fmt])
+    response["Content-Disposition"] = f'attachment; filename="listings.{fmt}"'
+    return response
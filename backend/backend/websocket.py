@@ -0,0 +1,161 @@
+import asyncio
+import json
+import logging
+from types import SimpleNamespace
+
+from django.conf import settings
+from graphql import ExecutionResult, GraphQLError, OperationType, get_operation_ast, subscribe
+
+from .complexity import QueryComplexityError, check_complexity
+from .documents import document_cache
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL = "graphql-transport-ws"
+INIT_TIMEOUT = getattr(settings, "SUBSCRIPTION_INIT_TIMEOUT", 10)
+MAX_SUBSCRIPTIONS = getattr(settings, "SUBSCRIPTION_MAX_PER_CONNECTION", 20)
+
+
+def _format(result):
+    payload = {"data": result.data}
+    if result.errors:
+        payload["errors"] = [e.formatted for e in result.errors]
+    return payload
+
+
+class GraphQLWebSocket:
+    """ASGI app speaking the ``graphql-transport-ws`` protocol.
+
+    Subscriptions are async generators that sit on the broker's hub, so idle
+    connections hold no thread and no database connection.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+
+    async def __call__(self, scope, receive, send):
+        if PROTOCOL not in scope.get("subprotocols", ()):
+            await receive()  # websocket.connect
+            await send({"type": "websocket.close", "code": 4406})
+            return
+        await _Connection(self.schema, scope, receive, send).run()
+
+
+class _Connection:
+    def __init__(self, schema, scope, receive, send):
+        self.schema = schema
+        self.scope = scope
+        self.receive = receive
+        self._send = send
+        self.acknowledged = False
+        self.operations = {}
+        self.context = SimpleNamespace(scope=scope, connection_params={})
+
+    async def send(self, message):
+        await self._send({"type": "websocket.send", "text": json.dumps(message, separators=(",", ":"))})
+
+    async def close(self, code, reason=""):
+        await self._send({"type": "websocket.close", "code": code, "reason": reason})
+
+    async def run(self):
+        event = await self.receive()
+        if event["type"] != "websocket.connect":
+            return
+        await self._send({"type": "websocket.accept", "subprotocol": PROTOCOL})
+        init_timeout = asyncio.get_running_loop().call_later(INIT_TIMEOUT, self._init_expired)
+        try:
+            while True:
+                event = await self.receive()
+                if event["type"] == "websocket.disconnect":
+                    break
+                try:
+                    message = json.loads(event.get("text") or event.get("bytes") or b"")
+                    kind = message["type"]
+                except (ValueError, KeyError, TypeError):
+                    await self.close(4400, "Invalid message")
+                    break
+                if not await self.handle(kind, message):
+                    break
+        finally:
+            init_timeout.cancel()
+            for task in self.operations.values():
+                task.cancel()
+
+    def _init_expired(self):
+        if not self.acknowledged:
+            asyncio.ensure_future(self.close(4408, "Connection initialisation timeout"))
+
+    async def handle(self, kind, message):
+        if kind == "connection_init":
+            if self.acknowledged:
+                await self.close(4429, "Too many initialisation requests")
+                return False
+            self.acknowledged = True
+            self.context.connection_params = message.get("payload") or {}
+            await self.send({"type": "connection_ack"})
+        elif kind == "ping":
+            await self.send({"type": "pong"})
+        elif kind == "pong":
+            pass
+        elif kind == "subscribe":
+            if not self.acknowledged:
+                await self.close(4401, "Unauthorized")
+                return False
+            op_id = message.get("id")
+            if op_id in self.operations:
+                await self.close(4409, f"Subscriber for {op_id} already exists")
+                return False
+            if len(self.operations) >= MAX_SUBSCRIPTIONS:
+                await self.send({"id": op_id, "type": "error", "payload": [{"message": "Too many subscriptions."}]})
+                return True
+            task = asyncio.ensure_future(self.operate(op_id, message.get("payload") or {}))
+            self.operations[op_id] = task
+            task.add_done_callback(lambda t: self._finished(op_id, t))
+        elif kind == "complete":
+            task = self.operations.pop(message.get("id"), None)
+            if task is not None:
+                task.cancel()
+        else:
+            await self.close(4400, f"Unexpected message type {kind}")
+            return False
+        return True
+
+    def _finished(self, op_id, task):
+        if self.operations.get(op_id) is task:
+            del self.operations[op_id]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Subscription %s failed", op_id, exc_info=task.exception())
+
+    async def operate(self, op_id, payload):
+        graphql_schema = self.schema.graphql_schema
+        query = payload.get("query") or ""
+        variables = payload.get("variables")
+        operation_name = payload.get("operationName")
+
+        document, errors = document_cache.get(graphql_schema, query)
+        if document is not None and not errors:
+            try:
+                check_complexity(graphql_schema, document, operation_name, variables)
+            except QueryComplexityError as e:
+                errors = [e]
+        if document is None or errors:
+            await self.send({"id": op_id, "type": "error", "payload": [e.formatted for e in errors]})
+            return
+
+        operation = get_operation_ast(document, operation_name)
+        if operation is None or operation.operation != OperationType.SUBSCRIPTION:
+            error = GraphQLError("Only subscriptions are served over WebSocket; send queries and mutations over HTTP.")
+            await self.send({"id": op_id, "type": "error", "payload": [error.formatted]})
+            return
+
+        stream = await subscribe(graphql_schema, document, context_value=self.context,
+                                 variable_values=variables, operation_name=operation_name)
+        if isinstance(stream, ExecutionResult):
+            await self.send({"id": op_id, "type": "error", "payload": [e.formatted for e in stream.errors or ()]})
+            return
+        try:
+            async for result in stream:
+                await self.send({"id": op_id, "type": "next", "payload": _format(result)})
+        finally:
+            await stream.aclose()
+        await self.send({"id": op_id, "type": "complete"})
@@ -0,0 +1,17 @@
+# Production ASGI server: gunicorn supervising uvicorn workers.
+#   gunicorn -c gunicorn.conf.py backend.asgi:application
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = "uvicorn_worker.UvicornWorker"
+# Each worker is a single event loop; blocking resolvers use its
+# GRAPHQL_SYNC_WORKERS thread pool, so one process per core is enough.
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+accesslog = "-"
+errorlog = "-"
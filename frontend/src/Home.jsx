@@ -3,10 +3,12 @@ import React, { useEffect, useState, useMemo } from 'react';
 import './styles/Home.css';
 import Login from './components/Login';
 import Register from './components/Register';
+import { sha256 } from './sha256';
 
 const GRAPHQL_ENDPOINT = 'http://localhost:8000/graphql/';
+const PAGE_SIZE = 20;
 
-async function graphQLRequest(query, variables = {}) {
+async function postGraphQL(body) {
   const token = localStorage.getItem('authToken');
   const res = await fetch(GRAPHQL_ENDPOINT, {
     method: 'POST',
@@ -14,10 +16,20 @@ async function graphQLRequest(query, variables = {}) {
       'Content-Type': 'application/json',
       ...(token ? { Authorization: `Bearer ${token}` } : {}),
     },
-    body: JSON.stringify({ query, variables }),
+    body: JSON.stringify(body),
     credentials: 'include',
   });
-  const json = await res.json();
+  return res.json();
+}
+
+// Automatic persisted queries: send only the hash, and the full text once
+// if the server does not know it yet.
+async function graphQLRequest(query, variables = {}) {
+  const extensions = { persistedQuery: { version: 1, sha256Hash: await sha256(query) } };
+  let json = await postGraphQL({ variables, extensions });
+  if (json.errors && json.errors.some(e => e.extensions?.code === 'PERSISTED_QUERY_NOT_FOUND')) {
+    json = await postGraphQL({ query, variables, extensions });
+  }
   if (json.errors) {
     const message = json.errors.map(e => e.message).join('; ');
     throw new Error(message);
@@ -25,39 +37,48 @@ async function graphQLRequest(query, variables = {}) {
   return json.data;
 }
 
-async function uploadImageToGCS(file) {
-  const getUrlMutation = `
-    mutation($filename: String!, $ct: String!) {
-      generateListingImageUploadUrl(filename: $filename, contentType: $ct) {
+async function uploadImagesToGCS(files) {
+  const getUrlsMutation = `
+    mutation($files: [UploadFileInput!]!) {
+      generateListingImageUploadUrls(files: $files) {
         signedUrl
         publicUrl
       }
     }
   `;
-  const data = await graphQLRequest(getUrlMutation, { filename: file.name, ct: file.type || 'application/octet-stream' });
-  const { signedUrl, publicUrl } = data.generateListingImageUploadUrl;
+  const inputs = files.map(f => ({ filename: f.name, contentType: f.type || 'application/octet-stream' }));
+  const data = await graphQLRequest(getUrlsMutation, { files: inputs });
+  const targets = data.generateListingImageUploadUrls;
 
-  const putRes = await fetch(signedUrl, {
-    method: 'PUT',
-    headers: { 'Content-Type': file.type || 'application/octet-stream' },
-    body: file,
-  });
-  if (!putRes.ok) throw new Error(`Upload failed: ${putRes.status} ${putRes.statusText}`);
-  return publicUrl;
+  await Promise.all(targets.map(async ({ signedUrl }, i) => {
+    const file = files[i];
+    const putRes = await fetch(signedUrl, {
+      method: 'PUT',
+      headers: { 'Content-Type': file.type || 'application/octet-stream' },
+      body: file,
+    });
+    if (!putRes.ok) throw new Error(`Upload failed: ${putRes.status} ${putRes.statusText}`);
+  }));
+  return targets.map(t => t.publicUrl);
 }
 
 const queries = {
   list: `
-    query($search: String, $includeSold: Boolean) {
-      listings(search: $search, includeSold: $includeSold) {
-        id
-        title
-        description
-        price
-        sold
-        dateListed
-        user { id username }
-        images { id imageUrl }
+    query($search: String, $includeSold: Boolean, $first: Int, $after: String) {
+      listings(search: $search, includeSold: $includeSold, first: $first, after: $after) {
+        edges {
+          node {
+            id
+            title
+            description
+            price
+            sold
+            dateListed
+            user { id username }
+            images { id imageUrl }
+          }
+        }
+        pageInfo { hasNextPage endCursor }
       }
     }
   `,
@@ -130,13 +151,7 @@ function CreateListingForm({ onCreated, onCancel }) {
     e.preventDefault();
     setBusy(true); setErr('');
     try {
-      let urls = [];
-      if (files && files.length) {
-        for (const f of files) {
-          const url = await uploadImageToGCS(f);
-          urls.push(url);
-        }
-      }
+      const urls = files && files.length ? await uploadImagesToGCS(files) : [];
       const vars = { title, description: desc, price: String(price), imageUrls: urls };
       const data = await graphQLRequest(mutations.create, vars);
       if (!data.createListing.success) throw new Error(data.createListing.message || 'Create failed');
@@ -198,11 +213,7 @@ function ListingCard({ item, onRefresh }) {
     if (!files || files.length === 0) return;
     setWorking(true); setError('');
     try {
-      const urls = [];
-      for (const f of files) {
-        const url = await uploadImageToGCS(f);
-        urls.push(url);
-      }
+      const urls = await uploadImagesToGCS(files);
       await graphQLRequest(mutations.updateAddRemove, { id: item.id, add: urls, remove: [] });
       setFiles([]);
       setAdding(false);
@@ -268,15 +279,18 @@ function MainApp({ user, onLogout }) {
   const [search, setSearch] = useState('');
   const [includeSold, setIncludeSold] = useState(false);
   const [listings, setListings] = useState([]);
+  const [pageInfo, setPageInfo] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [creating, setCreating] = useState(false);
   const [error, setError] = useState('');
 
   const load = useMemo(() => async () => {
     setLoading(true); setError('');
     try {
-      const data = await graphQLRequest(queries.list, { search: search || null, includeSold });
-      setListings(data.listings || []);
+      const data = await graphQLRequest(queries.list, { search: search || null, includeSold, first: PAGE_SIZE });
+      setListings((data.listings?.edges || []).map(edge => edge.node));
+      setPageInfo(data.listings?.pageInfo || null);
     } catch (e) {
       setError(e.message || 'Failed to load listings');
     } finally {
@@ -284,6 +298,23 @@ function MainApp({ user, onLogout }) {
     }
   }, [search, includeSold]);
 
+  // Next page after the last cursor we have, appended to what is shown.
+  const loadMore = async () => {
+    if (!pageInfo?.hasNextPage || loadingMore) return;
+    setLoadingMore(true); setError('');
+    try {
+      const data = await graphQLRequest(queries.list, {
+        search: search || null, includeSold, first: PAGE_SIZE, after: pageInfo.endCursor,
+      });
+      setListings(prev => [...prev, ...(data.listings?.edges || []).map(edge => edge.node)]);
+      setPageInfo(data.listings?.pageInfo || null);
+    } catch (e) {
+      setError(e.message || 'Failed to load more listings');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => { load(); }, [load]);
 
   return (
@@ -329,11 +360,18 @@ function MainApp({ user, onLogout }) {
         ) : listings.length === 0 ? (
           <p>No listings found.</p>
         ) : (
-          <div style={{ display: 'grid', gap: 12, gridTemplateColumns: 'repeat(auto-fill, minmax(320px, 1fr))' }}>
-            {listings.map(item => (
-              <ListingCard key={item.id} item={item} onRefresh={load} />
-            ))}
-          </div>
+          <>
+            <div style={{ display: 'grid', gap: 12, gridTemplateColumns: 'repeat(auto-fill, minmax(320px, 1fr))' }}>
+              {listings.map(item => (
+                <ListingCard key={item.id} item={item} onRefresh={load} />
+              ))}
+            </div>
+            {pageInfo?.hasNextPage && (
+              <div style={{ marginTop: 16, textAlign: 'center' }}>
+                <button onClick={loadMore} disabled={loadingMore}>{loadingMore ? 'Loading…' : 'Load more'}</button>
+              </div>
+            )}
+          </>
         )}
       </section>
     </div>
@@ -1,11 +1,16 @@
 import { ApolloClient, InMemoryCache, createHttpLink, from } from '@apollo/client';
 import { setContext } from '@apollo/client/link/context';
 import { onError } from '@apollo/client/link/error';
+import { createPersistedQueryLink } from '@apollo/client/link/persisted-queries';
+import { sha256 } from './sha256';
 
 const httpLink = createHttpLink({
   uri: 'http://localhost:8000/graphql/',
 });
 
+// Send a query hash instead of the full text once the server has seen it.
+const persistedQueryLink = createPersistedQueryLink({ sha256 });
+
 const authLink = setContext((_, { headers }) => {
   const token = localStorage.getItem('authToken');
     return {
@@ -33,7 +38,7 @@ const errorLink = onError(({ graphQLErrors, networkError, operation, forward })
 });
 
 const client = new ApolloClient({
-  link: from([errorLink, authLink, httpLink]),
+  link: from([errorLink, authLink, persistedQueryLink, httpLink]),
   cache: new InMemoryCache(),
 });
 